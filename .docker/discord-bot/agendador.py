@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import time
+
+# =======================
+# AGENDADOR DE PROBES
+# =======================
+#
+# Cada probe roda na sua própria task, com intervalo e prazo próprios.
+# Os resultados ficam num snapshot compartilhado que o embed lê sem
+# esperar pela rede.
+
+log = logging.getLogger(__name__)
+
+
+class AgendadorProbes:
+    """Executa probes concorrentes e mantém o último resultado de cada uma"""
+
+    def __init__(self):
+        self.probes = {}
+        self.snapshot = {}
+        self.detalhes = {}
+        self._assinantes = []
+        self._observadores = []
+        self._tasks = []
+
+    def registrar(self, nome, func, intervalo, timeout, valor_inicial=False):
+        """Registra uma probe assíncrona executada a cada `intervalo` segundos
+
+        Se `intervalo` for None a probe roda só uma vez na partida e depois
+        é atualizada por eventos via `publicar`.
+        """
+        self.probes[nome] = (func, intervalo, timeout)
+        self.snapshot[nome] = valor_inicial
+        self.detalhes[nome] = {"latencia": None, "atualizado_em": None, "erro": None}
+
+    def ao_mudar(self, callback):
+        """Registra callback(nome, valor) chamado quando um resultado muda"""
+        self._assinantes.append(callback)
+
+    def ao_publicar(self, callback):
+        """Registra callback(nome, valor, latencia, erro) chamado a cada resultado"""
+        self._observadores.append(callback)
+
+    def publicar(self, nome, valor, latencia=None, erro=None):
+        anterior = self.snapshot.get(nome)
+        self.snapshot[nome] = valor
+        self.detalhes[nome] = {
+            "latencia": latencia,
+            "atualizado_em": time.time(),
+            "erro": erro
+        }
+
+        for callback in self._observadores:
+            try:
+                callback(nome, valor, latencia, erro)
+            except Exception:
+                log.exception("Erro no observador do agendador")
+
+        if valor != anterior:
+            for callback in self._assinantes:
+                try:
+                    callback(nome, valor)
+                except Exception:
+                    log.exception("Erro no assinante do agendador")
+
+    async def executar(self, nome):
+        func, _, timeout = self.probes[nome]
+        inicio = time.monotonic()
+        try:
+            valor = await asyncio.wait_for(func(), timeout=timeout)
+            self.publicar(nome, valor, latencia=time.monotonic() - inicio)
+        except asyncio.TimeoutError:
+            log.warning("Probe %s excedeu o prazo de %ss", nome, timeout)
+            self.publicar(nome, False, latencia=time.monotonic() - inicio, erro="timeout")
+        except Exception as e:
+            log.warning("Erro na probe %s: %s", nome, e)
+            self.publicar(nome, False, latencia=time.monotonic() - inicio, erro=str(e))
+
+    async def executar_todas(self):
+        """Roda todas as probes ao mesmo tempo (usado na partida)"""
+        await asyncio.gather(*(self.executar(nome) for nome in self.probes))
+
+    async def _loop_probe(self, nome, intervalo):
+        while True:
+            await asyncio.sleep(intervalo)
+            await self.executar(nome)
+
+    async def iniciar(self):
+        await self.executar_todas()
+
+        for nome, (_, intervalo, _) in self.probes.items():
+            if intervalo is not None:
+                self._tasks.append(asyncio.create_task(self._loop_probe(nome, intervalo)))
+
+    def parar(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
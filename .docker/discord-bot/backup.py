@@ -0,0 +1,340 @@
+import argparse
+import hashlib
+import os
+import sys
+import tarfile
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from catalogo import Catalogo, RegistroBackup
+from upload import SUFIXO_MANIFESTO, EnvioParalelo, UploadErro, abrir_destino
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# =======================
+# BACKUP
+# =======================
+#
+# Motor de backup em Python: os arquivos entram num tar em stream e a
+# compressão roda em paralelo em todos os núcleos. No modo gzip o stream é
+# cortado em blocos e cada bloco vira um membro gzip independente (como o
+# pigz --independent): o resultado é um .tar.gz comum, que `tar -xzf` e o
+# bot leem normalmente. Com o pacote zstandard instalado há também o modo
+# .tar.zst, com as threads nativas do zstd. O arquivo só aparece com o nome
+# final quando está completo, então o bot nunca vê um backup pela metade.
+# Com --enviar, o stream comprimido também vai direto para o destino remoto
+# (upload.py) enquanto o backup ainda está sendo gerado.
+#
+# Uso (scripts/backup.sh):
+#   python3 backup.py --raiz /home/rainz/hytale-server --saida backups/x.tar.gz data
+
+BLOCO_PADRAO = 4 * 1024 * 1024
+NIVEL_GZIP_PADRAO = 6
+NIVEL_ZSTD_PADRAO = 3
+INTERVALO_PROGRESSO = 1.0
+
+EXTENSOES = {"gz": ".tar.gz", "zst": ".tar.zst"}
+# Código de saída: backup criado, mas o envio precisa ser retomado
+ENVIO_INCOMPLETO = 3
+
+
+def _gzip_membro(dados, nivel):
+    """Comprime um bloco como membro gzip completo (cabeçalho + deflate + CRC)"""
+    compressor = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+    return compressor.compress(dados) + compressor.flush()
+
+
+class EstatisticasBackup:
+    def __init__(self):
+        self.inicio = time.monotonic()
+        self.lidos = 0
+        self.escritos = 0
+        self.arquivos = 0
+
+    @property
+    def duracao(self):
+        return time.monotonic() - self.inicio
+
+    @property
+    def vazao(self):
+        """Bytes de entrada por segundo"""
+        duracao = self.duracao
+        return self.lidos / duracao if duracao > 0 else 0.0
+
+    @property
+    def taxa_compressao(self):
+        return self.escritos / self.lidos if self.lidos else 0.0
+
+
+class _Saida:
+    """Escreve no arquivo local (e no envio remoto) calculando o checksum no caminho"""
+
+    def __init__(self, arquivo, espelho=None):
+        self.arquivo = arquivo
+        self.espelho = espelho
+        self.hash = hashlib.blake2b(digest_size=32)
+
+    def write(self, dados):
+        self.hash.update(dados)
+        if self.espelho is not None:
+            self.espelho.write(dados)
+        return self.arquivo.write(dados)
+
+    @property
+    def checksum(self):
+        # Mesmo formato do catalogo.checksum_arquivo
+        return "blake2b:" + self.hash.hexdigest()
+
+    def tell(self):
+        return self.arquivo.tell()
+
+    def flush(self):
+        self.arquivo.flush()
+
+
+class GzipParalelo:
+    """File-like de escrita que comprime blocos em paralelo e grava em ordem"""
+
+    def __init__(self, destino, nivel=NIVEL_GZIP_PADRAO, threads=None, bloco=BLOCO_PADRAO,
+                 estatisticas=None, progresso=None):
+        self.destino = destino
+        self.nivel = nivel
+        self.bloco = bloco
+        self.estatisticas = estatisticas or EstatisticasBackup()
+        self.progresso = progresso
+        self.threads = threads or os.cpu_count() or 1
+        # zlib libera o GIL, então threads bastam para usar todos os núcleos
+        self._executor = ThreadPoolExecutor(max_workers=self.threads)
+        # Limita a memória: no máximo 2 blocos por thread em voo
+        self._pendentes = deque()
+        self._buffer = bytearray()
+
+    def write(self, dados):
+        self._buffer += dados
+        while len(self._buffer) >= self.bloco:
+            self._enviar(bytes(self._buffer[:self.bloco]))
+            del self._buffer[:self.bloco]
+        return len(dados)
+
+    def _enviar(self, bloco):
+        if len(self._pendentes) >= self.threads * 2:
+            self._gravar_proximo()
+        self.estatisticas.lidos += len(bloco)
+        self._pendentes.append(self._executor.submit(_gzip_membro, bloco, self.nivel))
+
+    def _gravar_proximo(self):
+        comprimido = self._pendentes.popleft().result()
+        self.destino.write(comprimido)
+        self.estatisticas.escritos += len(comprimido)
+        if self.progresso is not None:
+            self.progresso(self.estatisticas)
+
+    def close(self):
+        if self._buffer:
+            self._enviar(bytes(self._buffer))
+            self._buffer.clear()
+        while self._pendentes:
+            self._gravar_proximo()
+        self._executor.shutdown()
+
+    def abortar(self):
+        for futuro in self._pendentes:
+            futuro.cancel()
+        self._pendentes.clear()
+        self._executor.shutdown(cancel_futures=True)
+
+
+class ZstdParalelo:
+    """Mesma interface do GzipParalelo usando as threads do próprio zstd"""
+
+    def __init__(self, destino, nivel=NIVEL_ZSTD_PADRAO, threads=None, estatisticas=None, progresso=None):
+        if zstandard is None:
+            raise RuntimeError("Pacote zstandard não instalado (pip install zstandard)")
+        self.destino = destino
+        self.estatisticas = estatisticas or EstatisticasBackup()
+        self.progresso = progresso
+        compressor = zstandard.ZstdCompressor(level=nivel, threads=threads or -1)
+        self._writer = compressor.stream_writer(destino, closefd=False)
+
+    def write(self, dados):
+        self._writer.write(dados)
+        self.estatisticas.lidos += len(dados)
+        self.estatisticas.escritos = self.destino.tell()
+        if self.progresso is not None:
+            self.progresso(self.estatisticas)
+        return len(dados)
+
+    def close(self):
+        self._writer.close()
+        self.estatisticas.escritos = self.destino.tell()
+
+    def abortar(self):
+        pass
+
+
+def criar_backup(raiz, itens, saida, formato="gz", nivel=None, threads=None, bloco=BLOCO_PADRAO, progresso=None,
+                 espelho=None):
+    """Cria `saida` com os `itens` (relativos a `raiz`) e retorna as estatísticas
+
+    Itens inexistentes são ignorados (e informados em `estatisticas.ausentes`).
+    `espelho` (um EnvioParalelo) recebe os mesmos bytes do arquivo; quem
+    chama é responsável pelo close() dele depois que o backup termina.
+    """
+    if formato not in EXTENSOES:
+        raise ValueError(f"Formato desconhecido: {formato}")
+
+    estatisticas = EstatisticasBackup()
+    estatisticas.ausentes = [item for item in itens if not os.path.lexists(os.path.join(raiz, item))]
+    presentes = [item for item in itens if item not in estatisticas.ausentes]
+    if not presentes:
+        raise FileNotFoundError(f"Nenhum dos itens existe em {raiz}: {itens}")
+
+    parcial = saida + ".parcial"
+    with open(parcial, "wb") as arquivo:
+        destino = _Saida(arquivo, espelho)
+        if formato == "gz":
+            compressor = GzipParalelo(
+                destino, nivel if nivel is not None else NIVEL_GZIP_PADRAO, threads, bloco, estatisticas, progresso
+            )
+        else:
+            compressor = ZstdParalelo(
+                destino, nivel if nivel is not None else NIVEL_ZSTD_PADRAO, threads, estatisticas, progresso
+            )
+
+        try:
+            # "w|" = tar em stream, sem seek: cada bloco vai direto para a compressão
+            with tarfile.open(fileobj=compressor, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+                for item in presentes:
+                    tar.add(os.path.join(raiz, item), arcname=item, filter=_contar(estatisticas))
+            compressor.close()
+        except BaseException:
+            compressor.abortar()
+            if espelho is not None:
+                espelho.abortar()
+            arquivo.close()
+            os.remove(parcial)
+            raise
+
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+        estatisticas.checksum = destino.checksum
+
+    os.replace(parcial, saida)
+    return estatisticas
+
+
+def _contar(estatisticas):
+    def filtro(info):
+        if info.isfile():
+            estatisticas.arquivos += 1
+        return info
+    return filtro
+
+
+def _formatar_mb(valor):
+    return f"{valor / 1024 ** 2:,.1f} MB"
+
+
+class ImpressoraProgresso:
+    """Callback de progresso que imprime no stderr no máximo a cada `intervalo` s"""
+
+    def __init__(self, intervalo=INTERVALO_PROGRESSO):
+        self.intervalo = intervalo
+        self._ultimo = 0.0
+
+    def __call__(self, estatisticas):
+        agora = time.monotonic()
+        if agora - self._ultimo < self.intervalo:
+            return
+        self._ultimo = agora
+        print(
+            f"\r  {_formatar_mb(estatisticas.lidos)} lidos · {_formatar_mb(estatisticas.vazao)}/s"
+            f" · {estatisticas.arquivos} arquivos",
+            end="", file=sys.stderr, flush=True
+        )
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Backup com compressão paralela")
+    parser.add_argument("itens", nargs="+", help="caminhos relativos à raiz")
+    parser.add_argument("--raiz", default=".")
+    parser.add_argument("--saida", required=True)
+    parser.add_argument("--formato", choices=sorted(EXTENSOES), default="gz")
+    parser.add_argument("--nivel", type=int)
+    parser.add_argument("--threads", type=int, help="padrão: todos os núcleos")
+    parser.add_argument("--bloco-mb", type=int, default=BLOCO_PADRAO // 1024 ** 2)
+    parser.add_argument("--silencioso", action="store_true")
+    parser.add_argument("--enviar", metavar="DESTINO", help="envia durante a compressão (ver upload.py)")
+    parser.add_argument("--threads-envio", type=int, default=4)
+    parser.add_argument("--catalogo", help="registra o backup neste catálogo (catalogo.py)")
+    args = parser.parse_args(argv)
+
+    espelho = None
+    if args.enviar:
+        try:
+            espelho = EnvioParalelo(
+                abrir_destino(args.enviar), os.path.basename(args.saida), args.saida + SUFIXO_MANIFESTO,
+                threads=args.threads_envio
+            )
+        except ValueError as e:
+            print(f"Erro: {e}", file=sys.stderr)
+            return 1
+
+    try:
+        estatisticas = criar_backup(
+            args.raiz, args.itens, args.saida,
+            formato=args.formato,
+            nivel=args.nivel,
+            threads=args.threads,
+            bloco=args.bloco_mb * 1024 ** 2,
+            progresso=None if args.silencioso else ImpressoraProgresso(),
+            espelho=espelho
+        )
+    except (OSError, RuntimeError, ValueError, tarfile.TarError) as e:
+        if espelho is not None:
+            espelho.abortar()
+        print(f"\nErro no backup: {e}", file=sys.stderr)
+        return 1
+
+    if not args.silencioso:
+        print(file=sys.stderr)
+    for item in estatisticas.ausentes:
+        print(f"Aviso: {item} não existe, ignorado", file=sys.stderr)
+    print(
+        f"{estatisticas.arquivos} arquivos · {_formatar_mb(estatisticas.lidos)} -> {_formatar_mb(estatisticas.escritos)}"
+        f" ({estatisticas.taxa_compressao:.0%}) em {estatisticas.duracao:.1f}s"
+        f" · {_formatar_mb(estatisticas.vazao)}/s"
+    )
+
+    resultado = 0
+    remotos = []
+    if espelho is not None:
+        try:
+            espelho.close()
+            remotos.append(espelho.destino.spec)
+            print(f"Enviado para {args.enviar} · {_formatar_mb(espelho.vazao)}/s")
+        except UploadErro as e:
+            # O backup local está íntegro; `upload.py enviar` retoma do manifesto
+            print(f"Aviso: {e}", file=sys.stderr)
+            resultado = ENVIO_INCOMPLETO
+
+    if args.catalogo:
+        Catalogo(args.catalogo).registrar(RegistroBackup(
+            nome=os.path.basename(args.saida),
+            caminho=os.path.abspath(args.saida),
+            tamanho=estatisticas.escritos,
+            criado=time.time(),
+            conteudo=[item for item in args.itens if item not in estatisticas.ausentes],
+            checksum=estatisticas.checksum,
+            remotos=remotos
+        ))
+    return resultado
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
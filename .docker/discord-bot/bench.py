@@ -0,0 +1,324 @@
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from docker_api import EstadoContainer
+from log_classifier import ATENCAO, DESCONHECIDO, LIMITE_HANDSHAKES, NECESSARIA, OK, MaquinaAuth, classificar
+from log_follower import SeguidorLogs
+from players import RastreadorPlayers
+from recursos import AmostradorRecursos
+
+# =======================
+# BENCH
+# =======================
+#
+# Gera logs sintéticos do servidor Hytale (tempestades de entrada/saída,
+# falhas de auth, flood de handshake, reinícios) e reproduz tudo pelo mesmo
+# caminho do bot: SeguidorLogs lendo de um Docker falso, classificação única
+# por linha e os consumidores da Instancia. Mede custo por linha, latência
+# do tick (o que verificar_autenticacao/obter_players_online leem), memória
+# e confere o estado final com o esperado. Roda offline, sem Discord:
+#
+#   python bench.py --cenario churn --linhas 200000 --salvar antes.json
+#   python bench.py --cenario churn --linhas 200000 --comparar antes.json
+
+# Peso de cada tipo de linha por cenário (o resto é ruído do servidor)
+CENARIOS = {
+    "normal": {"ruido": 0.95, "entrada": 0.02, "saida": 0.02, "handshake": 0.01},
+    "churn": {"ruido": 0.2, "entrada": 0.4, "saida": 0.4},
+    "auth": {"ruido": 0.6, "auth_erro": 0.2, "auth_sucesso": 0.2},
+    "handshake": {"ruido": 0.2, "handshake": 0.8},
+    # Servidor logado recebendo conexões: os handshakes não podem virar alerta
+    "logado": {"ruido": 0.2, "auth_sucesso": 0.002, "handshake": 0.798},
+    "restart": {"ruido": 0.7, "entrada": 0.14, "saida": 0.14, "reinicio": 0.02},
+    "misto": {
+        "ruido": 0.6, "entrada": 0.12, "saida": 0.12, "handshake": 0.08,
+        "auth_erro": 0.02, "auth_sucesso": 0.04, "gc": 0.015, "reinicio": 0.005
+    },
+}
+
+RUIDO = [
+    "[World|default] Saving chunks ({n} dirty)",
+    "[Universe] Tick took {n}ms",
+    "[NetworkManager] Sent {n} packets",
+    "[ChunkStore] Loaded region r.{n}.{n}.region",
+    "[PluginManager] Plugin heartbeat {n}",
+]
+
+
+def formatar_ts(momento):
+    """Timestamp no formato de `docker logs --timestamps` (nanossegundos)"""
+    return momento.strftime("%Y-%m-%dT%H:%M:%S") + f".{momento.microsecond * 1000:09d}Z"
+
+
+class GeradorLogs:
+    """Gera linhas com timestamp e acompanha o estado que o bot deveria ver"""
+
+    def __init__(self, cenario, taxa=1000, players=200, semente=42):
+        self.pesos = CENARIOS[cenario]
+        self.taxa = taxa
+        self.nomes = [f"Player{i}" for i in range(players)]
+        self.rand = random.Random(semente)
+        self.inicio = datetime(2026, 1, 27, 11, 0, tzinfo=timezone.utc)
+        self.online = {}
+        # O que o cenário gerou desde o último reinício; o estado esperado sai
+        # daqui (auth_esperado), sem repetir a lógica da MaquinaAuth
+        self.ultimo_auth = None
+        self.handshakes_sem_login = 0
+        self.contagem = {tipo: 0 for tipo in self.pesos}
+
+    @property
+    def auth_esperado(self):
+        """Estado que o embed deve mostrar: o último evento de auth decide;
+        handshakes só preocupam num servidor que não logou desde o reinício"""
+        if self.ultimo_auth == "erro":
+            return NECESSARIA
+        if self.ultimo_auth == "sucesso":
+            return OK
+        return ATENCAO if self.handshakes_sem_login >= LIMITE_HANDSHAKES else DESCONHECIDO
+
+    def _prefixo(self, nivel="INFO"):
+        return f"[{self.agora:%Y/%m/%d %H:%M:%S}   {nivel}]"
+
+    def _linha(self, tipo):
+        n = self.rand.randint(1, 9999)
+        if tipo == "entrada":
+            livres = [nome for nome in self.nomes if nome not in self.online.values()]
+            if not livres:
+                return self._linha("saida")
+            nome = self.rand.choice(livres)
+            uuid = f"{self.rand.getrandbits(128):032x}"
+            self.online[uuid] = nome
+            return f"{self._prefixo()} [Universe|P] Adding player '{nome} ({uuid})'"
+        if tipo == "saida":
+            if not self.online:
+                return self._linha("ruido")
+            uuid = self.rand.choice(list(self.online))
+            nome = self.online.pop(uuid)
+            return f"{self._prefixo()} [Universe|P] Removing player '{nome}' ({uuid})"
+        if tipo == "handshake":
+            if self.ultimo_auth is None:
+                self.handshakes_sem_login += 1
+            return f"{self._prefixo()} [HandshakeHandler] Incoming connection from 10.0.{n % 256}.{n % 200}"
+        if tipo == "auth_erro":
+            self.ultimo_auth = "erro"
+            return f"{self._prefixo('WARN')} [ServerAuth] No server tokens configured"
+        if tipo == "auth_sucesso":
+            self.ultimo_auth = "sucesso"
+            return f"{self._prefixo()} [ServerAuth] Authentication successful"
+        if tipo == "reinicio":
+            self.online.clear()
+            self.ultimo_auth = None
+            self.handshakes_sem_login = 0
+            return f"{self._prefixo()} [HytaleServer] Starting Hytale server"
+        if tipo == "gc":
+            antes = self.rand.randint(1000, 4000)
+            return (f"[{n / 10:.3f}s][info][gc] GC({n}) Pause Young (Normal) (G1 Evacuation Pause) "
+                    f"{antes}M->{antes // 4}M(4096M) {self.rand.uniform(1, 40):.3f}ms")
+        return f"{self._prefixo()} " + self.rand.choice(RUIDO).format(n=n)
+
+    def gerar(self, total):
+        """Lista de linhas brutas "<timestamp> <linha>" como o Docker entrega"""
+        tipos = list(self.pesos)
+        pesos = list(self.pesos.values())
+        linhas = []
+        for i in range(total):
+            self.agora = self.inicio + timedelta(seconds=i / self.taxa)
+            tipo = self.rand.choices(tipos, pesos)[0]
+            self.contagem[tipo] += 1
+            linhas.append(f"{formatar_ts(self.agora)} {self._linha(tipo)}")
+        return linhas
+
+
+class DockerFalso:
+    """Backend com a interface usada pelo SeguidorLogs, servindo linhas prontas"""
+
+    def __init__(self, linhas, ao_tick=None, tick_a_cada=1000):
+        self.linhas = linhas
+        self.ao_tick = ao_tick
+        self.tick_a_cada = tick_a_cada
+
+    async def inspect(self, nome):
+        return EstadoContainer(
+            id="bench", nome=nome, status="running", rodando=True,
+            iniciado_em="", reinicios=0, saude="", tty=False
+        )
+
+    async def logs(self, nome, follow=False, tail=None, since=None, timestamps=True, tty=None):
+        for i, linha in enumerate(self.linhas, 1):
+            yield linha
+            if self.ao_tick is not None and i % self.tick_a_cada == 0:
+                self.ao_tick()
+                # Como no bot, o stream cede o loop entre blocos de leitura
+                await asyncio.sleep(0)
+
+
+class PipelineBench:
+    """Mesmos consumidores da Instancia, sem Discord nem SQLite"""
+
+    def __init__(self, diretorio):
+        self.maquina_auth = MaquinaAuth()
+        self.rastreador_players = RastreadorPlayers(f"{diretorio}/players_online.json")
+        self.recursos = AmostradorRecursos(None, "hytale-server")
+        self.ticks = []
+
+    def processar_linha_log(self, timestamp, linha):
+        # Igual a Instancia.processar_linha_log
+        tipo = classificar(linha)
+        if tipo is None:
+            return
+        self.maquina_auth.aplicar(tipo, timestamp, linha)
+        self.rastreador_players.aplicar(tipo, timestamp, linha)
+        self.recursos.aplicar(tipo, timestamp, linha)
+
+    def tick(self):
+        # O que o embed lê a cada tick
+        inicio = time.perf_counter()
+        self.maquina_auth.resultado()
+        len(self.rastreador_players.nomes)
+        self.recursos.resumo()
+        self.ticks.append(time.perf_counter() - inicio)
+
+
+async def _replay(linhas, tick_a_cada):
+    with tempfile.TemporaryDirectory() as diretorio:
+        pipeline = PipelineBench(diretorio)
+        docker = DockerFalso(linhas, pipeline.tick, tick_a_cada)
+        seguidor = SeguidorLogs(docker, "hytale-server")
+        seguidor.assinar(pipeline.processar_linha_log)
+
+        inicio = time.perf_counter()
+        await seguidor._seguir_uma_vez()
+        duracao = time.perf_counter() - inicio
+
+        if pipeline.rastreador_players._salvamento is not None:
+            pipeline.rastreador_players._salvamento.cancel()
+        return pipeline, duracao
+
+
+def medir_classificador(linhas, repeticoes):
+    conteudos = [linha.partition(" ")[2] for linha in linhas]
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for linha in conteudos:
+            classificar(linha)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def percentil(valores, p):
+    if not valores:
+        return None
+    if len(valores) == 1:
+        return valores[0]
+    return statistics.quantiles(valores, n=100, method="inclusive")[p - 1]
+
+
+def executar(args):
+    gerador = GeradorLogs(args.cenario, args.taxa, args.players, args.semente)
+    linhas = gerador.gerar(args.linhas)
+
+    tempo_classificador = medir_classificador(linhas, args.repeticoes)
+
+    melhor = None
+    for _ in range(args.repeticoes):
+        pipeline, duracao = asyncio.run(_replay(linhas, args.tick_a_cada))
+        if melhor is None or duracao < melhor[1]:
+            melhor = (pipeline, duracao)
+    pipeline, duracao = melhor
+
+    # Memória numa execução separada: o tracemalloc distorce o tempo
+    tracemalloc.start()
+    asyncio.run(_replay(linhas, args.tick_a_cada))
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    esperado = sorted(gerador.online.values())
+    obtido = sorted(pipeline.rastreador_players.nomes)
+    ticks = pipeline.ticks
+
+    return {
+        "cenario": args.cenario,
+        "linhas": len(linhas),
+        "mistura": gerador.contagem,
+        "classificador_ns_linha": tempo_classificador / len(linhas) * 1e9,
+        "pipeline_ns_linha": duracao / len(linhas) * 1e9,
+        "linhas_por_segundo": len(linhas) / duracao,
+        "tick_p50_us": percentil(ticks, 50) * 1e6 if ticks else None,
+        "tick_p99_us": percentil(ticks, 99) * 1e6 if ticks else None,
+        "memoria_pico_kb": pico / 1024,
+        "players_esperados": len(esperado),
+        "players_ok": obtido == esperado,
+        "auth_esperado": gerador.auth_esperado,
+        "auth_obtido": pipeline.maquina_auth.estado,
+        "auth_ok": gerador.auth_esperado == pipeline.maquina_auth.estado,
+    }
+
+
+def imprimir(resultado, base=None):
+    print(f"Cenário {resultado['cenario']}: {resultado['linhas']} linhas {resultado['mistura']}")
+    metricas = [
+        ("classificador_ns_linha", "Classificador", "ns/linha"),
+        ("pipeline_ns_linha", "Pipeline", "ns/linha"),
+        ("linhas_por_segundo", "Vazão", "linhas/s"),
+        ("tick_p50_us", "Tick p50", "µs"),
+        ("tick_p99_us", "Tick p99", "µs"),
+        ("memoria_pico_kb", "Memória (pico)", "KiB"),
+    ]
+    for chave, nome, unidade in metricas:
+        valor = resultado[chave]
+        if valor is None:
+            continue
+        linha = f"  {nome:<16} {valor:>14,.1f} {unidade}"
+        if base and base.get(chave):
+            linha += f"  ({(valor / base[chave] - 1) * 100:+.1f}% vs base)"
+        print(linha)
+
+    print(f"  Players          {'OK' if resultado['players_ok'] else 'DIVERGENTE'} ({resultado['players_esperados']} online)")
+    print(f"  Autenticação     {'OK' if resultado['auth_ok'] else 'DIVERGENTE'} "
+          f"(esperado {resultado['auth_esperado']}, obtido {resultado['auth_obtido']})")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline de logs do bot")
+    parser.add_argument("--cenario", choices=sorted(CENARIOS), default="misto")
+    parser.add_argument("--linhas", type=int, default=100000)
+    parser.add_argument("--taxa", type=int, default=1000, help="linhas por segundo no log sintético")
+    parser.add_argument("--players", type=int, default=200)
+    parser.add_argument("--tick-a-cada", type=int, default=1000, help="linhas entre ticks medidos")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--salvar", help="grava o resultado em JSON")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--com-logs", action="store_true", help="mantém o logging do bot ligado")
+    args = parser.parse_args(argv)
+
+    if not args.com_logs:
+        logging.disable(logging.CRITICAL)
+
+    resultado = executar(args)
+
+    base = None
+    if args.comparar:
+        with open(args.comparar) as f:
+            base = json.load(f)
+    imprimir(resultado, base)
+
+    if args.salvar:
+        with open(args.salvar, "w") as f:
+            json.dump(resultado, f, indent=2)
+
+    return 0 if resultado["players_ok"] and resultado["auth_ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,164 +1,272 @@
 import os
 import sys
 import asyncio
+import logging
+import math
+import time
+from functools import partial
 import discord
 from discord.ext import tasks
 from datetime import datetime
 from zoneinfo import ZoneInfo
-import socket
-import subprocess
-import json
+
+from agendador import AgendadorProbes
+from checks import CHECKS, ContextoChecks
+from catalogo import Catalogo
+from container_events import MonitorContainers
+from dns_cache import resolvedor
+from fs_watch import ObservadorArquivos
+from docker_api import DockerAPI
+from instancias import SERVERS_CONFIG, Instancia, carregar_configs
+from kuma import ClienteKuma, ler_tokens_push
+from log_config import configurar_logs, definir_nivel, ler_nivel
+from metadata_cache import IndiceBackups
+from metrics import METRICS_PORTA_PADRAO, ServidorMetricas, registro
+from net_probe import ProberRede
+from quic_probe import ProberQuic
+from recursos import BUCKETS_PAUSA
+from render import PublicadorEmbed
+from log_classifier import AGUARDANDO_PERFIL, NECESSARIA
 
 # =======================
 # CONFIG
 # =======================
 
+# Nível de log: LOG_LEVEL na partida, ou o conteúdo de LOG_LEVEL_FILE (ex.: "DEBUG")
+# em tempo de execução, sem reiniciar o bot
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_LEVEL_FILE = "/tmp/hytale_bot_log_level"
+
+try:
+    configurar_logs(ler_nivel(LOG_LEVEL_FILE, LOG_LEVEL), LOG_FORMAT)
+except ValueError:
+    configurar_logs(LOG_LEVEL, LOG_FORMAT)
+log = logging.getLogger("bot")
+
 TOKEN = os.getenv("DISCORD_TOKEN")
 CHANNEL_ID_STR = os.getenv("DISCORD_CHANNEL_ID")
 
-STATUS_FILE = "status_message_id.txt"
 MAINTENANCE_FILE = "/tmp/hytale_maintenance.flag"
-PLAYERS_STATE_FILE = "/app/players_online.json"
+AUTH_FLAG_FILE = "/tmp/hytale_auth_alert.flag"
+BACKUPS_DIR = "/backups"
+CATALOGO_BACKUPS = os.path.join(BACKUPS_DIR, "catalogo.jsonl")
 
 if not TOKEN:
-    print("ERRO: DISCORD_TOKEN não configurado")
+    log.critical("DISCORD_TOKEN não configurado")
     sys.exit(1)
 
 if not CHANNEL_ID_STR:
-    print("ERRO: DISCORD_CHANNEL_ID não configurado")
+    log.critical("DISCORD_CHANNEL_ID não configurado")
     sys.exit(1)
 
 try:
     CHANNEL_ID = int(CHANNEL_ID_STR)
 except ValueError:
-    print("ERRO: DISCORD_CHANNEL_ID inválido")
+    log.critical("DISCORD_CHANNEL_ID inválido")
     sys.exit(1)
 
-intents = discord.Intents.default()
-client = discord.Client(intents=intents)
-
-status_message_id = None
-ultimo_status = None
-ultimo_estado_geral = None
-loop_iniciado = False
+# Canal opcional do painel de uptime (antigo backup_bot.py)
+UPTIME_CHANNEL_ID_STR = os.getenv("DISCORD_UPTIME_CHANNEL_ID")
+UPTIME_CHANNEL_ID = None
 
-# =======================
-# LOAD MESSAGE ID
-# =======================
-
-if os.path.exists(STATUS_FILE):
-    try:
-        with open(STATUS_FILE) as f:
-            status_message_id = int(f.read().strip())
-            print("[DEBUG] status_message_id carregado:", status_message_id)
-    except Exception as e:
-        print("[DEBUG] Falha ao carregar status_message_id:", e)
-
-# =======================
-# CHECKS
-# =======================
-
-async def checar_cloudflare():
+if UPTIME_CHANNEL_ID_STR:
     try:
-        loop = asyncio.get_event_loop()
-
-        def dns_lookup():
-            try:
-                socket.getaddrinfo("norhytale.com", None)
-                return True
-            except Exception as e:
-                print("[DEBUG] Cloudflare DNS falhou:", e)
-                return False
-
-        return await loop.run_in_executor(None, dns_lookup)
-    except Exception as e:
-        print("[DEBUG] Erro geral Cloudflare:", e)
-        return False
+        UPTIME_CHANNEL_ID = int(UPTIME_CHANNEL_ID_STR)
+    except ValueError:
+        log.critical("DISCORD_UPTIME_CHANNEL_ID inválido")
+        sys.exit(1)
+
+# Uptime Kuma: leitura da status page e push das probes do bot
+KUMA_URL = os.getenv("KUMA_URL", "http://uptime-kuma:3001")
+KUMA_API_KEY = os.getenv("KUMA_API_KEY")
+KUMA_MONITOR_ID = os.getenv("KUMA_MONITOR_ID", "1")
+KUMA_STATUS_SLUG = os.getenv("KUMA_STATUS_SLUG")
+# Monitores Push do Kuma por check, ex.: "cloudflare=abc123,hytale=def456"
+KUMA_PUSH_TOKENS = ler_tokens_push(os.getenv("KUMA_PUSH_TOKENS"))
+
+if not KUMA_API_KEY or KUMA_API_KEY == "sua_api_key_aqui":
+    KUMA_API_KEY = None
 
+try:
+    KUMA_MONITOR_ID = int(KUMA_MONITOR_ID)
+except ValueError:
+    log.warning("KUMA_MONITOR_ID inválido, uptime do Kuma desativado")
+    KUMA_MONITOR_ID = None
 
-async def checar_docker():
-    try:
-        loop = asyncio.get_event_loop()
+# Porta do /metrics (Prometheus); 0 desativa
+try:
+    METRICS_PORT = int(os.getenv("METRICS_PORT", str(METRICS_PORTA_PADRAO)))
+except ValueError:
+    log.warning("METRICS_PORT inválido, usando a porta padrão")
+    METRICS_PORT = METRICS_PORTA_PADRAO
 
-        def tcp_check():
-            try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(5)
-                result = sock.connect_ex(("192.168.1.13", 22))
-                sock.close()
-                return result == 0
-            except Exception as e:
-                print("[DEBUG] Docker Host TCP erro:", e)
-                return False
+intents = discord.Intents.default()
+client = discord.Client(intents=intents)
+docker = DockerAPI()
+agendador = AgendadorProbes()
+prober = ProberRede()
+prober_quic = ProberQuic()
+kuma = ClienteKuma(KUMA_URL, KUMA_STATUS_SLUG, KUMA_API_KEY)
+indice_backups = IndiceBackups(BACKUPS_DIR)
+catalogo_backups = Catalogo(CATALOGO_BACKUPS)
+observador = ObservadorArquivos()
+lock_atualizacao = asyncio.Lock()
+
+# Servidores monitorados (servers.toml ou só o hytale-server)
+try:
+    instancias = [Instancia(config, docker) for config in carregar_configs(SERVERS_CONFIG, CHANNEL_ID)]
+except Exception as e:
+    log.critical("Configuração de instâncias inválida: %s", e)
+    sys.exit(1)
 
-        return await loop.run_in_executor(None, tcp_check)
-    except Exception as e:
-        print("[DEBUG] Erro geral Docker Host:", e)
-        return False
+publicador_uptime = PublicadorEmbed("uptime_message_id.txt") if UPTIME_CHANNEL_ID else None
 
+monitor_containers = MonitorContainers(
+    docker,
+    list(dict.fromkeys([inst.config.container for inst in instancias] + ["uptime-kuma"]))
+)
 
-async def checar_network():
-    try:
-        loop = asyncio.get_event_loop()
+# Última resposta DNS por domínio
+respostas_dns = {}
+loop_iniciado = False
 
-        def net_check():
-            try:
-                # Ping no IP externo - se falhar, IP pode ter mudado
-                result = subprocess.run(
-                    ["ping", "-c", "1", "-W", "5", "143.202.133.128"],
-                    capture_output=True,
-                    timeout=10
-                )
-                return result.returncode == 0
-            except Exception as e:
-                print("[DEBUG] Network ping erro:", e)
-                return False
+# =======================
+# CHECKS
+# =======================
 
-        return await loop.run_in_executor(None, net_check)
-    except Exception as e:
-        print("[DEBUG] Erro geral Network:", e)
-        return False
+contexto_checks = ContextoChecks(docker, prober, prober_quic, resolvedor, respostas_dns)
 
 
-async def checar_hytale_server():
-    try:
-        result = subprocess.run(
-            ["docker", "inspect", "-f", "{{.State.Running}}", "hytale-server"],
-            capture_output=True,
-            text=True
-        )
+# Uma probe por alvo, com o intervalo (s) e prazo máximo (s) do check
+for inst in instancias:
+    for check in CHECKS:
+        chave = check.chave(inst.config)
+        # Instâncias no mesmo host/domínio compartilham a mesma probe
+        if chave not in agendador.probes:
+            agendador.registrar(
+                chave,
+                partial(check.func, contexto_checks, inst.config),
+                intervalo=check.intervalo,
+                timeout=check.timeout
+            )
 
-        print("[DEBUG] docker inspect stdout:", result.stdout.strip())
-        print("[DEBUG] docker inspect stderr:", result.stderr.strip())
-        print("[DEBUG] docker inspect returncode:", result.returncode)
 
-        return result.stdout.strip() == "true"
+# =======================
+# METRICS
+# =======================
 
-    except FileNotFoundError:
-        print("[DEBUG] Docker não encontrado no container do bot")
-        return False
-    except Exception as e:
-        print("[DEBUG] Erro ao checar hytale-server:", e)
-        return False
+servidor_metricas = ServidorMetricas(registro, METRICS_PORT) if METRICS_PORT else None
+
+metrica_probe = registro.histograma("hytale_bot_probe_duration_seconds", "Duração de cada probe")
+metrica_probe_falhas = registro.contador("hytale_bot_probe_failures_total", "Probes que falharam ou excederam o prazo")
+metrica_probe_ok = registro.gauge("hytale_bot_probe_up", "Último resultado de cada probe (1 = ok)")
+metrica_tick = registro.histograma("hytale_bot_tick_duration_seconds", "Duração de cada tick do checar_status")
+metrica_discord = registro.histograma("hytale_bot_discord_api_duration_seconds", "Duração das chamadas REST do Discord")
+for inst in instancias:
+    metrica_discord.vincular(inst.publicador.latencia_api, painel=inst.config.id)
+if publicador_uptime is not None:
+    metrica_discord.vincular(publicador_uptime.latencia_api, painel="uptime")
+registro.histograma("hytale_bot_dns_duration_seconds", "Duração das consultas DNS").vincular(resolvedor.latencias)
+metrica_gc = registro.histograma("hytale_jvm_gc_pause_seconds", "Pausas de GC da JVM", buckets=BUCKETS_PAUSA)
+for inst in instancias:
+    metrica_gc.vincular(inst.recursos.histograma_pausas, instancia=inst.config.id)
+
+
+def observar_probe(nome, valor, latencia, erro):
+    metrica_probe_ok.definir(1 if valor else 0, probe=nome)
+    if latencia is not None:
+        metrica_probe.observar(latencia, probe=nome)
+    if erro is not None or not valor:
+        metrica_probe_falhas.inc(probe=nome)
+
+
+agendador.ao_publicar(observar_probe)
+
+
+@registro.coletor
+def coletar_metricas(reg):
+    paineis = [(inst.config.id, inst.publicador) for inst in instancias]
+    if publicador_uptime is not None:
+        paineis.append(("uptime", publicador_uptime))
+    for painel, publicador in paineis:
+        reg.contador("hytale_bot_discord_rate_limits_total", "Respostas 429 do Discord").definir(publicador.rate_limits, painel=painel)
+        reg.contador("hytale_bot_discord_budget_wait_seconds_total", "Tempo segurando edições pelo orçamento do canal").definir(publicador.espera_orcamento, painel=painel)
+        reg.contador("hytale_bot_embed_edits_total", "Edições de embed enviadas").definir(publicador.edicoes, painel=painel)
+        reg.contador("hytale_bot_embed_skipped_total", "Renders ignorados por não mudarem o embed").definir(publicador.ignoradas, painel=painel)
+
+    if client.is_ready() and not math.isnan(client.latency):
+        reg.gauge("hytale_bot_discord_gateway_latency_seconds", "Latência do heartbeat do gateway").definir(client.latency)
+
+    for inst in instancias:
+        cfg = inst.config
+        reg.gauge("hytale_players_online", "Players online").definir(len(inst.rastreador_players.online), instancia=cfg.id)
+        reg.contador("hytale_bot_log_lines_total", "Linhas de log processadas").definir(inst.seguidor_logs.linhas_processadas, instancia=cfg.id)
+        reg.gauge("hytale_bot_log_stream_connected", "Stream de logs conectado").definir(1 if inst.seguidor_logs.conectado else 0, instancia=cfg.id)
+
+    for inst in instancias:
+        cfg = inst.config
+        recursos = inst.recursos
+        ultima = recursos.ultima
+        if ultima is not None:
+            reg.gauge("hytale_container_cpu_percent", "CPU do container (100 = um núcleo)").definir(ultima.cpu, instancia=cfg.id)
+            reg.gauge("hytale_container_memory_bytes", "Memória usada sem page cache inativo").definir(ultima.memoria, instancia=cfg.id)
+            reg.gauge("hytale_container_memory_limit_bytes", "Limite de memória do container").definir(ultima.limite_memoria, instancia=cfg.id)
+            reg.contador("hytale_container_network_receive_bytes_total", "Bytes recebidos").definir(ultima.rx_bytes, instancia=cfg.id)
+            reg.contador("hytale_container_network_transmit_bytes_total", "Bytes enviados").definir(ultima.tx_bytes, instancia=cfg.id)
+        if recursos.pausas:
+            pausa = recursos.pausas[-1]
+            reg.gauge("hytale_jvm_heap_after_gc_bytes", "Heap ocupado após o último GC").definir(pausa.heap_depois, instancia=cfg.id)
+            reg.gauge("hytale_jvm_heap_committed_bytes", "Heap total no último GC").definir(pausa.heap_total, instancia=cfg.id)
+
+    # Janela deslizante das probes de rede por alvo (icmp:HOST, tcp:HOST:PORTA, quic:HOST:PORTA)
+    exportar_janela_probes(reg, prober.estatisticas)
+    exportar_janela_probes(reg, prober_quic.estatisticas)
+    for alvo, versoes in prober_quic.versoes.items():
+        for versao in versoes:
+            reg.gauge("hytale_quic_supported_version_info", "Versões QUIC anunciadas na Version Negotiation").definir(1, alvo=alvo, versao=f"0x{versao:08x}")
+
+    for nome, reinicios in monitor_containers.reinicios.items():
+        reg.contador("hytale_container_restarts_total", "Reinícios do container").definir(reinicios, container=nome)
+        reg.gauge("hytale_container_running", "Container rodando").definir(1 if monitor_containers.rodando[nome] else 0, container=nome)
+
+
+def exportar_janela_probes(reg, estatisticas):
+    """RTT p50/p95/p99, jitter e perda de cada alvo (EstatisticasProbe.resumo)"""
+    for alvo, janela in estatisticas.items():
+        resumo = janela.resumo()
+        for quantil, chave in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99")):
+            if resumo[chave] is not None:
+                reg.gauge("hytale_bot_probe_rtt_seconds", "RTT das probes na janela deslizante").definir(resumo[chave], alvo=alvo, quantil=quantil)
+        if resumo["jitter"] is not None:
+            reg.gauge("hytale_bot_probe_jitter_seconds", "Jitter das probes na janela deslizante").definir(resumo["jitter"], alvo=alvo)
+        reg.gauge("hytale_bot_probe_loss_ratio", "Fração de probes sem resposta na janela").definir(resumo["perda"], alvo=alvo)
+
+
+def atualizar_container(nome, rodando):
+    """Callback do MonitorContainers: repassa o estado para o snapshot"""
+    chave = f"container:{nome}"
+    if chave in agendador.probes:
+        agendador.publicar(chave, rodando)
+
+
+monitor_containers.ao_mudar(atualizar_container)
 
 
 def obter_ultimo_backup():
     try:
-        import glob
-        backups_dir = "/backups"
-
-        if not os.path.exists(backups_dir):
-            return "Nenhum backup encontrado"
-
-        # Lista todos os arquivos de backup (formato: DD-MM-YYYY_HHhMM.tar.gz)
-        backups = glob.glob(f"{backups_dir}/*.tar.gz")
+        if catalogo_backups.existe():
+            # Catálogo: lê só o fim do catalogo.jsonl, sem listar o diretório
+            registro_backup = catalogo_backups.ultimo()
+            ultimo_backup = (registro_backup.nome, registro_backup.criado) if registro_backup else None
+        else:
+            # Índice incremental: só arquivos novos recebem stat (formato: DD-MM-YYYY_HHhMM.tar.gz)
+            ultimo_backup = indice_backups.mais_recente()
 
-        if not backups:
+        if ultimo_backup is None:
             return "Nenhum backup encontrado"
 
-        # Pega o backup mais recente
-        ultimo_backup = max(backups, key=os.path.getmtime)
-        timestamp = os.path.getmtime(ultimo_backup)
+        _, timestamp = ultimo_backup
 
         # Usa timezone de São Paulo
         tz = ZoneInfo("America/Sao_Paulo")
@@ -167,231 +275,78 @@ def obter_ultimo_backup():
         return data_backup.strftime("%d/%m/%Y às %H:%M")
 
     except Exception as e:
-        print("[DEBUG] Erro ao obter último backup:", e)
+        log.warning("Erro ao obter último backup: %s", e)
         return "Erro ao verificar"
 
 
-def obter_versao_servidor():
+def obter_versao_servidor(inst):
     try:
-        import zipfile
-        # Extrai a versão do manifesto do JAR
-        jar_path = "/server/HytaleServer.jar"
-
-        if not os.path.exists(jar_path):
-            return "N/A"
-
-        # Lê o arquivo MANIFEST.MF do JAR
-        with zipfile.ZipFile(jar_path, 'r') as jar:
-            with jar.open('META-INF/MANIFEST.MF') as manifest:
-                manifest_content = manifest.read().decode('utf-8')
-
-        # Procura pela linha Implementation-Version
-        for line in manifest_content.split('\n'):
-            if line.startswith("Implementation-Version:"):
-                version = line.split(":", 1)[1].strip()
-                return version
-
-        return "N/A"
+        # Extrai a versão do manifesto do JAR (relido só quando o JAR muda)
+        return inst.manifesto.obter() or "N/A"
 
     except Exception as e:
-        print("[DEBUG] Erro ao obter versão do servidor:", e)
+        log.warning("Erro ao obter versão do servidor: %s", e)
         return "N/A"
 
 
-def verificar_autenticacao():
-    """Verifica se o servidor precisa de autenticação"""
-    try:
-        # Verifica os últimos logs do servidor (aumentado para capturar mensagens antigas de boot)
-        result = subprocess.run(
-            ["docker", "logs", "--tail", "2000", "hytale-server"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
+# =======================
+# ESTADO DAS INSTÂNCIAS
+# =======================
 
-        logs = result.stdout + result.stderr
-        logs_lower = logs.lower()
-
-        # Padrões críticos que indicam necessidade de autenticação
-        padroes_criticos = [
-            "session token not available",
-            "make sure to auth first",
-            "authentication unavailable",
-            "auth required",
-            "no server tokens configured"
-        ]
-
-        # Padrões que indicam autenticação bem-sucedida
-        padroes_sucesso = [
-            "selected profile:",
-            "authentication successful",
-            "authenticated as",
-            "logged in as",
-            "found 2 game profile(s)",
-            "found 1 game profile(s)",
-            "multiple profiles available"
-        ]
-
-        # Verifica se há mensagens de sucesso (autenticação foi feita)
-        tem_sucesso = any(padrao_sucesso in logs_lower for padrao_sucesso in padroes_sucesso)
-
-        # Verifica padrões críticos de erro
-        tem_erro_auth = False
-
-        if tem_sucesso:
-            # Se há evidências de autenticação bem-sucedida, verifica se está aguardando seleção de perfil
-            if "multiple profiles available" in logs_lower and "selected profile:" not in logs_lower:
-                print("[DEBUG] Autenticação OK mas aguardando seleção de perfil")
-                tem_erro_auth = False  # Não é erro de autenticação, apenas precisa selecionar perfil
-            else:
-                print("[DEBUG] Autenticação bem-sucedida detectada - ignorando erros antigos")
-                tem_erro_auth = False
-        else:
-            # Só verifica erros se não há evidências de sucesso
-            for padrao in padroes_criticos:
-                if padrao in logs_lower:
-                    print(f"[DEBUG] Padrão de erro '{padrao}' encontrado sem evidência de sucesso")
-                    tem_erro_auth = True
-                    break
-
-        # Verifica se há muitos erros de handshake (indica problema de auth)
-        tem_erro_handshake = False
-        contador_handshake = logs_lower.count("handshakehandler")
-        if contador_handshake >= 5:
-            # Verifica se não há mensagens de autenticação bem-sucedida
-            if "authenticated" not in logs_lower and "login successful" not in logs_lower:
-                tem_erro_handshake = True
-
-        # Se encontrou erros reais nos logs, retorna erro
-        if tem_erro_auth:
-            return "⚠️ Necessária", "Use: /auth login device"
-
-        if tem_erro_handshake:
-            return "⚠️ Atenção", "Possível problema de auth"
-
-        # Se não há erros nos logs, limpa flag antiga se existir
-        try:
-            if os.path.exists("/tmp/hytale_auth_alert.flag"):
-                os.remove("/tmp/hytale_auth_alert.flag")
-                print("[DEBUG] Flag de alerta removida - autenticação OK confirmada pelos logs")
-        except Exception as e:
-            print(f"[DEBUG] Não foi possível remover flag: {e}")
+def verificar_autenticacao(inst):
+    """Verifica se o servidor precisa de autenticação (último evento de auth nos logs)"""
+    maquina_auth = inst.maquina_auth
+    try:
+        status_auth, detalhes_auth = maquina_auth.resultado()
 
-        return "✅ OK", ""
+        if maquina_auth.estado == NECESSARIA:
+            log.debug("Autenticação necessária: %s", maquina_auth.ultimo_erro)
+        elif maquina_auth.estado == AGUARDANDO_PERFIL:
+            log.debug("Autenticação OK mas aguardando seleção de perfil")
 
-    except subprocess.TimeoutExpired:
-        print("[DEBUG] Timeout ao verificar autenticação")
-        return "⚠️ Timeout", ""
-    except Exception as e:
-        print("[DEBUG] Erro ao verificar autenticação:", e)
-        return "❓ Erro", ""
+        # Se não há erros nos logs, limpa flag antiga se existir (flag é do servidor principal)
+        if "✅" in status_auth and inst is instancias[0]:
+            try:
+                if flag_auth_existe:
+                    os.remove(AUTH_FLAG_FILE)
+                    log.info("Flag de alerta removida - autenticação OK confirmada pelos logs")
+            except Exception as e:
+                log.warning("Não foi possível remover flag: %s", e)
 
+        return status_auth, detalhes_auth
 
-def carregar_estado_players():
-    """Carrega o estado persistente dos jogadores online"""
-    try:
-        if os.path.exists(PLAYERS_STATE_FILE):
-            with open(PLAYERS_STATE_FILE, 'r') as f:
-                return set(json.load(f))
-        return set()
     except Exception as e:
-        print(f"[DEBUG] Erro ao carregar estado de players: {e}")
-        return set()
+        log.warning("Erro ao verificar autenticação: %s", e)
+        return "❓ Erro", ""
 
 
-def salvar_estado_players(players_set):
-    """Salva o estado persistente dos jogadores online"""
-    try:
-        with open(PLAYERS_STATE_FILE, 'w') as f:
-            json.dump(list(players_set), f)
-        print(f"[DEBUG] Estado salvo: {list(players_set)}")
-    except Exception as e:
-        print(f"[DEBUG] Erro ao salvar estado de players: {e}")
+def obter_players_online(inst):
+    """Retorna os players online mantidos pelo RastreadorPlayers"""
+    players_list = inst.rastreador_players.nomes
 
+    # Retorna contagem, lista de nomes, e max players
+    return len(players_list), players_list, inst.config.max_players
 
-def obter_players_online():
-    """Obtém a lista de players atualmente online no servidor usando estado persistente"""
-    try:
-        # Carrega estado anterior (quem estava online)
-        players_online = carregar_estado_players()
 
-        print(f"[DEBUG] Estado carregado: {list(players_online)}")
+def formatar_gb(valor):
+    return f"{valor / 1024 ** 3:.1f}"
 
-        # Se a lista está vazia (primeira execução ou servidor reiniciou),
-        # processa histórico completo para detectar quem está online
-        if len(players_online) == 0:
-            print("[DEBUG] ⚠️ Lista vazia - processando histórico completo")
-            tail_lines = "2000"
-        else:
-            tail_lines = "200"
 
-        result = subprocess.run(
-            ["docker", "logs", "--tail", tail_lines, "hytale-server"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
+def obter_recursos(inst):
+    """Linha de CPU/memória/GC do container, ou None sem amostras"""
+    resumo = inst.recursos.resumo()
+    if resumo["cpu"] is None:
+        return None
 
-        logs = result.stdout + result.stderr
-        lines = logs.split('\n')
-
-        # Detecta reinicialização do servidor
-        # Se o servidor reiniciou, reseta a lista de players
-        if "Starting Hytale server" in logs or "Server started" in logs:
-            print("[DEBUG] ⚠️ Servidor reiniciou - resetando lista de players")
-            players_online = set()
-
-        # Processa apenas mudanças recentes
-        for line in lines:
-            # Padrão: [Universe|P] Adding player 'nome (uuid)'
-            if "[Universe|P] Adding player" in line:
-                try:
-                    # Extrai o nome: começa após ' e termina antes de ' ('
-                    start = line.find("'") + 1
-                    end = line.find(" (", start)
-                    if start > 0 and end > start:
-                        player_name = line[start:end].strip()
-                        if player_name not in players_online:
-                            players_online.add(player_name)
-                            print(f"[DEBUG] ✅ Player conectou: {player_name}")
-                except Exception as e:
-                    print(f"[DEBUG] Erro ao parsear Adding: {line[:100]}", e)
-
-            # Padrão: [Universe|P] Removing player 'nome' (uuid)
-            elif "[Universe|P] Removing player" in line:
-                try:
-                    # Extrai o nome entre aspas simples (formato: 'nome')
-                    start = line.find("'") + 1
-                    end = line.find("'", start)
-                    if start > 0 and end > start:
-                        player_name = line[start:end].strip()
-                        if player_name in players_online:
-                            players_online.discard(player_name)
-                            print(f"[DEBUG] ❌ Player desconectou: {player_name}")
-                except Exception as e:
-                    print(f"[DEBUG] Erro ao parsear Removing: {line[:100]}", e)
-
-        # Salva estado atualizado
-        salvar_estado_players(players_online)
-
-        # Retorna contagem, lista de nomes, e max players
-        players_list = sorted(list(players_online))
-        count = len(players_list)
-
-        print(f"[DEBUG] Players online: {count} - {players_list}")
-
-        return count, players_list, 100  # max_players = 100
-
-    except subprocess.TimeoutExpired:
-        print("[DEBUG] Timeout ao obter players online")
-        # Em caso de timeout, retorna estado anterior
-        players_online = carregar_estado_players()
-        return len(players_online), sorted(list(players_online)), 100
-    except Exception as e:
-        print("[DEBUG] Erro ao obter players online:", e)
-        # Em caso de erro, retorna estado anterior
-        players_online = carregar_estado_players()
-        return len(players_online), sorted(list(players_online)), 100
+    # Valores arredondados para o embed não mudar a cada amostra
+    partes = [f"CPU {round(resumo['cpu'] / 5) * 5:.0f}%"]
+    if resumo["limite_memoria"]:
+        partes.append(f"RAM {formatar_gb(resumo['memoria'])}/{formatar_gb(resumo['limite_memoria'])} GB")
+    if resumo["heap_pos_gc"] is not None:
+        partes.append(f"Heap pós-GC {formatar_gb(resumo['heap_pos_gc'])}/{formatar_gb(resumo['heap_total'])} GB")
+    if resumo["gc_p99"] is not None:
+        partes.append(f"GC p99 {resumo['gc_p99'] * 1000:.0f} ms")
+    return " · ".join(partes)
 
 
 def esta_em_manutencao():
@@ -403,17 +358,92 @@ def esta_em_manutencao():
             return True, motivo if motivo else "Manutenção em andamento"
         return False, ""
     except Exception as e:
-        print("[DEBUG] Erro ao verificar manutenção:", e)
+        log.warning("Erro ao verificar manutenção: %s", e)
         return False, ""
 
 
+# =======================
+# WATCH
+# =======================
+
+# Valores mantidos pelo observador de arquivos em vez de stat a cada tick
+manutencao_atual = esta_em_manutencao()
+flag_auth_existe = os.path.exists(AUTH_FLAG_FILE)
+ultimo_backup_atual = obter_ultimo_backup()
+atualizacao_agendada = False
+
+
+def agendar_atualizacao():
+    """Atualiza o embed imediatamente, sem esperar o próximo tick"""
+    global atualizacao_agendada
+
+    if atualizacao_agendada or not loop_iniciado:
+        return
+
+    async def executar():
+        global atualizacao_agendada
+        try:
+            await atualizar_status()
+        except Exception:
+            log.exception("Erro na atualização imediata")
+        finally:
+            atualizacao_agendada = False
+
+    atualizacao_agendada = True
+    asyncio.create_task(executar())
+
+
+def ao_mudar_flag(caminho):
+    global manutencao_atual, flag_auth_existe
+
+    if caminho == MAINTENANCE_FILE:
+        manutencao_atual = esta_em_manutencao()
+        log.info("Manutenção: %s", manutencao_atual)
+    elif caminho == AUTH_FLAG_FILE:
+        flag_auth_existe = os.path.exists(AUTH_FLAG_FILE)
+        log.info("Flag de autenticação: %s", flag_auth_existe)
+    agendar_atualizacao()
+
+
+def ao_mudar_nivel_log(caminho):
+    try:
+        nivel = definir_nivel(ler_nivel(caminho, LOG_LEVEL))
+    except ValueError as e:
+        log.warning("%s", e)
+        return
+    log.warning("Nível de log alterado para %s", nivel)
+
+
+def ao_mudar_backup(caminho):
+    global ultimo_backup_atual
+
+    ultimo_backup_atual = obter_ultimo_backup()
+    log.info("Backups alterados: %s", os.path.basename(caminho))
+    agendar_atualizacao()
+
+
+observador.observar(os.path.dirname(MAINTENANCE_FILE), os.path.basename(MAINTENANCE_FILE), ao_mudar_flag)
+observador.observar(os.path.dirname(AUTH_FLAG_FILE), os.path.basename(AUTH_FLAG_FILE), ao_mudar_flag)
+observador.observar(BACKUPS_DIR, "*.tar.gz", ao_mudar_backup)
+observador.observar(BACKUPS_DIR, os.path.basename(CATALOGO_BACKUPS), ao_mudar_backup)
+observador.observar(os.path.dirname(LOG_LEVEL_FILE), os.path.basename(LOG_LEVEL_FILE), ao_mudar_nivel_log)
+
+
 # =======================
 # EMBED
 # =======================
 
-def criar_embed(status, tudo_ok):
+def indicador_hytale(status):
+    if not status['hytale']:
+        return "🔴"
+    return "🟢" if status['quic'] else "🟡"
+
+
+def criar_embed(inst, status, tudo_ok):
+    cfg = inst.config
+
     # Verifica se está em manutenção
-    em_manutencao, motivo_manutencao = esta_em_manutencao()
+    em_manutencao, motivo_manutencao = status['manutencao']
 
     # Prepara status de autenticação
     if em_manutencao:
@@ -427,9 +457,14 @@ def criar_embed(status, tudo_ok):
         else:
             auth_status = "⚠️"
 
+    # Sinaliza quando o domínio deixou de apontar para o IP esperado
+    nota_dns = " (IP divergente)" if status.get('dns_divergente') else ""
+    # Container de pé mas sem responder na porta do jogo
+    nota_quic = " (sem resposta QUIC)" if status['hytale'] and not status['quic'] else ""
+
     if em_manutencao:
         embed = discord.Embed(
-            title="NOR Infrastructure",
+            title=cfg.titulo,
             description=f"🔧 **MANUTENÇÃO EM ANDAMENTO**\n\n{motivo_manutencao}",
             color=discord.Color.from_rgb(59, 130, 246),  # Azul
             timestamp=datetime.now(ZoneInfo("America/Sao_Paulo"))
@@ -439,7 +474,7 @@ def criar_embed(status, tudo_ok):
             name="Serviços Monitorados",
             value=(
                 f"🔵 Cloudflare DNS\n"
-                f"🔵 Docker Host\n"
+                f"🔵 Docker Engine\n"
                 f"🔵 Network\n"
                 f"🔵 Hytale Server\n"
                 f"🔵 Autenticação"
@@ -448,7 +483,7 @@ def criar_embed(status, tudo_ok):
         )
     elif tudo_ok:
         embed = discord.Embed(
-            title="NOR Infrastructure",
+            title=cfg.titulo,
             description="Todos os serviços estão operando normalmente.",
             color=discord.Color.from_rgb(34, 197, 94),
             timestamp=datetime.now(ZoneInfo("America/Sao_Paulo"))
@@ -456,17 +491,17 @@ def criar_embed(status, tudo_ok):
         embed.add_field(
             name="Serviços Monitorados",
             value=(
-                f"{'🟢' if status['cloudflare'] else '🔴'} Cloudflare DNS\n"
-                f"{'🟢' if status['docker'] else '🔴'} Docker Host\n"
+                f"{'🟢' if status['cloudflare'] else '🔴'} Cloudflare DNS{nota_dns}\n"
+                f"{'🟢' if status['docker'] else '🔴'} Docker Engine\n"
                 f"{'🟢' if status['network'] else '🔴'} Network\n"
-                f"{'🟢' if status['hytale'] else '🔴'} Hytale Server\n"
+                f"{indicador_hytale(status)} Hytale Server{nota_quic}\n"
                 f"{auth_status} Autenticação"
             ),
             inline=False
         )
     else:
         embed = discord.Embed(
-            title="NOR Infrastructure",
+            title=cfg.titulo,
             description="Um ou mais serviços estão indisponíveis.",
             color=discord.Color.from_rgb(239, 68, 68),
             timestamp=datetime.now(ZoneInfo("America/Sao_Paulo"))
@@ -474,10 +509,10 @@ def criar_embed(status, tudo_ok):
         embed.add_field(
             name="Serviços Monitorados",
             value=(
-                f"{'🟢' if status['cloudflare'] else '🔴'} Cloudflare DNS\n"
-                f"{'🟢' if status['docker'] else '🔴'} Docker Host\n"
+                f"{'🟢' if status['cloudflare'] else '🔴'} Cloudflare DNS{nota_dns}\n"
+                f"{'🟢' if status['docker'] else '🔴'} Docker Engine\n"
                 f"{'🟢' if status['network'] else '🔴'} Network\n"
-                f"{'🟢' if status['hytale'] else '🔴'} Hytale Server\n"
+                f"{indicador_hytale(status)} Hytale Server{nota_quic}\n"
                 f"{auth_status} Autenticação"
             ),
             inline=False
@@ -486,7 +521,7 @@ def criar_embed(status, tudo_ok):
     embed.add_field(
         name="IP Servidor",
         value=(
-            "norhytale.com\n"
+            f"{cfg.dominio}\n"
         ),
         inline=False
     )
@@ -494,20 +529,20 @@ def criar_embed(status, tudo_ok):
     embed.add_field(
         name="IP Servidor(Reserva)",
         value=(
-            "143.202.133.128:5520\n"
+            f"{cfg.ip_publico}:{cfg.porta}\n"
         ),
         inline=False
     )
 
     embed.add_field(
         name="Monitoramento",
-        value="https://status.norhytale.com",
+        value=cfg.monitoramento,
         inline=False
     )
 
-    # Informações adicionais
-    ultimo_backup = obter_ultimo_backup()
-    versao_servidor = obter_versao_servidor()
+    # Informações adicionais (já calculadas no tick)
+    ultimo_backup = status['ultimo_backup']
+    versao_servidor = status['versao']
 
     embed.add_field(
         name="Último Backup",
@@ -544,6 +579,13 @@ def criar_embed(status, tudo_ok):
             inline=False
         )
 
+    if not em_manutencao and status['hytale'] and status['recursos']:
+        embed.add_field(
+            name="Recursos",
+            value=status['recursos'],
+            inline=False
+        )
+
     #embed.set_image(url="https://hytale.com/static/images/logo.png")
     embed.set_image(url="https://i.ibb.co/NdsxQwB7/NOR-Hytale-Logo.png")
     embed.set_footer(text="Monitoramento automático | NOR")
@@ -551,66 +593,163 @@ def criar_embed(status, tudo_ok):
     return embed
 
 
+def criar_embed_uptime(inst, status, monitor_kuma=None):
+    """Painel compacto de uptime (antes publicado pelo backup_bot.py)"""
+    cfg = inst.config
+    servicos = [status['cloudflare'], status['docker'], status['network']]
+
+    embed = discord.Embed(
+        title="🔄 Uptime Status",
+        color=discord.Color.green() if all(servicos) else discord.Color.red(),
+        timestamp=datetime.now(ZoneInfo("America/Sao_Paulo"))
+    )
+
+    embed.add_field(
+        name="📊 Serviços",
+        value=(
+            f"{'🟢' if status['cloudflare'] else '🔴'} NOR Cloudflare\n"
+            f"{'🟢' if status['docker'] else '🔴'} NOR Docker\n"
+            f"{'🟢' if status['network'] else '🔴'} NOR Network"
+        ),
+        inline=False
+    )
+
+    embed.add_field(
+        name="🌐 IPs",
+        value=f"{cfg.dominio}:{cfg.porta}\n{cfg.ip_publico}:{cfg.porta}",
+        inline=False
+    )
+
+    embed.add_field(
+        name="📈 Monitoramento",
+        value=f"[{cfg.dominio}](https://{cfg.dominio})",
+        inline=False
+    )
+
+    # Uptime histórico vem do Kuma, que recebe os heartbeats das probes
+    if monitor_kuma is not None and monitor_kuma.uptime_24h is not None:
+        embed.add_field(
+            name="⏱️ Uptime 24h",
+            value=f"{monitor_kuma.uptime_24h * 100:.2f}% ({monitor_kuma.nome})",
+            inline=False
+        )
+
+    embed.set_footer(text="Atualizado")
+
+    return embed
+
+
 # =======================
 # LOOP
 # =======================
 
 @tasks.loop(seconds=30)
 async def checar_status():
-    global status_message_id, ultimo_status, ultimo_estado_geral
+    await atualizar_status()
 
-    canal = client.get_channel(CHANNEL_ID)
-    if not canal:
-        print("[DEBUG] Canal não encontrado")
-        return
 
-    status_atual = {
-        "cloudflare": await checar_cloudflare(),
-        "docker": await checar_docker(),
-        "network": await checar_network(),
-        "hytale": await checar_hytale_server(),
-        "ultimo_backup": obter_ultimo_backup(),
-        "versao": obter_versao_servidor(),
-        "autenticacao": verificar_autenticacao(),
-        "players": obter_players_online()
-    }
+async def atualizar_status():
+    # Tick do loop e atualizações imediatas do observador não podem se cruzar
+    async with lock_atualizacao:
+        inicio = time.monotonic()
+        try:
+            await _atualizar_status()
+        finally:
+            metrica_tick.observar(time.monotonic() - inicio)
 
-    # Verifica estado geral apenas dos serviços (exclui backup, versão, autenticação e players)
-    servicos = {k: v for k, v in status_atual.items() if k not in ["ultimo_backup", "versao", "autenticacao", "players"]}
-    estado_geral = all(servicos.values())
-    print("[DEBUG] Status atual:", status_atual)
 
-    if status_message_id is None:
-        embed = criar_embed(status_atual, estado_geral)
-        msg = await canal.send(embed=embed)
-        status_message_id = msg.id
+async def _atualizar_status():
+    # Uma rodada de probes alimenta todos os painéis; uma falha (Discord,
+    # Kuma, embed) fica na instância e não derruba o tasks.loop
+    for inst in instancias:
+        try:
+            await _atualizar_paineis(inst)
+        except Exception:
+            log.exception("Erro ao atualizar %s", inst.config.id)
+
 
-        with open(STATUS_FILE, "w") as f:
-            f.write(str(status_message_id))
+async def _atualizar_paineis(inst):
+    status = await atualizar_instancia(inst)
 
-        ultimo_status = status_atual.copy()
-        ultimo_estado_geral = estado_geral
-        print("[DEBUG] Mensagem inicial criada")
+    if inst is not instancias[0]:
         return
 
-    if status_atual != ultimo_status or estado_geral != ultimo_estado_geral:
-        embed = criar_embed(status_atual, estado_geral)
+    await enviar_heartbeats_kuma(inst)
 
-        try:
-            msg = await canal.fetch_message(status_message_id)
-            await msg.edit(embed=embed)
-            print("[DEBUG] Embed atualizado")
-        except discord.NotFound:
-            msg = await canal.send(embed=embed)
-            status_message_id = msg.id
+    if publicador_uptime is not None and status is not None:
+        canal_uptime = client.get_channel(UPTIME_CHANNEL_ID)
+        if canal_uptime:
+            embed = criar_embed_uptime(inst, status, await obter_monitor_kuma())
+            await publicador_uptime.publicar(canal_uptime, embed)
+        else:
+            log.warning("Canal de uptime %s não encontrado", UPTIME_CHANNEL_ID)
+
+
+async def enviar_heartbeats_kuma(inst):
+    """Repassa o snapshot das probes aos monitores Push do Kuma"""
+    if not KUMA_PUSH_TOKENS:
+        return
+
+    envios = []
+    for check in CHECKS:
+        token = KUMA_PUSH_TOKENS.get(check.nome)
+        if token is None:
+            continue
+        chave = check.chave(inst.config)
+        detalhes = agendador.detalhes[chave]
+        envios.append(kuma.push(
+            token,
+            agendador.snapshot[chave],
+            mensagem=detalhes["erro"] or "",
+            ping=detalhes["latencia"]
+        ))
+    await asyncio.gather(*envios)
+
+
+async def obter_monitor_kuma():
+    if KUMA_MONITOR_ID is None or not KUMA_STATUS_SLUG:
+        return None
+    try:
+        return await kuma.monitor(KUMA_MONITOR_ID)
+    except Exception as e:
+        log.warning("Erro ao consultar o Uptime Kuma: %s", e)
+        return None
 
-            with open(STATUS_FILE, "w") as f:
-                f.write(str(status_message_id))
 
-            print("[DEBUG] Mensagem recriada")
+async def atualizar_instancia(inst):
+    cfg = inst.config
+
+    canal = client.get_channel(cfg.canal_id)
+    if not canal:
+        log.warning("Canal %s não encontrado", cfg.canal_id)
+        return
+
+    resposta_dns = respostas_dns.get(cfg.dominio)
+    # Resultados dos checks de serviço ("cloudflare", "docker", "network", "hytale", "quic")
+    status_atual = {
+        check.nome: agendador.snapshot[check.chave(cfg)] for check in CHECKS if check.servico
+    }
+    status_atual.update({
+        "dns_divergente": bool(resposta_dns and resposta_dns.divergente),
+        "ultimo_backup": ultimo_backup_atual,
+        "manutencao": manutencao_atual,
+        "versao": obter_versao_servidor(inst),
+        "autenticacao": verificar_autenticacao(inst),
+        "players": obter_players_online(inst),
+        "recursos": obter_recursos(inst)
+    })
+
+    # Verifica estado geral apenas dos serviços (exclui backup, versão, autenticação, players, recursos, divergência de DNS e manutenção)
+    servicos = {k: v for k, v in status_atual.items() if k not in ["ultimo_backup", "versao", "autenticacao", "players", "recursos", "dns_divergente", "manutencao"]}
+    estado_geral = all(servicos.values())
+    log.debug("Status atual (%s): %s", cfg.id, status_atual)
+
+    # Só chama a API se o embed final mudou; rajadas viram uma única edição
+    embed = criar_embed(inst, status_atual, estado_geral)
+    await inst.publicador.publicar(canal, embed)
+
+    return status_atual
 
-        ultimo_status = status_atual.copy()
-        ultimo_estado_geral = estado_geral
 
 # =======================
 # START
@@ -621,11 +760,22 @@ async def on_ready():
     global loop_iniciado
 
     if loop_iniciado:
-        print("[DEBUG] on_ready chamado novamente, ignorado")
+        log.info("on_ready chamado novamente, ignorado")
         return
 
     loop_iniciado = True
-    print(f"Bot conectado como {client.user}")
+    log.info("Bot conectado como %s", client.user)
+    for inst in instancias:
+        inst.iniciar()
+    await agendador.iniciar()
+    monitor_containers.iniciar()
+    observador.iniciar()
+    if servidor_metricas is not None:
+        try:
+            await servidor_metricas.iniciar()
+        except OSError as e:
+            log.error("Não foi possível abrir o /metrics na porta %s: %s", METRICS_PORT, e)
     checar_status.start()
 
-client.run(TOKEN)
+# O logging já foi configurado acima; sem isso o discord.py instala o próprio handler
+client.run(TOKEN, log_handler=None)
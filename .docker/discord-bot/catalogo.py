@@ -0,0 +1,461 @@
+import argparse
+import fcntl
+import fnmatch
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+
+# =======================
+# CATALOGO
+# =======================
+#
+# Catálogo persistente dos backups em JSON lines (backups/catalogo.jsonl).
+# Cada linha é um evento: "add" com o registro completo, "upd" com campos
+# alterados (remoto enviado, verificação) ou "del". Como backups entram em
+# ordem cronológica, o mais recente é achado lendo o arquivo de trás para
+# frente: na prática só as últimas linhas, sem glob nem stat nos arquivos.
+# A retenção GFS (horária/diária/semanal/mensal) calcula tudo o que sai de
+# uma vez, apaga local e remoto em lote e depois compacta o arquivo.
+#
+# Uso (scripts/backup.sh e .backup-auto.sh):
+#   python3 catalogo.py --catalogo backups/catalogo.jsonl listar
+#   python3 catalogo.py --catalogo backups/catalogo.jsonl importar-remoto rclone:gdrive:Backups/Hytale
+#   python3 catalogo.py --catalogo backups/catalogo.jsonl reter --diarios 7 --semanais 4
+
+NOME_PADRAO = "catalogo.jsonl"
+BLOCO_LEITURA = 1024 * 1024
+BLOCO_REVERSO = 8192
+
+
+@dataclass
+class RegistroBackup:
+    nome: str
+    caminho: str
+    tamanho: int
+    # Unix timestamp de criação
+    criado: float
+    conteudo: list = field(default_factory=list)
+    checksum: str = ""
+    # Destinos do upload.py onde o backup também está (ex.: rclone:gdrive:Backups/Hytale)
+    remotos: list = field(default_factory=list)
+    verificado_em: float = None
+    integro: bool = None
+
+    @classmethod
+    def de_evento(cls, evento):
+        campos = {k: v for k, v in evento.items() if k in cls.__dataclass_fields__}
+        return cls(**campos)
+
+
+def checksum_arquivo(caminho):
+    h = hashlib.blake2b(digest_size=32)
+    with open(caminho, "rb") as f:
+        while dados := f.read(BLOCO_LEITURA):
+            h.update(dados)
+    return "blake2b:" + h.hexdigest()
+
+
+def _linhas_reversas(caminho):
+    """Linhas do arquivo da última para a primeira, lendo blocos do fim"""
+    with open(caminho, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        posicao = f.tell()
+        resto = b""
+        while posicao > 0:
+            tamanho = min(BLOCO_REVERSO, posicao)
+            posicao -= tamanho
+            f.seek(posicao)
+            *linhas, resto_novo = (f.read(tamanho) + resto).split(b"\n")[::-1]
+            resto = resto_novo
+            for linha in linhas:
+                if linha.strip():
+                    yield linha
+        if resto.strip():
+            yield resto
+
+
+class Catalogo:
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._assinatura = None
+        self._ultimo = None
+
+    def existe(self):
+        return os.path.isfile(self.caminho)
+
+    @contextmanager
+    def _travado(self):
+        # Trava num arquivo à parte: a compactação troca o inode do catálogo
+        with open(self.caminho + ".lock", "w") as trava:
+            fcntl.flock(trava, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(trava, fcntl.LOCK_UN)
+
+    def _anexar(self, *eventos):
+        linhas = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in eventos)
+        with self._travado(), open(self.caminho, "a", encoding="utf-8") as f:
+            f.write(linhas)
+
+    def registrar(self, registro):
+        self._anexar({"op": "add", **asdict(registro)})
+
+    def atualizar(self, nome, **campos):
+        self._anexar({"op": "upd", "nome": nome, **campos})
+
+    def adicionar_remoto(self, nome, remoto):
+        registro = self.registros().get(nome)
+        if registro is not None and remoto not in registro.remotos:
+            self.atualizar(nome, remotos=registro.remotos + [remoto])
+
+    def registros(self):
+        """Estado atual: nome -> RegistroBackup, do mais antigo para o mais recente"""
+        registros = {}
+        if not self.existe():
+            return registros
+        with open(self.caminho, encoding="utf-8") as f:
+            for linha in f:
+                if not linha.strip():
+                    continue
+                evento = json.loads(linha)
+                nome = evento["nome"]
+                if evento["op"] == "add":
+                    registros[nome] = RegistroBackup.de_evento(evento)
+                elif evento["op"] == "upd" and nome in registros:
+                    for chave, valor in evento.items():
+                        if chave in RegistroBackup.__dataclass_fields__ and chave != "nome":
+                            setattr(registros[nome], chave, valor)
+                elif evento["op"] == "del":
+                    registros.pop(nome, None)
+        return dict(sorted(registros.items(), key=lambda item: item[1].criado))
+
+    def ultimo(self):
+        """Backup mais recente, lendo só o fim do arquivo (e só se ele mudou)"""
+        try:
+            st = os.stat(self.caminho)
+        except FileNotFoundError:
+            return None
+        assinatura = (st.st_mtime_ns, st.st_size)
+        if assinatura == self._assinatura:
+            return self._ultimo
+
+        apagados = set()
+        atualizacoes = {}
+        ultimo = None
+        for linha in _linhas_reversas(self.caminho):
+            evento = json.loads(linha)
+            nome = evento["nome"]
+            if evento["op"] == "del":
+                apagados.add(nome)
+            elif evento["op"] == "upd":
+                atualizacoes.setdefault(nome, []).append(evento)
+            elif nome not in apagados:
+                ultimo = RegistroBackup.de_evento(evento)
+                # As atualizações foram lidas de trás para frente
+                for atualizacao in reversed(atualizacoes.get(nome, [])):
+                    for chave, valor in atualizacao.items():
+                        if chave in RegistroBackup.__dataclass_fields__ and chave != "nome":
+                            setattr(ultimo, chave, valor)
+                break
+
+        self._assinatura = assinatura
+        self._ultimo = ultimo
+        return ultimo
+
+    def compactar(self):
+        """Reescreve o catálogo com uma linha "add" por backup existente"""
+        with self._travado():
+            registros = self.registros()
+            parcial = self.caminho + ".parcial"
+            with open(parcial, "w", encoding="utf-8") as f:
+                for registro in registros.values():
+                    f.write(json.dumps({"op": "add", **asdict(registro)}, ensure_ascii=False) + "\n")
+            os.replace(parcial, self.caminho)
+
+    # ---------- integridade ----------
+
+    def verificar(self, nomes=None, threads=None):
+        """Recalcula os checksums em paralelo; retorna {nome: íntegro}
+
+        Backups sem arquivo local são ignorados. Um backup sem checksum
+        registrado (importado do tar antigo) recebe o checksum atual.
+        """
+        registros = self.registros()
+        alvos = [r for r in registros.values() if (nomes is None or r.nome in nomes) and os.path.isfile(r.caminho)]
+
+        def verificar_um(registro):
+            try:
+                return registro, checksum_arquivo(registro.caminho)
+            except OSError:
+                return registro, None
+
+        resultados = {}
+        eventos = []
+        agora = time.time()
+        # hashlib libera o GIL: um arquivo por thread usa todos os núcleos
+        with ThreadPoolExecutor(max_workers=threads or os.cpu_count() or 1) as executor:
+            for registro, atual in executor.map(verificar_um, alvos):
+                integro = atual is not None and (not registro.checksum or atual == registro.checksum)
+                evento = {"op": "upd", "nome": registro.nome, "verificado_em": agora, "integro": integro}
+                if integro and not registro.checksum:
+                    evento["checksum"] = atual
+                eventos.append(evento)
+                resultados[registro.nome] = integro
+        if eventos:
+            self._anexar(*eventos)
+        return resultados
+
+    def importar(self, diretorio, padrao="*.tar.gz", threads=None):
+        """Registra backups do diretório que ainda não estão no catálogo"""
+        conhecidos = self.registros()
+        novos = []
+        for nome in os.listdir(diretorio):
+            caminho = os.path.join(diretorio, nome)
+            if fnmatch.fnmatch(nome, padrao) and nome not in conhecidos and os.path.isfile(caminho):
+                st = os.stat(caminho)
+                novos.append(RegistroBackup(nome=nome, caminho=os.path.abspath(caminho), tamanho=st.st_size, criado=st.st_mtime))
+        if not novos:
+            return []
+
+        with ThreadPoolExecutor(max_workers=threads or os.cpu_count() or 1) as executor:
+            for registro, checksum in zip(novos, executor.map(checksum_arquivo, [r.caminho for r in novos])):
+                registro.checksum = checksum
+        self._anexar(*({"op": "add", **asdict(r)} for r in novos))
+        # Importados podem ser mais antigos que os já catalogados
+        self.compactar()
+        return novos
+
+    def importar_remoto(self, spec, padrao="*.tar.gz"):
+        """Sincroniza o catálogo com a listagem de um destino do upload.py
+
+        Backups catalogados que estão no destino ganham o remoto; os que só
+        existem lá (enviados antes do catálogo) entram sem cópia local, para
+        a retenção também apagá-los. Retorna (marcados, novos).
+        """
+        from upload import abrir_destino
+
+        conhecidos = self.registros()
+        eventos = []
+        marcados = novos = 0
+        for nome, (tamanho, modificado) in sorted(abrir_destino(spec).listar().items()):
+            if not fnmatch.fnmatch(nome, padrao):
+                continue
+            registro = conhecidos.get(nome)
+            if registro is None:
+                novo = RegistroBackup(nome=nome, caminho="", tamanho=tamanho, criado=modificado, remotos=[spec])
+                eventos.append({"op": "add", **asdict(novo)})
+                novos += 1
+            elif spec not in registro.remotos:
+                eventos.append({"op": "upd", "nome": nome, "remotos": registro.remotos + [spec]})
+                marcados += 1
+        if eventos:
+            self._anexar(*eventos)
+            if novos:
+                # Enviados antes do catálogo costumam ser mais antigos que os já registrados
+                self.compactar()
+        return marcados, novos
+
+    # ---------- retenção ----------
+
+    def aplicar_retencao(self, remover, local=True, remoto=True):
+        """Apaga os backups em lote (um comando por destino remoto) e compacta
+
+        Retorna as falhas; um backup só sai do catálogo quando não sobra
+        nenhuma cópia dele.
+        """
+        from upload import UploadErro, abrir_destino
+
+        restantes = {r.nome: list(r.remotos) if remoto else [] for r in remover}
+        falhas = []
+        if remoto:
+            por_destino = {}
+            for registro in remover:
+                for spec in registro.remotos:
+                    por_destino.setdefault(spec, []).append(registro.nome)
+            for spec, nomes in por_destino.items():
+                try:
+                    abrir_destino(spec).remover(nomes)
+                except (UploadErro, OSError, ValueError) as e:
+                    falhas.append(f"{spec}: {e}")
+                    continue
+                for nome in nomes:
+                    restantes[nome].remove(spec)
+
+        eventos = []
+        for registro in remover:
+            if local:
+                for caminho in (registro.caminho, registro.caminho + ".upload.json"):
+                    try:
+                        os.remove(caminho)
+                    except (FileNotFoundError, IsADirectoryError):
+                        pass
+            sobra_local = not local and bool(registro.caminho)
+            if restantes[registro.nome] or sobra_local:
+                evento = {"op": "upd", "nome": registro.nome, "remotos": restantes[registro.nome]}
+                if local:
+                    evento["caminho"] = ""
+                eventos.append(evento)
+            else:
+                eventos.append({"op": "del", "nome": registro.nome})
+        if eventos:
+            self._anexar(*eventos)
+            self.compactar()
+        return falhas
+
+
+def plano_retencao(registros, ultimos=0, horarios=0, diarios=0, semanais=0, mensais=0):
+    """Divide os registros em (manter, remover) pela política GFS
+
+    Mantém os `ultimos` mais recentes e o mais recente de cada uma das
+    últimas N horas, dias, semanas ISO e meses que têm backup. O mais
+    recente de todos nunca é removido; sem nenhuma quantidade a política
+    apagaria todo o resto, então ValueError.
+    """
+    if not any((ultimos, horarios, diarios, semanais, mensais)):
+        raise ValueError("Retenção sem nada a manter: informe --ultimos, --horarios, --diarios, --semanais ou --mensais")
+
+    ordenados = sorted(registros, key=lambda r: r.criado, reverse=True)
+    manter = {r.nome for r in ordenados[:max(ultimos, 1)]}
+
+    periodos = (
+        (horarios, "%Y-%m-%d %H"),
+        (diarios, "%Y-%m-%d"),
+        (semanais, "%G-W%V"),
+        (mensais, "%Y-%m")
+    )
+    for quantidade, formato in periodos:
+        vistos = set()
+        for registro in ordenados:
+            if len(vistos) >= quantidade:
+                break
+            periodo = datetime.fromtimestamp(registro.criado).strftime(formato)
+            if periodo not in vistos:
+                vistos.add(periodo)
+                manter.add(registro.nome)
+
+    return (
+        [r for r in ordenados if r.nome in manter],
+        [r for r in ordenados if r.nome not in manter]
+    )
+
+
+def _formatar_tamanho(valor):
+    for unidade in ("B", "KB", "MB", "GB"):
+        if valor < 1024:
+            return f"{valor:.0f} {unidade}" if unidade == "B" else f"{valor:.1f} {unidade}"
+        valor /= 1024
+    return f"{valor:.1f} TB"
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Catálogo de backups")
+    parser.add_argument("--catalogo", required=True)
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("listar")
+    p.add_argument("--padrao", default="*")
+
+    sub.add_parser("ultimo")
+
+    p = sub.add_parser("remoto", help="registra que o backup foi enviado para um destino")
+    p.add_argument("nome")
+    p.add_argument("destino")
+
+    p = sub.add_parser("verificar")
+    p.add_argument("nomes", nargs="*")
+    p.add_argument("--threads", type=int)
+
+    p = sub.add_parser("importar")
+    p.add_argument("diretorio")
+    p.add_argument("--padrao", default="*.tar.gz")
+
+    p = sub.add_parser("importar-remoto", help="registra os backups que já estão num destino")
+    p.add_argument("destino")
+    p.add_argument("--padrao", default="*.tar.gz")
+
+    p = sub.add_parser("reter", help="aplica a retenção (pelo menos uma quantidade é obrigatória)")
+    p.add_argument("--padrao", default="*", help="só backups com nome neste glob")
+    p.add_argument("--ultimos", type=int, default=0)
+    p.add_argument("--horarios", type=int, default=0)
+    p.add_argument("--diarios", type=int, default=0)
+    p.add_argument("--semanais", type=int, default=0)
+    p.add_argument("--mensais", type=int, default=0)
+    p.add_argument("--so-remoto", action="store_true", help="mantém os arquivos locais")
+    p.add_argument("--simular", action="store_true")
+
+    args = parser.parse_args(argv)
+    catalogo = Catalogo(args.catalogo)
+
+    try:
+        if args.comando == "listar":
+            registros = [r for r in catalogo.registros().values() if fnmatch.fnmatch(r.nome, args.padrao)]
+            for i, r in enumerate(reversed(registros), 1):
+                criado = datetime.fromtimestamp(r.criado).strftime("%Y-%m-%d %H:%M:%S")
+                estado = {True: "íntegro", False: "CORROMPIDO", None: "não verificado"}[r.integro]
+                local = "local" if r.caminho and os.path.isfile(r.caminho) else "sem cópia local"
+                remotos = ", ".join(r.remotos) or "sem cópia remota"
+                print(f"{i}. {r.nome}")
+                print(f"   Tamanho: {_formatar_tamanho(r.tamanho)} | Criado: {criado} | {estado} | {local} | {remotos}")
+            print(f"Total: {len(registros)} backup(s)")
+
+        elif args.comando == "ultimo":
+            r = catalogo.ultimo()
+            if r is None:
+                return 1
+            print(f"{r.nome}\t{datetime.fromtimestamp(r.criado).isoformat(timespec='seconds')}")
+
+        elif args.comando == "remoto":
+            catalogo.adicionar_remoto(args.nome, args.destino)
+
+        elif args.comando == "verificar":
+            resultados = catalogo.verificar(args.nomes or None, args.threads)
+            corrompidos = [nome for nome, ok in resultados.items() if not ok]
+            for nome in corrompidos:
+                print(f"CORROMPIDO: {nome}", file=sys.stderr)
+            print(f"{len(resultados)} backup(s) verificado(s), {len(corrompidos)} corrompido(s)")
+            return 1 if corrompidos else 0
+
+        elif args.comando == "importar":
+            novos = catalogo.importar(args.diretorio, args.padrao)
+            print(f"{len(novos)} backup(s) importado(s)")
+
+        elif args.comando == "importar-remoto":
+            from upload import UploadErro
+
+            try:
+                marcados, novos = catalogo.importar_remoto(args.destino, args.padrao)
+            except UploadErro as e:
+                print(f"Erro: {e}", file=sys.stderr)
+                return 1
+            print(f"{marcados} backup(s) marcado(s) em {args.destino}, {novos} só remoto(s) importado(s)")
+
+        elif args.comando == "reter":
+            registros = [r for r in catalogo.registros().values() if fnmatch.fnmatch(r.nome, args.padrao)]
+            if args.so_remoto:
+                registros = [r for r in registros if r.remotos]
+            manter, remover = plano_retencao(
+                registros, args.ultimos, args.horarios, args.diarios, args.semanais, args.mensais
+            )
+            for r in remover:
+                print(f"Removendo: {r.nome}")
+            print(f"Mantendo {len(manter)}, removendo {len(remover)}")
+            if remover and not args.simular:
+                falhas = catalogo.aplicar_retencao(remover, local=not args.so_remoto, remoto=True)
+                for falha in falhas:
+                    print(f"Falha ao remover de {falha}", file=sys.stderr)
+                return 1 if falhas else 0
+    except (OSError, ValueError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,128 @@
+import logging
+from dataclasses import dataclass
+
+# =======================
+# CHECKS
+# =======================
+#
+# Registro de checks no estilo plugin. Cada check declara nome, cadência,
+# prazo e a chave do alvo; o bot registra uma probe por chave no agendador
+# (alvos repetidos entre instâncias rodam uma vez só) e todos os painéis
+# leem o mesmo snapshot.
+
+log = logging.getLogger(__name__)
+
+CHECKS = []
+
+
+@dataclass
+class TipoCheck:
+    nome: str
+    chave: object
+    func: object
+    intervalo: float
+    timeout: float
+    # False para probes que só alimentam estatísticas (não entram no embed)
+    servico: bool = True
+
+
+@dataclass
+class ContextoChecks:
+    docker: object
+    prober: object
+    prober_quic: object
+    resolvedor: object
+    # Última resposta DNS por domínio
+    respostas_dns: dict
+
+
+def registrar_check(nome, chave, intervalo, timeout, servico=True):
+    """Decorator: registra `func(ctx, config)` como check
+
+    `chave(config)` identifica o alvo; `intervalo=None` indica check
+    atualizado por eventos (roda só na partida).
+    """
+    def decorator(func):
+        CHECKS.append(TipoCheck(nome, chave, func, intervalo, timeout, servico))
+        return func
+    return decorator
+
+
+@registrar_check("cloudflare", lambda cfg: f"dns:{cfg.dominio}", intervalo=300, timeout=10)
+async def checar_cloudflare(ctx, cfg):
+    try:
+        resposta = await ctx.resolvedor.resolver(cfg.dominio, esperado=[cfg.ip_publico])
+        ctx.respostas_dns[cfg.dominio] = resposta
+
+        if not resposta.ips:
+            log.warning("Cloudflare DNS sem registros A para %s", cfg.dominio)
+            return False
+
+        if resposta.divergente and not resposta.do_cache:
+            log.warning("%s resolveu para %s, esperado %s", cfg.dominio, resposta.ips, cfg.ip_publico)
+
+        return True
+    except Exception as e:
+        log.warning("Erro geral Cloudflare: %s", e)
+        return False
+
+
+# /_ping no docker.sock, pela mesma sessão keep-alive do DockerAPI
+@registrar_check("docker", lambda cfg: "docker:ping", intervalo=10, timeout=6)
+async def checar_docker(ctx, cfg):
+    try:
+        return await ctx.docker.ping(timeout=5)
+    except Exception as e:
+        log.warning("Erro geral Docker Engine: %s", e)
+        return False
+
+
+# ICMP com cadência maior: o IP público e a LAN mudam pouco
+@registrar_check("network", lambda cfg: f"icmp:{cfg.ip_publico}", intervalo=30, timeout=6)
+async def checar_network(ctx, cfg):
+    try:
+        # Ping no IP externo - se falhar, IP pode ter mudado
+        return await ctx.prober.ping(cfg.ip_publico, timeout=5)
+    except Exception as e:
+        log.warning("Erro geral Network: %s", e)
+        return False
+
+
+@registrar_check("lan", lambda cfg: f"icmp:{cfg.host_docker}", intervalo=30, timeout=3, servico=False)
+async def checar_lan(ctx, cfg):
+    try:
+        # Só alimenta as estatísticas de RTT/jitter/perda da LAN (/metrics)
+        return await ctx.prober.ping(cfg.host_docker, timeout=2)
+    except Exception as e:
+        log.warning("Erro geral LAN: %s", e)
+        return False
+
+
+# Estado do container vem dos eventos do Docker (MonitorContainers)
+@registrar_check("hytale", lambda cfg: f"container:{cfg.container}", intervalo=None, timeout=5)
+async def checar_hytale_server(ctx, cfg):
+    try:
+        estado = await ctx.docker.inspect(cfg.container)
+
+        if estado is None:
+            log.warning("Container %s não encontrado", cfg.container)
+            return False
+
+        log.debug("%s status: %s", cfg.container, estado.status)
+        return estado.rodando
+
+    except Exception as e:
+        log.warning("Erro ao checar %s: %s", cfg.container, e)
+        return False
+
+
+# O container pode estar "running" com a JVM travada; a pilha QUIC responder
+# é o que indica que o servidor aceita conexões
+@registrar_check("quic", lambda cfg: f"quic:{cfg.container}:{cfg.porta}", intervalo=10, timeout=4)
+async def checar_quic(ctx, cfg):
+    try:
+        # Pela rede do compose, o nome do container resolve direto para ele
+        return await ctx.prober_quic.sondar(cfg.container, cfg.porta, timeout=3)
+    except Exception as e:
+        log.warning("Erro geral QUIC %s:%s: %s", cfg.container, cfg.porta, e)
+        return False
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+
+# =======================
+# CONTAINER EVENTS
+# =======================
+#
+# Estado dos containers atualizado pelo stream /events do Docker: um inspect
+# na partida (e após cada reconexão) e depois só eventos, sem polling.
+# O stream é aberto com `since` no instante anterior ao inspect, então o que
+# acontecer entre os dois é reenviado pelo Docker. A contagem de reinícios
+# vem sempre do RestartCount do Docker, relido a cada start/restart.
+
+log = logging.getLogger(__name__)
+
+EVENTOS_MONITORADOS = ["start", "die", "stop", "kill", "oom", "restart", "health_status"]
+ESPERA_RECONEXAO = 5
+
+
+class MonitorContainers:
+    """Acompanha start/die/oom/health_status dos containers informados"""
+
+    def __init__(self, docker, nomes):
+        self.docker = docker
+        self.nomes = list(nomes)
+        self.rodando = {nome: False for nome in self.nomes}
+        self.saude = {nome: "" for nome in self.nomes}
+        self.reinicios = {nome: 0 for nome in self.nomes}
+        self.ultimo_evento = {nome: None for nome in self.nomes}
+        self._assinantes = []
+        self._task = None
+
+    def ao_mudar(self, callback):
+        """Registra callback(nome, rodando) chamado quando um container muda de estado"""
+        self._assinantes.append(callback)
+
+    def _definir_rodando(self, nome, rodando):
+        anterior = self.rodando.get(nome)
+        self.rodando[nome] = rodando
+        if rodando != anterior:
+            log.info("Container %s: %s", nome, "rodando" if rodando else "parado")
+        for callback in self._assinantes:
+            try:
+                callback(nome, rodando)
+            except Exception:
+                log.exception("Erro no assinante de containers")
+
+    async def sincronizar(self):
+        """Lê o estado atual de todos os containers via inspect"""
+        for nome in self.nomes:
+            try:
+                estado = await self.docker.inspect(nome)
+            except Exception as e:
+                log.warning("Erro no inspect de %s: %s", nome, e)
+                continue
+
+            if estado is None:
+                self.saude[nome] = ""
+                self._definir_rodando(nome, False)
+            else:
+                self.saude[nome] = estado.saude
+                self.reinicios[nome] = estado.reinicios
+                self._definir_rodando(nome, estado.rodando)
+
+    async def _reler_reinicios(self, nome):
+        try:
+            estado = await self.docker.inspect(nome)
+        except Exception as e:
+            log.warning("Erro no inspect de %s: %s", nome, e)
+            return
+        if estado is not None:
+            self.reinicios[nome] = estado.reinicios
+
+    def _aplicar_evento(self, evento):
+        """Aplica o evento; retorna o nome do container afetado (ou None)"""
+        nome = evento.get("Actor", {}).get("Attributes", {}).get("name")
+        if nome not in self.rodando:
+            return None
+
+        acao = evento.get("Action", "")
+        self.ultimo_evento[nome] = (acao, evento.get("time", time.time()))
+
+        if acao == "start":
+            self._definir_rodando(nome, True)
+        elif acao in ("die", "stop", "kill"):
+            self._definir_rodando(nome, False)
+        elif acao == "oom":
+            log.error("Container %s ficou sem memória (OOM)", nome)
+        elif acao.startswith("health_status"):
+            self.saude[nome] = acao.split(":", 1)[-1].strip()
+        return nome
+
+    async def _loop(self):
+        filtros = {
+            "type": ["container"],
+            "container": self.nomes,
+            "event": EVENTOS_MONITORADOS
+        }
+
+        while True:
+            try:
+                # Reinspeciona a cada conexão; o `since` faz o Docker reenviar
+                # o que acontecer entre o inspect e a abertura do stream
+                desde = f"{time.time():.3f}"
+                await self.sincronizar()
+                async for evento in self.docker.events(filtros=filtros, since=desde):
+                    nome = self._aplicar_evento(evento)
+                    if nome is not None and evento.get("Action") in ("start", "restart"):
+                        await self._reler_reinicios(nome)
+                log.info("Stream de eventos do Docker encerrado")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("Erro no stream de eventos do Docker: %s", e)
+
+            await asyncio.sleep(ESPERA_RECONEXAO)
+
+    def iniciar(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+        return self._task
+
+    def parar(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import random
+import socket
+import struct
+import time
+from dataclasses import dataclass, field
+
+# =======================
+# DNS CACHE
+# =======================
+#
+# Resolvedor assíncrono de registros A que respeita o TTL da resposta.
+# Fala DNS/UDP direto com o nameserver do /etc/resolv.conf (no Docker, o
+# 127.0.0.11) e guarda histograma de latência e os IPs retornados, para o
+# painel poder acusar quando o registro muda.
+
+log = logging.getLogger(__name__)
+
+RESOLV_CONF = "/etc/resolv.conf"
+TTL_PADRAO = 60
+TTL_MINIMO = 5
+TIMEOUT_PADRAO = 3
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+TIPO_A = 1
+CLASSE_IN = 1
+
+
+@dataclass
+class RespostaDNS:
+    nome: str
+    ips: list
+    ttl: int
+    latencia: float
+    expira_em: float = 0.0
+    do_cache: bool = False
+    esperado: list = field(default_factory=list)
+
+    @property
+    def divergente(self):
+        """True quando nenhum dos IPs esperados foi retornado"""
+        return bool(self.esperado) and not set(self.esperado) & set(self.ips)
+
+
+class HistogramaLatencia:
+    """Histograma cumulativo de latências (segundos)"""
+
+    def __init__(self, buckets=BUCKETS_LATENCIA):
+        self.buckets = buckets
+        self.contagens = [0] * len(buckets)
+        self.total = 0
+        self.soma = 0.0
+
+    def observar(self, valor):
+        self.total += 1
+        self.soma += valor
+        for i, limite in enumerate(self.buckets):
+            if valor <= limite:
+                self.contagens[i] += 1
+
+    def percentil(self, p):
+        """Aproxima o percentil p (0-100) pelo limite do bucket"""
+        if not self.total:
+            return None
+        alvo = self.total * p / 100
+        for limite, contagem in zip(self.buckets, self.contagens):
+            if contagem >= alvo:
+                return limite
+        return float("inf")
+
+
+def ler_nameservers(caminho=RESOLV_CONF):
+    servidores = []
+    try:
+        with open(caminho) as f:
+            for linha in f:
+                partes = linha.split()
+                if len(partes) >= 2 and partes[0] == "nameserver":
+                    servidores.append(partes[1])
+    except OSError:
+        pass
+    return servidores
+
+
+def montar_consulta(nome, id_consulta):
+    cabecalho = struct.pack("!HHHHHH", id_consulta, 0x0100, 1, 0, 0, 0)
+    qname = b"".join(
+        bytes([len(parte)]) + parte.encode("idna") for parte in nome.rstrip(".").split(".")
+    ) + b"\x00"
+    return cabecalho + qname + struct.pack("!HH", TIPO_A, CLASSE_IN)
+
+
+def _pular_nome(dados, pos):
+    while True:
+        tamanho = dados[pos]
+        if tamanho == 0:
+            return pos + 1
+        if tamanho & 0xC0 == 0xC0:
+            # Ponteiro de compressão (2 bytes)
+            return pos + 2
+        pos += tamanho + 1
+
+
+def interpretar_resposta(dados, id_consulta):
+    """Extrai (ips, menor_ttl) dos registros A da seção de respostas"""
+    id_resposta, flags, qdcount, ancount, _, _ = struct.unpack("!HHHHHH", dados[:12])
+    if id_resposta != id_consulta:
+        raise ValueError("ID de resposta DNS não confere")
+
+    rcode = flags & 0x000F
+    if rcode == 3:
+        # NXDOMAIN
+        return [], TTL_MINIMO
+    if rcode != 0:
+        raise ValueError(f"Servidor DNS retornou rcode {rcode}")
+
+    pos = 12
+    for _ in range(qdcount):
+        pos = _pular_nome(dados, pos) + 4
+
+    ips = []
+    ttls = []
+    for _ in range(ancount):
+        pos = _pular_nome(dados, pos)
+        tipo, classe, ttl, tamanho = struct.unpack("!HHIH", dados[pos:pos + 10])
+        pos += 10
+        # CNAMEs são percorridos pelo próprio resolvedor; basta guardar os A
+        if tipo == TIPO_A and classe == CLASSE_IN and tamanho == 4:
+            ips.append(socket.inet_ntoa(dados[pos:pos + 4]))
+            ttls.append(ttl)
+        pos += tamanho
+
+    return ips, (min(ttls) if ttls else TTL_MINIMO)
+
+
+class _ProtocoloConsulta(asyncio.DatagramProtocol):
+    def __init__(self, futuro):
+        self.futuro = futuro
+
+    def datagram_received(self, dados, addr):
+        if not self.futuro.done():
+            self.futuro.set_result(dados)
+
+    def error_received(self, exc):
+        if not self.futuro.done():
+            self.futuro.set_exception(exc)
+
+
+class ResolvedorDNS:
+    """Resolve registros A com cache pelo TTL e métricas de latência"""
+
+    def __init__(self, nameservers=None, timeout=TIMEOUT_PADRAO):
+        self.nameservers = nameservers if nameservers is not None else ler_nameservers()
+        self.timeout = timeout
+        self.cache = {}
+        self.latencias = HistogramaLatencia()
+        self.falhas = 0
+
+    async def _consultar_servidor(self, servidor, nome):
+        loop = asyncio.get_running_loop()
+        id_consulta = random.getrandbits(16)
+        futuro = loop.create_future()
+        transporte, _ = await loop.create_datagram_endpoint(
+            lambda: _ProtocoloConsulta(futuro),
+            remote_addr=(servidor, 53)
+        )
+        try:
+            transporte.sendto(montar_consulta(nome, id_consulta))
+            dados = await asyncio.wait_for(futuro, self.timeout)
+        finally:
+            transporte.close()
+        return interpretar_resposta(dados, id_consulta)
+
+    async def _consultar_sistema(self, nome):
+        # Sem nameserver utilizável: getaddrinfo não informa TTL
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(nome, None, family=socket.AF_INET, type=socket.SOCK_STREAM)
+        return sorted({info[4][0] for info in infos}), TTL_PADRAO
+
+    async def _consultar(self, nome):
+        ultimo_erro = None
+        for servidor in self.nameservers:
+            try:
+                return await self._consultar_servidor(servidor, nome)
+            except (OSError, ValueError, asyncio.TimeoutError, struct.error, IndexError) as e:
+                ultimo_erro = e
+                log.debug("DNS %s falhou para %s: %r", servidor, nome, e)
+
+        if ultimo_erro is not None:
+            self.falhas += 1
+        return await self._consultar_sistema(nome)
+
+    async def resolver(self, nome, esperado=None):
+        """Retorna RespostaDNS, usando o cache enquanto o TTL não expirar"""
+        esperado = list(esperado or [])
+        agora = time.monotonic()
+
+        cached = self.cache.get(nome)
+        if cached is not None and cached.expira_em > agora:
+            return RespostaDNS(
+                nome=nome,
+                ips=cached.ips,
+                ttl=int(cached.expira_em - agora),
+                latencia=0.0,
+                expira_em=cached.expira_em,
+                do_cache=True,
+                esperado=esperado
+            )
+
+        inicio = time.monotonic()
+        ips, ttl = await self._consultar(nome)
+        latencia = time.monotonic() - inicio
+        self.latencias.observar(latencia)
+
+        ttl = max(ttl, TTL_MINIMO)
+        resposta = RespostaDNS(
+            nome=nome,
+            ips=sorted(ips),
+            ttl=ttl,
+            latencia=latencia,
+            expira_em=time.monotonic() + ttl,
+            esperado=esperado
+        )
+
+        if ips:
+            self.cache[nome] = resposta
+        else:
+            self.cache.pop(nome, None)
+
+        return resposta
+
+
+# Instância compartilhada pelos bots
+resolvedor = ResolvedorDNS()
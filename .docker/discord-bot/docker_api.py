@@ -0,0 +1,189 @@
+import asyncio
+import json
+import struct
+from calendar import timegm
+from dataclasses import dataclass
+from datetime import datetime
+
+import aiohttp
+
+# =======================
+# DOCKER ENGINE API
+# =======================
+#
+# Cliente assíncrono para o Docker Engine via /var/run/docker.sock.
+# Mantém uma única sessão aiohttp com conexões keep-alive, então nenhuma
+# chamada bloqueia o event loop do discord.py nem cria processos do docker CLI.
+
+DOCKER_SOCKET = "/var/run/docker.sock"
+API_BASE = "http://docker"
+TIMEOUT_PADRAO = 5
+
+
+class DockerAPIErro(Exception):
+    """Erro retornado pelo Docker Engine"""
+
+    def __init__(self, status, mensagem):
+        super().__init__(f"{status}: {mensagem}")
+        self.status = status
+        self.mensagem = mensagem
+
+
+@dataclass
+class EstadoContainer:
+    id: str
+    nome: str
+    status: str
+    rodando: bool
+    iniciado_em: str
+    reinicios: int
+    saude: str
+    tty: bool
+
+    @classmethod
+    def de_inspect(cls, dados):
+        state = dados.get("State", {})
+        return cls(
+            id=dados.get("Id", ""),
+            nome=dados.get("Name", "").lstrip("/"),
+            status=state.get("Status", "unknown"),
+            rodando=bool(state.get("Running")),
+            iniciado_em=state.get("StartedAt", ""),
+            reinicios=dados.get("RestartCount", 0),
+            saude=(state.get("Health") or {}).get("Status", ""),
+            tty=bool(dados.get("Config", {}).get("Tty"))
+        )
+
+
+def rfc3339_para_unix(ts):
+    """Converte '2026-01-27T11:19:27.123456789Z' para '1769512767.123456789'"""
+    base, _, fracao = ts.rstrip("Z").partition(".")
+    segundos = timegm(datetime.strptime(base, "%Y-%m-%dT%H:%M:%S").timetuple())
+    return f"{segundos}.{fracao}" if fracao else str(segundos)
+
+
+class DockerAPI:
+    """Cliente assíncrono do Docker Engine com conexão keep-alive"""
+
+    def __init__(self, socket_path=DOCKER_SOCKET):
+        self.socket_path = socket_path
+        self._sessao = None
+
+    def _obter_sessao(self):
+        if self._sessao is None or self._sessao.closed:
+            conector = aiohttp.UnixConnector(path=self.socket_path, limit=10, keepalive_timeout=60)
+            self._sessao = aiohttp.ClientSession(connector=conector)
+        return self._sessao
+
+    async def fechar(self):
+        if self._sessao is not None and not self._sessao.closed:
+            await self._sessao.close()
+
+    async def _get_json(self, caminho, params=None, timeout=TIMEOUT_PADRAO):
+        sessao = self._obter_sessao()
+        async with sessao.get(
+            API_BASE + caminho,
+            params=params,
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as resp:
+            if resp.status >= 400:
+                raise DockerAPIErro(resp.status, (await resp.text()).strip())
+            return await resp.json()
+
+    async def ping(self, timeout=TIMEOUT_PADRAO):
+        """True se o daemon responder ao /_ping"""
+        sessao = self._obter_sessao()
+        async with sessao.get(API_BASE + "/_ping", timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+            return resp.status == 200 and (await resp.text()).strip() == "OK"
+
+    async def inspect(self, nome):
+        """Retorna o estado do container, ou None se ele não existir"""
+        try:
+            dados = await self._get_json(f"/containers/{nome}/json")
+        except DockerAPIErro as e:
+            if e.status == 404:
+                return None
+            raise
+        return EstadoContainer.de_inspect(dados)
+
+    async def logs(self, nome, follow=False, tail=None, since=None, timestamps=True, tty=None):
+        """Gera as linhas de log do container (str, sem quebra de linha)
+
+        `since` aceita um timestamp RFC3339 (como os gerados por `timestamps`).
+        """
+        if tty is None:
+            estado = await self.inspect(nome)
+            tty = estado.tty if estado else False
+
+        params = {
+            "stdout": "1",
+            "stderr": "1",
+            "follow": "1" if follow else "0",
+            "timestamps": "1" if timestamps else "0"
+        }
+        if tail is not None:
+            params["tail"] = str(tail)
+        if since:
+            params["since"] = rfc3339_para_unix(since)
+
+        sessao = self._obter_sessao()
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=TIMEOUT_PADRAO)
+        async with sessao.get(API_BASE + f"/containers/{nome}/logs", params=params, timeout=timeout) as resp:
+            if resp.status >= 400:
+                raise DockerAPIErro(resp.status, (await resp.text()).strip())
+
+            if tty:
+                # Com TTY o stream é texto puro
+                async for dados in resp.content:
+                    yield dados.decode("utf-8", errors="replace").rstrip("\r\n")
+                return
+
+            # Sem TTY cada bloco vem com cabeçalho de 8 bytes: [stream, 0, 0, 0, tamanho]
+            pendente = ""
+            while True:
+                try:
+                    cabecalho = await resp.content.readexactly(8)
+                except asyncio.IncompleteReadError:
+                    break
+                _, tamanho = struct.unpack(">BxxxL", cabecalho)
+                bloco = await resp.content.readexactly(tamanho)
+                pendente += bloco.decode("utf-8", errors="replace")
+                *linhas, pendente = pendente.split("\n")
+                for linha in linhas:
+                    yield linha.rstrip("\r")
+            if pendente:
+                yield pendente.rstrip("\r")
+
+    async def stats(self, nome):
+        """Gera as amostras de /stats (dict), uma por segundo, enquanto o container existir"""
+        sessao = self._obter_sessao()
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=TIMEOUT_PADRAO)
+        async with sessao.get(
+            API_BASE + f"/containers/{nome}/stats",
+            params={"stream": "1"},
+            timeout=timeout
+        ) as resp:
+            if resp.status >= 400:
+                raise DockerAPIErro(resp.status, (await resp.text()).strip())
+            async for linha in resp.content:
+                linha = linha.strip()
+                if linha:
+                    yield json.loads(linha)
+
+    async def events(self, filtros=None, since=None):
+        """Gera eventos do Docker (dict) conforme acontecem"""
+        params = {}
+        if filtros:
+            params["filters"] = json.dumps(filtros)
+        if since is not None:
+            params["since"] = str(since)
+
+        sessao = self._obter_sessao()
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=TIMEOUT_PADRAO)
+        async with sessao.get(API_BASE + "/events", params=params, timeout=timeout) as resp:
+            if resp.status >= 400:
+                raise DockerAPIErro(resp.status, (await resp.text()).strip())
+            async for linha in resp.content:
+                linha = linha.strip()
+                if linha:
+                    yield json.loads(linha)
@@ -0,0 +1,179 @@
+import asyncio
+import ctypes
+import ctypes.util
+import fnmatch
+import logging
+import os
+import struct
+import sys
+
+# =======================
+# FS WATCH
+# =======================
+#
+# Observa diretórios e avisa o bot assim que um arquivo relevante muda.
+# No Linux usa inotify integrado ao event loop (sem threads); em outros
+# sistemas, ou se o inotify falhar, cai para polling de mtime.
+
+log = logging.getLogger(__name__)
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+MASCARA_PADRAO = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENTO = struct.Struct("iIII")
+INTERVALO_POLLING = 2
+
+
+class _Inotify:
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+
+    def adicionar(self, caminho, mascara):
+        wd = self._add_watch(self.fd, os.fsencode(caminho), mascara)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), caminho)
+        return wd
+
+    def ler_eventos(self):
+        """Retorna [(wd, mascara, nome)] dos eventos pendentes"""
+        try:
+            dados = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        eventos = []
+        pos = 0
+        while pos + EVENTO.size <= len(dados):
+            wd, mascara, _, tamanho = EVENTO.unpack_from(dados, pos)
+            pos += EVENTO.size
+            nome = dados[pos:pos + tamanho].rstrip(b"\x00").decode("utf-8", errors="replace")
+            pos += tamanho
+            eventos.append((wd, mascara, nome))
+        return eventos
+
+    def fechar(self):
+        os.close(self.fd)
+
+
+class ObservadorArquivos:
+    """Chama callbacks quando arquivos observados são criados, alterados ou removidos"""
+
+    def __init__(self, forcar_polling=False, intervalo_polling=INTERVALO_POLLING):
+        self.forcar_polling = forcar_polling
+        self.intervalo_polling = intervalo_polling
+        # diretório -> [(padrão, callback)]
+        self.observacoes = {}
+        self._inotify = None
+        self._wds = {}
+        self._task = None
+        self.modo = None
+
+    def observar(self, diretorio, padrao, callback):
+        """Registra callback(caminho) para arquivos de `diretorio` que casem com `padrao`"""
+        self.observacoes.setdefault(diretorio, []).append((padrao, callback))
+
+    def _disparar(self, diretorio, nome):
+        for padrao, callback in self.observacoes.get(diretorio, []):
+            if fnmatch.fnmatch(nome, padrao):
+                try:
+                    callback(os.path.join(diretorio, nome))
+                except Exception:
+                    log.exception("Erro no callback de %s", nome)
+
+    # ---------- inotify ----------
+
+    def _iniciar_inotify(self):
+        self._inotify = _Inotify()
+        for diretorio in self.observacoes:
+            self._wds[self._inotify.adicionar(diretorio, MASCARA_PADRAO)] = diretorio
+        asyncio.get_running_loop().add_reader(self._inotify.fd, self._ao_ler_inotify)
+        self.modo = "inotify"
+
+    def _ao_ler_inotify(self):
+        for wd, mascara, nome in self._inotify.ler_eventos():
+            diretorio = self._wds.get(wd)
+            if diretorio is None:
+                continue
+            if mascara & (IN_DELETE_SELF | IN_IGNORED):
+                # Diretório removido/desmontado: passa a usar polling
+                log.warning("Watch de %s perdido - usando polling", diretorio)
+                self._parar_inotify()
+                self._task = asyncio.create_task(self._loop_polling())
+                return
+            if nome:
+                self._disparar(diretorio, nome)
+
+    def _parar_inotify(self):
+        if self._inotify is not None:
+            asyncio.get_running_loop().remove_reader(self._inotify.fd)
+            self._inotify.fechar()
+            self._inotify = None
+            self._wds = {}
+
+    # ---------- polling ----------
+
+    def _fotografar(self, diretorio):
+        estado = {}
+        padroes = [padrao for padrao, _ in self.observacoes[diretorio]]
+        try:
+            with os.scandir(diretorio) as entradas:
+                for entrada in entradas:
+                    if any(fnmatch.fnmatch(entrada.name, padrao) for padrao in padroes):
+                        try:
+                            st = entrada.stat()
+                            estado[entrada.name] = (st.st_mtime_ns, st.st_size)
+                        except FileNotFoundError:
+                            pass
+        except OSError:
+            pass
+        return estado
+
+    async def _loop_polling(self):
+        self.modo = "polling"
+        anteriores = {diretorio: self._fotografar(diretorio) for diretorio in self.observacoes}
+        while True:
+            await asyncio.sleep(self.intervalo_polling)
+            for diretorio in self.observacoes:
+                atual = self._fotografar(diretorio)
+                anterior = anteriores[diretorio]
+                for nome in atual.keys() | anterior.keys():
+                    if atual.get(nome) != anterior.get(nome):
+                        self._disparar(diretorio, nome)
+                anteriores[diretorio] = atual
+
+    def iniciar(self):
+        if self.modo is not None:
+            return
+
+        if not self.forcar_polling and sys.platform.startswith("linux"):
+            try:
+                self._iniciar_inotify()
+                log.info("Observando arquivos via inotify")
+                return
+            except OSError as e:
+                log.warning("inotify indisponível (%s) - usando polling", e)
+                self._parar_inotify()
+
+        self._task = asyncio.create_task(self._loop_polling())
+
+    def parar(self):
+        self._parar_inotify()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.modo = None
@@ -0,0 +1,136 @@
+import atexit
+import os
+import tomllib
+from dataclasses import dataclass, fields
+
+from log_classifier import MaquinaAuth, classificar
+from log_follower import SeguidorLogs
+from metadata_cache import CacheManifesto
+from players import RastreadorPlayers
+from recursos import AmostradorRecursos
+from render import PublicadorEmbed
+from sessoes import HistoricoSessoes
+
+# =======================
+# INSTÂNCIAS
+# =======================
+#
+# Registro dos servidores Hytale monitorados, lido de um TOML:
+#
+#   [[servidor]]
+#   id = "lobby"
+#   container = "hytale-lobby"
+#   titulo = "NOR Lobby"
+#   canal_id = 123456789012345678
+#
+# Cada instância tem seu próprio seguidor de logs, rastreador de players e
+# embed. As probes são identificadas pelo alvo (ver checks.py), então shards
+# no mesmo host compartilham uma única probe no agendador.
+# Sem arquivo de configuração, o bot monitora só o hytale-server, com os
+# mesmos arquivos de estado de antes. O histórico de sessões fica em
+# DADOS_DIR, montado do host (./data/bot) pelo docker-compose.yml.
+
+SERVERS_CONFIG = os.getenv("SERVERS_CONFIG", "/app/servers.toml")
+DADOS_DIR = "/app/dados"
+
+
+@dataclass
+class ConfigInstancia:
+    id: str
+    container: str = "hytale-server"
+    titulo: str = "NOR Infrastructure"
+    dominio: str = "norhytale.com"
+    ip_publico: str = "143.202.133.128"
+    porta: int = 5520
+    host_docker: str = "192.168.1.13"
+    canal_id: int = None
+    jar: str = "/server/HytaleServer.jar"
+    max_players: int = 100
+    monitoramento: str = "https://status.norhytale.com"
+    arquivo_mensagem: str = None
+    arquivo_players: str = None
+    banco_sessoes: str = None
+
+    def __post_init__(self):
+        # Arquivos de estado separados por instância
+        diretorio = os.path.join(DADOS_DIR, self.id)
+        if self.arquivo_mensagem is None:
+            self.arquivo_mensagem = os.path.join(diretorio, "status_message_id.txt")
+        if self.arquivo_players is None:
+            self.arquivo_players = os.path.join(diretorio, "players_online.json")
+        if self.banco_sessoes is None:
+            self.banco_sessoes = os.path.join(diretorio, "player_sessions.db")
+
+
+def config_padrao(canal_id):
+    """Instância única equivalente à configuração fixa antiga"""
+    return ConfigInstancia(
+        id="hytale-server",
+        canal_id=canal_id,
+        arquivo_mensagem="status_message_id.txt",
+        arquivo_players="/app/players_online.json",
+        # Histórico no volume ./data/bot, para sobreviver à recriação do container
+        banco_sessoes=os.path.join(DADOS_DIR, "player_sessions.db")
+    )
+
+
+def carregar_configs(caminho, canal_padrao):
+    """Lê o TOML de instâncias; sem arquivo, retorna a instância padrão"""
+    if not os.path.exists(caminho):
+        return [config_padrao(canal_padrao)]
+
+    with open(caminho, "rb") as f:
+        dados = tomllib.load(f)
+
+    validos = {campo.name for campo in fields(ConfigInstancia)}
+    configs = []
+    for item in dados.get("servidor", []):
+        desconhecidos = set(item) - validos
+        if desconhecidos:
+            raise ValueError(f"Campos desconhecidos em {caminho}: {sorted(desconhecidos)}")
+        item.setdefault("id", item.get("container", "hytale-server"))
+        item.setdefault("canal_id", canal_padrao)
+        configs.append(ConfigInstancia(**item))
+
+    ids = [config.id for config in configs]
+    if len(ids) != len(set(ids)):
+        raise ValueError(f"IDs de instância repetidos em {caminho}")
+    if not configs:
+        raise ValueError(f"Nenhum [[servidor]] definido em {caminho}")
+    return configs
+
+
+class Instancia:
+    """Estado de monitoramento de um servidor Hytale"""
+
+    def __init__(self, config, docker):
+        self.config = config
+        for arquivo in (config.arquivo_mensagem, config.arquivo_players, config.banco_sessoes):
+            diretorio = os.path.dirname(arquivo)
+            if diretorio:
+                os.makedirs(diretorio, exist_ok=True)
+
+        self.maquina_auth = MaquinaAuth()
+        self.rastreador_players = RastreadorPlayers(config.arquivo_players)
+        self.historico_sessoes = HistoricoSessoes(config.banco_sessoes)
+        self.rastreador_players.ao_mudar(self.historico_sessoes.registrar)
+        atexit.register(self.historico_sessoes.fechar)
+        self.seguidor_logs = SeguidorLogs(docker, config.container)
+        self.seguidor_logs.assinar(self.processar_linha_log)
+        self.recursos = AmostradorRecursos(docker, config.container)
+        self.manifesto = CacheManifesto(config.jar)
+        self.publicador = PublicadorEmbed(config.arquivo_mensagem)
+
+    def processar_linha_log(self, timestamp, linha):
+        """Callback do SeguidorLogs: cada linha é classificada uma única vez"""
+        tipo = classificar(linha)
+        if tipo is None:
+            return
+
+        self.maquina_auth.aplicar(tipo, timestamp, linha)
+        self.rastreador_players.aplicar(tipo, timestamp, linha)
+        self.recursos.aplicar(tipo, timestamp, linha)
+
+    def iniciar(self):
+        self.seguidor_logs.iniciar()
+        self.recursos.iniciar()
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+import aiohttp
+
+# =======================
+# UPTIME KUMA
+# =======================
+#
+# Cliente assíncrono do Uptime Kuma numa única sessão aiohttp keep-alive.
+# Lê status e histórico de todos os monitores de uma vez pela API pública
+# da status page (duas requisições, com cache entre os ticks) e envia os
+# resultados das probes do bot como heartbeats de monitores do tipo Push,
+# então cada probe roda uma vez só e alimenta os dois painéis.
+
+log = logging.getLogger(__name__)
+
+TIMEOUT_PADRAO = 5
+# A status page do Kuma só recalcula o cache dela a cada ~60 s
+CACHE_STATUS = 30
+
+# Status de heartbeat do Kuma
+KUMA_DOWN = 0
+KUMA_UP = 1
+KUMA_PENDING = 2
+KUMA_MAINTENANCE = 3
+
+
+class KumaErro(Exception):
+    """Erro retornado pelo Uptime Kuma"""
+
+    def __init__(self, status, mensagem):
+        super().__init__(f"{status}: {mensagem}")
+        self.status = status
+        self.mensagem = mensagem
+
+
+@dataclass
+class MonitorKuma:
+    id: int
+    nome: str
+    # Último heartbeat (status KUMA_*, None se não houver histórico)
+    status: int = None
+    ping: float = None
+    mensagem: str = ""
+    uptime_24h: float = None
+    batimentos: list = field(default_factory=list)
+
+    @property
+    def ativo(self):
+        return self.status == KUMA_UP
+
+
+class ClienteKuma:
+    """Cliente assíncrono do Uptime Kuma com conexão keep-alive"""
+
+    def __init__(self, url, slug=None, api_key=None, cache=CACHE_STATUS):
+        self.url = url.rstrip("/")
+        self.slug = slug
+        self.api_key = api_key
+        self.cache = cache
+        self.pushes = 0
+        self.falhas_push = 0
+        self._monitores = {}
+        self._atualizado_em = 0.0
+        self._lock = asyncio.Lock()
+        self._sessao = None
+
+    def _obter_sessao(self):
+        if self._sessao is None or self._sessao.closed:
+            conector = aiohttp.TCPConnector(limit=10, keepalive_timeout=60)
+            # A API key do Kuma é aceita como senha de basic auth (usuário vazio)
+            auth = aiohttp.BasicAuth("", self.api_key) if self.api_key else None
+            self._sessao = aiohttp.ClientSession(connector=conector, auth=auth)
+        return self._sessao
+
+    async def fechar(self):
+        if self._sessao is not None and not self._sessao.closed:
+            await self._sessao.close()
+
+    async def _get_json(self, caminho, timeout=TIMEOUT_PADRAO):
+        sessao = self._obter_sessao()
+        async with sessao.get(self.url + caminho, timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+            if resp.status != 200:
+                raise KumaErro(resp.status, await resp.text())
+            return await resp.json()
+
+    async def monitores(self, forcar=False):
+        """Monitores da status page por id, com último heartbeat e uptime 24h
+
+        Dentro da janela de cache retorna o resultado anterior sem ir à rede;
+        chamadas concorrentes compartilham a mesma atualização.
+        """
+        if not self.slug:
+            return {}
+
+        async with self._lock:
+            if not forcar and time.monotonic() - self._atualizado_em < self.cache:
+                return self._monitores
+
+            pagina, batimentos = await asyncio.gather(
+                self._get_json(f"/api/status-page/{self.slug}"),
+                self._get_json(f"/api/status-page/heartbeat/{self.slug}")
+            )
+
+            monitores = {}
+            for grupo in pagina.get("publicGroupList", []):
+                for item in grupo.get("monitorList", []):
+                    monitores[item["id"]] = MonitorKuma(id=item["id"], nome=item.get("name", ""))
+
+            lista = batimentos.get("heartbeatList", {})
+            uptimes = batimentos.get("uptimeList", {})
+            for monitor_id, monitor in monitores.items():
+                historico = lista.get(str(monitor_id), [])
+                monitor.batimentos = historico
+                if historico:
+                    ultimo = historico[-1]
+                    monitor.status = ultimo.get("status")
+                    monitor.ping = ultimo.get("ping")
+                    monitor.mensagem = ultimo.get("msg", "")
+                monitor.uptime_24h = uptimes.get(f"{monitor_id}_24")
+
+            self._monitores = monitores
+            self._atualizado_em = time.monotonic()
+            return monitores
+
+    async def monitor(self, monitor_id):
+        return (await self.monitores()).get(int(monitor_id))
+
+    async def push(self, token, ok, mensagem="", ping=None, timeout=TIMEOUT_PADRAO):
+        """Envia um heartbeat para um monitor Push; retorna False se falhar"""
+        params = {"status": "up" if ok else "down", "msg": mensagem or ("OK" if ok else "falha")}
+        if ping is not None:
+            params["ping"] = f"{ping * 1000:.1f}"
+
+        sessao = self._obter_sessao()
+        try:
+            async with sessao.get(
+                f"{self.url}/api/push/{token}",
+                params=params,
+                timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as resp:
+                dados = await resp.json(content_type=None)
+                if not isinstance(dados, dict):
+                    raise KumaErro(resp.status, f"resposta inesperada: {str(dados)[:200]}")
+                if resp.status != 200 or not dados.get("ok"):
+                    raise KumaErro(resp.status, dados.get("msg", ""))
+            self.pushes += 1
+            return True
+        except (aiohttp.ClientError, asyncio.TimeoutError, KumaErro, ValueError) as e:
+            self.falhas_push += 1
+            log.warning("Falha no push para o Kuma: %s", e)
+            return False
+
+
+def ler_tokens_push(valor):
+    """Converte 'cloudflare=abc,docker=def' em {'cloudflare': 'abc', 'docker': 'def'}"""
+    tokens = {}
+    for par in (valor or "").split(","):
+        nome, sep, token = par.strip().partition("=")
+        if sep and nome and token:
+            tokens[nome.strip()] = token.strip()
+    return tokens
@@ -0,0 +1,162 @@
+import re
+import sys
+from collections import namedtuple
+
+# =======================
+# LOG CLASSIFIER
+# =======================
+#
+# Todos os padrões de interesse compilados numa única regex: cada linha é
+# varrida uma vez e recebe um tipo de evento. O estado de autenticação vira
+# uma máquina de estados ordenada, guiada pelo evento mais recente, então
+# um sucesso antigo não esconde uma falha nova (e vice-versa).
+#
+# Uso pela linha de comando (scripts/auth.sh):
+#   docker logs --tail 2000 hytale-server 2>&1 | python3 log_classifier.py --auth
+
+AUTH_ERRO = "auth_erro"
+AUTH_SUCESSO = "auth_sucesso"
+AUTH_PERFIS_MULTIPLOS = "auth_perfis_multiplos"
+AUTH_PERFIL_SELECIONADO = "auth_perfil_selecionado"
+AUTH_AUTENTICADO = "auth_autenticado"
+HANDSHAKE = "handshake"
+REINICIO = "reinicio"
+SERVIDOR_PRONTO = "servidor_pronto"
+PLAYER_ENTROU = "player_entrou"
+PLAYER_SAIU = "player_saiu"
+GC_PAUSA = "gc_pausa"
+
+# "authenticated" só como palavra inteira e sem negação antes
+# ("unauthenticated", "not authenticated" são falhas, não login)
+_SEM_NEGACAO = r"(?<!not )(?<!n't )(?<!not yet )"
+
+# Ordem importa: na mesma posição vence a primeira alternativa
+PADROES = [
+    (PLAYER_ENTROU, r"\[Universe\|P\] Adding player"),
+    (PLAYER_SAIU, r"\[Universe\|P\] Removing player"),
+    (REINICIO, r"Starting Hytale server"),
+    (SERVIDOR_PRONTO, r"Server started"),
+    (AUTH_ERRO, r"session token not available|make sure to auth first|authentication unavailable"
+                r"|auth required|no server tokens configured"),
+    (AUTH_PERFIL_SELECIONADO, r"selected profile:"),
+    (AUTH_PERFIS_MULTIPLOS, r"multiple profiles available"),
+    (AUTH_SUCESSO, r"authentication successful|" + _SEM_NEGACAO + r"\bauthenticated as"
+                   r"|logged in as|found \d+ game profile\(s\)"),
+    (AUTH_AUTENTICADO, _SEM_NEGACAO + r"\bauthenticated\b|login successful"),
+    (HANDSHAKE, r"handshakehandler"),
+    # Unified logging da JVM (-Xlog:gc): "[gc] GC(12) Pause Young (Normal) ... 3.456ms"
+    (GC_PAUSA, r"\[gc *\] GC\(\d+\) Pause"),
+]
+
+REGEX = re.compile(
+    "|".join(f"(?P<{tipo}>{padrao})" for tipo, padrao in PADROES),
+    re.IGNORECASE
+)
+
+Evento = namedtuple("Evento", ["tipo", "timestamp", "linha"])
+
+
+def classificar(linha):
+    """Retorna o tipo de evento da linha, ou None se ela não interessa"""
+    m = REGEX.search(linha)
+    return m.lastgroup if m else None
+
+
+def classificar_linhas(linhas):
+    """Gera Evento para cada linha (com ou sem prefixo de timestamp) reconhecida"""
+    for linha in linhas:
+        linha = linha.rstrip("\r\n")
+        timestamp = None
+        ts, sep, resto = linha.partition(" ")
+        if sep and len(ts) >= 20 and ts[4] == "-" and ts.endswith("Z"):
+            timestamp, linha = ts, resto
+        tipo = classificar(linha)
+        if tipo is not None:
+            yield Evento(tipo, timestamp, linha)
+
+
+# Estados de autenticação
+DESCONHECIDO = "desconhecido"
+OK = "ok"
+AGUARDANDO_PERFIL = "aguardando_perfil"
+NECESSARIA = "necessaria"
+ATENCAO = "atencao"
+
+LIMITE_HANDSHAKES = 5
+
+
+class MaquinaAuth:
+    """Estado de autenticação guiado pelo último evento relevante"""
+
+    def __init__(self):
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.estado = DESCONHECIDO
+        self.handshakes = 0
+        self.ultimo_erro = None
+        self.atualizado_em = None
+
+    def aplicar(self, tipo, timestamp=None, linha=""):
+        if tipo == REINICIO:
+            self.reiniciar()
+        elif tipo == AUTH_ERRO:
+            self.estado = NECESSARIA
+            self.ultimo_erro = linha.strip()
+        elif tipo == AUTH_PERFIS_MULTIPLOS:
+            self.estado = AGUARDANDO_PERFIL
+            self.handshakes = 0
+        elif tipo in (AUTH_SUCESSO, AUTH_PERFIL_SELECIONADO, AUTH_AUTENTICADO):
+            # Login confirmado; encontrar perfis não tira do aguardo de seleção
+            if not (tipo == AUTH_SUCESSO and self.estado == AGUARDANDO_PERFIL):
+                self.estado = OK
+            self.handshakes = 0
+        elif tipo == HANDSHAKE:
+            self.handshakes += 1
+            # Handshakes são normais depois do login; só preocupam sem nenhum
+            # evento de auth desde o último reinício
+            if self.handshakes >= LIMITE_HANDSHAKES and self.estado == DESCONHECIDO:
+                self.estado = ATENCAO
+        else:
+            return
+        self.atualizado_em = timestamp
+
+    def processar_linha(self, timestamp, linha):
+        """Callback compatível com o SeguidorLogs"""
+        tipo = classificar(linha)
+        if tipo is not None:
+            self.aplicar(tipo, timestamp, linha)
+
+    def resultado(self):
+        """(status, detalhes) no formato exibido pelo embed"""
+        if self.estado == NECESSARIA:
+            return "⚠️ Necessária", "Use: /auth login device"
+        if self.estado == ATENCAO:
+            return "⚠️ Atenção", "Possível problema de auth"
+        if self.estado == AGUARDANDO_PERFIL:
+            return "✅ OK", "Aguardando seleção de perfil"
+        return "✅ OK", ""
+
+
+# Só 1 pede ação, como no embed; 2 e 3 são informativos ("⚠️ Atenção" e
+# aguardando perfil, que o bot mostra como "✅ OK")
+CODIGOS_SAIDA = {OK: 0, DESCONHECIDO: 0, NECESSARIA: 1, ATENCAO: 2, AGUARDANDO_PERFIL: 3}
+
+
+def main(argv):
+    eventos = classificar_linhas(sys.stdin)
+
+    if "--auth" in argv:
+        maquina = MaquinaAuth()
+        for evento in eventos:
+            maquina.aplicar(*evento)
+        print(maquina.estado)
+        return CODIGOS_SAIDA[maquina.estado]
+
+    for evento in eventos:
+        print(f"{evento.timestamp or '-'}\t{evento.tipo}\t{evento.linha}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
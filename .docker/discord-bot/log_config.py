@@ -0,0 +1,150 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from datetime import datetime, timezone
+
+# =======================
+# LOG CONFIG
+# =======================
+#
+# Logging do bot com níveis e saída JSON (uma linha por registro, boa para o
+# driver json-file do Docker). O event loop só enfileira o registro: a
+# formatação e a escrita no stdout ficam na thread do QueueListener.
+# Mensagens de DEBUG repetidas (mesmo template) são limitadas por janela,
+# e o nível pode ser trocado em tempo de execução por um arquivo observado.
+
+NIVEL_PADRAO = "INFO"
+FORMATO_PADRAO = "json"
+# Cada template de DEBUG sai no máximo LIMITE_DEBUG vezes por JANELA_DEBUG segundos
+LIMITE_DEBUG = 5
+JANELA_DEBUG = 60.0
+
+# Atributos padrão do LogRecord; o resto veio de `extra=` e vai para o JSON
+_ATRIBUTOS_PADRAO = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener = None
+
+
+class FormatadorJSON(logging.Formatter):
+    def format(self, record):
+        dados = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        for chave, valor in vars(record).items():
+            if chave not in _ATRIBUTOS_PADRAO and not chave.startswith("_"):
+                dados[chave] = valor
+        if record.exc_text:
+            dados["exc"] = record.exc_text
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+class _Enfileirador(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Resolve só os args na thread de quem loga; o traceback segue à parte
+        # (campo "exc" no JSON) em vez de ser colado na mensagem
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class FiltroTaxa(logging.Filter):
+    """Limita registros DEBUG por (logger, template); conta os suprimidos"""
+
+    def __init__(self, limite=LIMITE_DEBUG, janela=JANELA_DEBUG):
+        super().__init__()
+        self.limite = limite
+        self.janela = janela
+        self._janelas = {}
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+
+        chave = (record.name, record.msg)
+        agora = time.monotonic()
+        inicio, emitidos, suprimidos = self._janelas.get(chave, (agora, 0, 0))
+        if agora - inicio >= self.janela:
+            if suprimidos:
+                record.suprimidos = suprimidos
+            inicio, emitidos, suprimidos = agora, 0, 0
+
+        if emitidos >= self.limite:
+            self._janelas[chave] = (inicio, emitidos, suprimidos + 1)
+            return False
+
+        self._janelas[chave] = (inicio, emitidos + 1, suprimidos)
+        return True
+
+
+def _nivel(nome):
+    nivel = logging.getLevelName(str(nome).strip().upper())
+    if not isinstance(nivel, int):
+        raise ValueError(f"Nível de log inválido: {nome}")
+    return nivel
+
+
+def configurar_logs(nivel=NIVEL_PADRAO, formato=FORMATO_PADRAO):
+    """Configura o logger raiz com fila + thread de escrita (idempotente)"""
+    global _listener
+
+    if _listener is not None:
+        return
+
+    saida = logging.StreamHandler(sys.stdout)
+    if formato == "json":
+        saida.setFormatter(FormatadorJSON())
+    else:
+        saida.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    fila = queue.SimpleQueue()
+    enfileirador = _Enfileirador(fila)
+    enfileirador.addFilter(FiltroTaxa())
+
+    raiz = logging.getLogger()
+    raiz.handlers[:] = [enfileirador]
+    raiz.setLevel(_nivel(nivel))
+    # discord.py em DEBUG loga cada payload do gateway
+    logging.getLogger("discord").setLevel(max(_nivel(nivel), logging.INFO))
+
+    _listener = logging.handlers.QueueListener(fila, saida, respect_handler_level=True)
+    _listener.start()
+    atexit.register(parar_logs)
+
+
+def parar_logs():
+    """Esvazia a fila e para a thread de escrita"""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def definir_nivel(nome):
+    """Troca o nível do logger raiz em tempo de execução; retorna o nível aplicado"""
+    nivel = _nivel(nome)
+    logging.getLogger().setLevel(nivel)
+    logging.getLogger("discord").setLevel(max(nivel, logging.INFO))
+    return logging.getLevelName(nivel)
+
+
+def ler_nivel(caminho, padrao=NIVEL_PADRAO):
+    """Nível pedido no arquivo de controle, ou `padrao` se ele não existir"""
+    try:
+        with open(caminho) as f:
+            conteudo = f.read().strip()
+    except OSError:
+        return padrao
+    return conteudo or padrao
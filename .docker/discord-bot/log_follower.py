@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+
+# =======================
+# LOG FOLLOWER
+# =======================
+#
+# Mantém um único stream de logs (Docker Engine API) aberto e entrega cada
+# linha uma única vez para quem estiver inscrito. Depois de uma reconexão
+# continua a partir do último timestamp visto, sem reprocessar o histórico.
+
+log = logging.getLogger(__name__)
+
+TAIL_INICIAL = "2000"
+ESPERA_RECONEXAO = 5
+
+
+def separar_timestamp(linha):
+    """Separa o prefixo RFC3339 adicionado por timestamps=1 do conteúdo da linha"""
+    ts, sep, resto = linha.partition(" ")
+    if sep and len(ts) >= 20 and ts[4] == "-" and ts.endswith("Z"):
+        return ts, resto
+    return None, linha
+
+
+class SeguidorLogs:
+    """Segue os logs de um container e repassa cada linha aos assinantes"""
+
+    def __init__(self, docker, container, tail_inicial=TAIL_INICIAL):
+        self.docker = docker
+        self.container = container
+        self.tail_inicial = tail_inicial
+        self.ultimo_timestamp = None
+        self.linhas_processadas = 0
+        self.conectado = False
+        self._assinantes = []
+        # Linhas já vistas no último timestamp (since é inclusivo)
+        self._vistas_no_ultimo_ts = set()
+        self._task = None
+
+    def assinar(self, callback):
+        """Registra callback(timestamp, linha) chamado para cada nova linha"""
+        self._assinantes.append(callback)
+
+    def iniciar(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+        return self._task
+
+    def parar(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _entregar(self, linha_bruta):
+        linha_bruta = linha_bruta.rstrip("\r\n")
+        if not linha_bruta:
+            return
+
+        ts, linha = separar_timestamp(linha_bruta)
+
+        if ts is not None:
+            if ts == self.ultimo_timestamp:
+                if linha in self._vistas_no_ultimo_ts:
+                    return
+            elif self.ultimo_timestamp is None or ts > self.ultimo_timestamp:
+                self.ultimo_timestamp = ts
+                self._vistas_no_ultimo_ts = set()
+            self._vistas_no_ultimo_ts.add(linha)
+
+        self.linhas_processadas += 1
+        for callback in self._assinantes:
+            try:
+                callback(ts, linha)
+            except Exception:
+                log.exception("Erro no assinante de logs")
+
+    async def _seguir_uma_vez(self):
+        if self.ultimo_timestamp:
+            stream = self.docker.logs(self.container, follow=True, since=self.ultimo_timestamp)
+        else:
+            stream = self.docker.logs(self.container, follow=True, tail=self.tail_inicial)
+
+        self.conectado = True
+        log.info("Seguindo logs de %s (desde %s)", self.container, self.ultimo_timestamp or "tail " + self.tail_inicial)
+
+        try:
+            async for linha in stream:
+                self._entregar(linha)
+        finally:
+            self.conectado = False
+            await stream.aclose()
+
+    async def _loop(self):
+        while True:
+            inicio = time.monotonic()
+            try:
+                await self._seguir_uma_vez()
+                log.info("Stream de logs de %s encerrado", self.container)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("Erro ao seguir logs de %s: %s", self.container, e)
+
+            # Evita loop apertado quando o container está parado
+            if time.monotonic() - inicio < ESPERA_RECONEXAO:
+                await asyncio.sleep(ESPERA_RECONEXAO)
@@ -0,0 +1,103 @@
+import fnmatch
+import os
+import zipfile
+
+# =======================
+# METADATA CACHE
+# =======================
+#
+# Evita reler o MANIFEST.MF do JAR e dar stat em todos os backups a cada
+# tick: o manifesto só é relido quando mtime/tamanho do JAR mudam, e o
+# índice de backups só olha os arquivos novos quando o diretório muda.
+
+
+def _assinatura(caminho):
+    st = os.stat(caminho)
+    return st.st_mtime_ns, st.st_size
+
+
+class CacheManifesto:
+    """Lê um atributo do MANIFEST.MF do JAR só quando o arquivo muda"""
+
+    def __init__(self, jar_path, atributo="Implementation-Version"):
+        self.jar_path = jar_path
+        self.atributo = atributo
+        self._assinatura = None
+        self._valor = None
+
+    def _ler(self):
+        with zipfile.ZipFile(self.jar_path, 'r') as jar:
+            with jar.open('META-INF/MANIFEST.MF') as manifest:
+                manifest_content = manifest.read().decode('utf-8')
+
+        prefixo = self.atributo + ":"
+        for line in manifest_content.splitlines():
+            if line.startswith(prefixo):
+                return line.split(":", 1)[1].strip()
+        return None
+
+    def obter(self):
+        """Retorna o valor do atributo, ou None se o JAR não existir"""
+        try:
+            assinatura = _assinatura(self.jar_path)
+        except FileNotFoundError:
+            self._assinatura = None
+            self._valor = None
+            return None
+
+        if assinatura != self._assinatura:
+            self._valor = self._ler()
+            self._assinatura = assinatura
+        return self._valor
+
+
+class IndiceBackups:
+    """Índice incremental dos arquivos de backup de um diretório"""
+
+    def __init__(self, diretorio, padrao="*.tar.gz"):
+        self.diretorio = diretorio
+        self.padrao = padrao
+        # nome -> mtime (segundos)
+        self.arquivos = {}
+        self._mtime_dir = None
+
+    def _atualizar(self):
+        mtime_dir = os.stat(self.diretorio).st_mtime_ns
+        if mtime_dir == self._mtime_dir:
+            return
+        self._mtime_dir = mtime_dir
+
+        nomes = {
+            nome for nome in os.listdir(self.diretorio)
+            if fnmatch.fnmatch(nome, self.padrao)
+        }
+
+        for nome in self.arquivos.keys() - nomes:
+            del self.arquivos[nome]
+
+        # Só os arquivos novos recebem stat
+        for nome in nomes - self.arquivos.keys():
+            try:
+                self.arquivos[nome] = os.stat(os.path.join(self.diretorio, nome)).st_mtime
+            except FileNotFoundError:
+                pass
+
+    def mais_recente(self):
+        """Retorna (nome, mtime) do backup mais recente, ou None"""
+        if not os.path.isdir(self.diretorio):
+            self.arquivos.clear()
+            self._mtime_dir = None
+            return None
+
+        self._atualizar()
+        if not self.arquivos:
+            return None
+
+        nome = max(self.arquivos, key=self.arquivos.get)
+        # O backup mais recente pode ainda estar sendo escrito
+        try:
+            self.arquivos[nome] = os.stat(os.path.join(self.diretorio, nome)).st_mtime
+        except FileNotFoundError:
+            self._mtime_dir = None
+            return self.mais_recente()
+        return nome, self.arquivos[nome]
@@ -0,0 +1,162 @@
+import logging
+import math
+
+from aiohttp import web
+
+from dns_cache import BUCKETS_LATENCIA, HistogramaLatencia
+
+# =======================
+# METRICS
+# =======================
+#
+# Endpoint /metrics no formato texto do Prometheus, servido pelo aiohttp no
+# mesmo event loop do bot. Histogramas e contadores do caminho quente são
+# atualizados na hora; o resto (players, linhas de log, reinícios) é lido
+# dos objetos existentes por coletores chamados só no momento do scrape.
+
+log = logging.getLogger(__name__)
+
+METRICS_PORTA_PADRAO = 9108
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _formatar_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{nome}="{_escapar(valor)}"' for nome, valor in labels) + "}"
+
+
+def _formatar_valor(valor):
+    if math.isinf(valor):
+        return "+Inf" if valor > 0 else "-Inf"
+    return repr(float(valor))
+
+
+class FamiliaMetrica:
+    """Uma métrica e suas séries, identificadas pelos labels"""
+
+    def __init__(self, nome, tipo, ajuda, buckets=None):
+        self.nome = nome
+        self.tipo = tipo
+        self.ajuda = ajuda
+        self.buckets = buckets
+        self.series = {}
+
+    @staticmethod
+    def _chave(labels):
+        return tuple(sorted(labels.items()))
+
+    def inc(self, valor=1, **labels):
+        chave = self._chave(labels)
+        self.series[chave] = self.series.get(chave, 0) + valor
+
+    def definir(self, valor, **labels):
+        self.series[self._chave(labels)] = valor
+
+    def histograma(self, **labels):
+        """HistogramaLatencia da série (criado na primeira chamada)"""
+        chave = self._chave(labels)
+        if chave not in self.series:
+            self.series[chave] = HistogramaLatencia(self.buckets)
+        return self.series[chave]
+
+    def observar(self, valor, **labels):
+        self.histograma(**labels).observar(valor)
+
+    def vincular(self, histograma, **labels):
+        """Expõe um HistogramaLatencia que já existe em outro módulo"""
+        self.series[self._chave(labels)] = histograma
+
+    def renderizar(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+        for labels, valor in self.series.items():
+            if self.tipo != "histogram":
+                if valor is not None:
+                    linhas.append(f"{self.nome}{_formatar_labels(labels)} {_formatar_valor(valor)}")
+                continue
+
+            for limite, contagem in zip(valor.buckets, valor.contagens):
+                le = labels + (("le", _formatar_valor(limite)),)
+                linhas.append(f"{self.nome}_bucket{_formatar_labels(le)} {contagem}")
+            le = labels + (("le", "+Inf"),)
+            linhas.append(f"{self.nome}_bucket{_formatar_labels(le)} {valor.total}")
+            linhas.append(f"{self.nome}_sum{_formatar_labels(labels)} {_formatar_valor(valor.soma)}")
+            linhas.append(f"{self.nome}_count{_formatar_labels(labels)} {valor.total}")
+        return linhas
+
+
+class RegistroMetricas:
+    """Conjunto de métricas expostas no /metrics"""
+
+    def __init__(self):
+        self.familias = {}
+        self._coletores = []
+
+    def _familia(self, nome, tipo, ajuda, buckets=None):
+        if nome not in self.familias:
+            self.familias[nome] = FamiliaMetrica(nome, tipo, ajuda, buckets)
+        return self.familias[nome]
+
+    def contador(self, nome, ajuda):
+        return self._familia(nome, "counter", ajuda)
+
+    def gauge(self, nome, ajuda):
+        return self._familia(nome, "gauge", ajuda)
+
+    def histograma(self, nome, ajuda, buckets=BUCKETS_LATENCIA):
+        return self._familia(nome, "histogram", ajuda, buckets)
+
+    def coletor(self, func):
+        """Registra func(registro) chamada antes de cada scrape (usável como decorator)"""
+        self._coletores.append(func)
+        return func
+
+    def renderizar(self):
+        for func in self._coletores:
+            try:
+                func(self)
+            except Exception:
+                log.exception("Erro no coletor de métricas")
+
+        linhas = []
+        for familia in self.familias.values():
+            linhas.extend(familia.renderizar())
+        return "\n".join(linhas) + "\n"
+
+
+class ServidorMetricas:
+    """Servidor HTTP do /metrics rodando no event loop do bot"""
+
+    def __init__(self, registro, porta=METRICS_PORTA_PADRAO, host="0.0.0.0"):
+        self.registro = registro
+        self.porta = porta
+        self.host = host
+        self.scrapes = 0
+        self._runner = None
+
+    async def _metrics(self, request):
+        self.scrapes += 1
+        return web.Response(
+            body=self.registro.renderizar().encode("utf-8"),
+            headers={"Content-Type": CONTENT_TYPE}
+        )
+
+    async def iniciar(self):
+        app = web.Application()
+        app.router.add_get("/metrics", self._metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.porta).start()
+        log.info("Métricas em http://%s:%s/metrics", self.host, self.porta)
+
+    async def parar(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+registro = RegistroMetricas()
@@ -0,0 +1,194 @@
+import asyncio
+import itertools
+import logging
+import os
+import socket
+import statistics
+import struct
+import time
+from collections import deque
+
+# =======================
+# NET PROBE
+# =======================
+#
+# Probes ICMP (socket datagram sem privilégios) e TCP nativas do asyncio,
+# sem threads nem processos filhos. RTT medido com relógio monotônico e
+# estatísticas de jitter/perda numa janela deslizante por alvo.
+
+log = logging.getLogger(__name__)
+
+JANELA_PADRAO = 60
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+
+class EstatisticasProbe:
+    """Janela deslizante de RTTs (segundos); None representa perda"""
+
+    def __init__(self, janela=JANELA_PADRAO):
+        self.amostras = deque(maxlen=janela)
+
+    def registrar(self, rtt):
+        self.amostras.append(rtt)
+
+    @property
+    def rtts(self):
+        return [rtt for rtt in self.amostras if rtt is not None]
+
+    @property
+    def perda(self):
+        """Fração de probes sem resposta na janela (0.0 a 1.0)"""
+        if not self.amostras:
+            return 0.0
+        return 1 - len(self.rtts) / len(self.amostras)
+
+    @property
+    def ultimo(self):
+        return self.amostras[-1] if self.amostras else None
+
+    @property
+    def media(self):
+        rtts = self.rtts
+        return statistics.fmean(rtts) if rtts else None
+
+    @property
+    def jitter(self):
+        """Média da variação entre RTTs consecutivos (estilo RFC 3550)"""
+        rtts = self.rtts
+        if len(rtts) < 2:
+            return None
+        return statistics.fmean(abs(b - a) for a, b in zip(rtts, rtts[1:]))
+
+    def percentil(self, p):
+        """Percentil p (0-100) dos RTTs da janela, por interpolação linear"""
+        rtts = sorted(self.rtts)
+        if not rtts:
+            return None
+        posicao = (len(rtts) - 1) * p / 100
+        baixo = int(posicao)
+        alto = min(baixo + 1, len(rtts) - 1)
+        return rtts[baixo] + (rtts[alto] - rtts[baixo]) * (posicao - baixo)
+
+    def resumo(self):
+        rtts = self.rtts
+        return {
+            "ultimo": self.ultimo,
+            "min": min(rtts) if rtts else None,
+            "media": self.media,
+            "p50": self.percentil(50),
+            "p95": self.percentil(95),
+            "p99": self.percentil(99),
+            "max": max(rtts) if rtts else None,
+            "jitter": self.jitter,
+            "perda": self.perda,
+            "amostras": len(self.amostras)
+        }
+
+
+def _checksum(dados):
+    if len(dados) % 2:
+        dados += b"\x00"
+    soma = sum(struct.unpack(f"!{len(dados) // 2}H", dados))
+    soma = (soma >> 16) + (soma & 0xFFFF)
+    soma += soma >> 16
+    return ~soma & 0xFFFF
+
+
+async def _resolver(host):
+    loop = asyncio.get_running_loop()
+    infos = await loop.getaddrinfo(host, None, family=socket.AF_INET, type=socket.SOCK_DGRAM)
+    return infos[0][4][0]
+
+
+_sequencia = itertools.count(1)
+
+
+async def ping_icmp(host, timeout=2):
+    """Envia um ICMP echo e retorna o RTT em segundos (None se não houver resposta)
+
+    Usa SOCK_DGRAM/IPPROTO_ICMP, liberado pelo kernel via net.ipv4.ping_group_range
+    (o Docker já libera para containers), então não precisa de root nem do `ping`.
+    """
+    loop = asyncio.get_running_loop()
+    ip = await _resolver(host)
+    seq = next(_sequencia) & 0xFFFF
+    payload = os.urandom(16)
+
+    cabecalho = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, 0, seq)
+    pacote = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, _checksum(cabecalho + payload), 0, seq) + payload
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+    sock.setblocking(False)
+    try:
+        inicio = time.monotonic()
+        await loop.sock_sendto(sock, pacote, (ip, 0))
+
+        async def aguardar_resposta():
+            while True:
+                dados = await loop.sock_recv(sock, 1024)
+                # O kernel entrega só o cabeçalho ICMP (sem IP) e já filtra pelo id
+                if len(dados) >= 8:
+                    tipo, _, _, _, seq_resposta = struct.unpack("!BBHHH", dados[:8])
+                    if tipo == ICMP_ECHO_REPLY and seq_resposta == seq and dados[8:] == payload:
+                        return time.monotonic() - inicio
+
+        try:
+            return await asyncio.wait_for(aguardar_resposta(), timeout)
+        except asyncio.TimeoutError:
+            return None
+    finally:
+        sock.close()
+
+
+async def conectar_tcp(host, porta, timeout=5):
+    """Abre uma conexão TCP e retorna o tempo de handshake em segundos (None se falhar)"""
+    inicio = time.monotonic()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, porta), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return None
+
+    rtt = time.monotonic() - inicio
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return rtt
+
+
+class ProberRede:
+    """Probes ICMP/TCP com estatísticas por alvo"""
+
+    def __init__(self, janela=JANELA_PADRAO):
+        self.janela = janela
+        self.estatisticas = {}
+        self._icmp_indisponivel = False
+
+    def _stats(self, alvo):
+        if alvo not in self.estatisticas:
+            self.estatisticas[alvo] = EstatisticasProbe(self.janela)
+        return self.estatisticas[alvo]
+
+    async def ping(self, host, timeout=2):
+        if self._icmp_indisponivel:
+            return False
+
+        try:
+            rtt = await ping_icmp(host, timeout)
+        except PermissionError:
+            log.error("Socket ICMP não permitido (verifique net.ipv4.ping_group_range)")
+            self._icmp_indisponivel = True
+            return False
+        except OSError as e:
+            log.debug("Erro no ping para %s: %s", host, e)
+            rtt = None
+
+        self._stats(f"icmp:{host}").registrar(rtt)
+        return rtt is not None
+
+    async def tcp(self, host, porta, timeout=5):
+        rtt = await conectar_tcp(host, porta, timeout)
+        self._stats(f"tcp:{host}:{porta}").registrar(rtt)
+        return rtt is not None
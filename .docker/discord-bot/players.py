@@ -0,0 +1,190 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+
+from log_classifier import PLAYER_ENTROU, PLAYER_SAIU, REINICIO, classificar
+
+# =======================
+# PLAYERS
+# =======================
+#
+# Presença dos players mantida em memória a partir do stream de logs.
+# Cada evento é aplicado uma vez, na ordem em que aparece; o reinício do
+# servidor é detectado pela posição (timestamp) da linha no log e o estado
+# só vai para o disco quando muda, com escrita atômica e debounce.
+
+log = logging.getLogger(__name__)
+
+DEBOUNCE_PADRAO = 2.0
+MARCADOR_ADDING = "[Universe|P] Adding player"
+MARCADOR_REMOVING = "[Universe|P] Removing player"
+
+
+def parsear_adding(linha):
+    """[Universe|P] Adding player 'nome (uuid)' -> (nome, uuid)"""
+    inicio = linha.find("'", linha.find(MARCADOR_ADDING)) + 1
+    fim = linha.find("'", inicio)
+    if inicio <= 0 or fim <= inicio:
+        return None
+
+    conteudo = linha[inicio:fim]
+    abre = conteudo.rfind(" (")
+    if abre <= 0 or not conteudo.endswith(")"):
+        return conteudo.strip(), None
+    return conteudo[:abre].strip(), conteudo[abre + 2:-1].strip()
+
+
+def parsear_removing(linha):
+    """[Universe|P] Removing player 'nome' (uuid) -> (nome, uuid)"""
+    inicio = linha.find("'", linha.find(MARCADOR_REMOVING)) + 1
+    fim = linha.find("'", inicio)
+    if inicio <= 0 or fim <= inicio:
+        return None
+
+    nome = linha[inicio:fim].strip()
+    abre = linha.find("(", fim)
+    fecha = linha.find(")", abre)
+    uuid = linha[abre + 1:fecha].strip() if abre > 0 and fecha > abre else None
+    return nome, uuid
+
+
+class RastreadorPlayers:
+    """Mantém quem está online (por UUID) e persiste só quando há mudança"""
+
+    def __init__(self, arquivo_estado, debounce=DEBOUNCE_PADRAO):
+        self.arquivo_estado = arquivo_estado
+        self.debounce = debounce
+        # uuid (ou nome, se o log não trouxer uuid) -> {"nome", "desde"}
+        self.online = {}
+        self.ultimo_timestamp = None
+        self.ultimo_reinicio = None
+        self.versao = 0
+        self._assinantes = []
+        self._salvamento = None
+        self.carregar()
+
+    def ao_mudar(self, callback):
+        """Registra callback(evento, uuid, nome) para entradas, saídas e reinícios"""
+        self._assinantes.append(callback)
+
+    def _notificar(self, evento, uuid, nome, timestamp):
+        for callback in self._assinantes:
+            try:
+                callback(evento, uuid, nome, timestamp)
+            except Exception:
+                log.exception("Erro no assinante de players")
+
+    @property
+    def nomes(self):
+        return sorted(info["nome"] for info in self.online.values())
+
+    # ---------- persistência ----------
+
+    def carregar(self):
+        try:
+            with open(self.arquivo_estado) as f:
+                dados = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            log.warning("Erro ao carregar estado de players: %s", e)
+            return
+
+        # Formato antigo (lista de nomes) é descartado: o replay do log reconstrói
+        if isinstance(dados, dict):
+            self.online = dados.get("online", {})
+            self.ultimo_timestamp = dados.get("ultimo_timestamp")
+            self.ultimo_reinicio = dados.get("ultimo_reinicio")
+
+    def salvar_agora(self):
+        if self._salvamento is not None:
+            self._salvamento.cancel()
+            self._salvamento = None
+
+        dados = {
+            "online": self.online,
+            "ultimo_timestamp": self.ultimo_timestamp,
+            "ultimo_reinicio": self.ultimo_reinicio
+        }
+        diretorio = os.path.dirname(os.path.abspath(self.arquivo_estado))
+        try:
+            fd, temporario = tempfile.mkstemp(dir=diretorio, prefix=".players-", suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(dados, f)
+            os.replace(temporario, self.arquivo_estado)
+            log.debug("Estado de players salvo: %d online", len(self.online))
+        except Exception as e:
+            log.warning("Erro ao salvar estado de players: %s", e)
+
+    def _agendar_salvamento(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.salvar_agora()
+            return
+
+        if self._salvamento is None:
+            self._salvamento = loop.call_later(self.debounce, self.salvar_agora)
+
+    # ---------- eventos ----------
+
+    def _mudou(self, evento, uuid, nome, timestamp):
+        self.versao += 1
+        self._notificar(evento, uuid, nome, timestamp)
+        self._agendar_salvamento()
+
+    def processar_linha(self, timestamp, linha):
+        """Callback do SeguidorLogs"""
+        tipo = classificar(linha)
+        if tipo is not None:
+            self.aplicar(tipo, timestamp, linha)
+
+    def aplicar(self, tipo, timestamp, linha):
+        """Aplica uma linha já classificada pelo log_classifier"""
+        if tipo not in (PLAYER_ENTROU, PLAYER_SAIU, REINICIO):
+            return
+
+        # Linhas já aplicadas antes de um restart do bot (replay do tail)
+        if timestamp is not None and self.ultimo_timestamp is not None and timestamp < self.ultimo_timestamp:
+            return
+        if timestamp is not None:
+            self.ultimo_timestamp = timestamp
+
+        if tipo == PLAYER_ENTROU:
+            dados = parsear_adding(linha)
+            if dados is None:
+                log.debug("Erro ao parsear Adding: %s", linha[:100])
+                return
+            nome, uuid = dados
+            chave = uuid or nome
+            if chave not in self.online:
+                self.online[chave] = {"nome": nome, "desde": timestamp}
+                log.info("Player conectou: %s", nome)
+                self._mudou("entrada", uuid, nome, timestamp)
+
+        elif tipo == PLAYER_SAIU:
+            dados = parsear_removing(linha)
+            if dados is None:
+                log.debug("Erro ao parsear Removing: %s", linha[:100])
+                return
+            nome, uuid = dados
+            chave = uuid if uuid in self.online else nome
+            if chave not in self.online:
+                # Sem uuid no índice: procura pelo nome
+                chave = next((k for k, v in self.online.items() if v["nome"] == nome), None)
+            if chave is not None:
+                del self.online[chave]
+                log.info("Player desconectou: %s", nome)
+                self._mudou("saida", uuid, nome, timestamp)
+
+        elif tipo == REINICIO:
+            if timestamp is not None and timestamp == self.ultimo_reinicio:
+                return
+            self.ultimo_reinicio = timestamp
+            log.info("Servidor reiniciou - resetando lista de players")
+            for chave, info in list(self.online.items()):
+                del self.online[chave]
+                self._notificar("saida", chave if chave != info["nome"] else None, info["nome"], timestamp)
+            self._mudou("reinicio", None, None, timestamp)
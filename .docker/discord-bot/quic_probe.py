@@ -0,0 +1,124 @@
+import asyncio
+import os
+import struct
+import time
+
+from net_probe import JANELA_PADRAO, EstatisticasProbe
+
+# =======================
+# QUIC PROBE
+# =======================
+#
+# O servidor Hytale só escuta QUIC (UDP), então TCP na 5520 nunca responde.
+# Esta probe manda um pacote QUIC long header com uma versão reservada
+# (0x?a?a?a?a, RFC 9000 §15): um servidor QUIC vivo é obrigado a responder
+# com Version Negotiation sem criar conexão nem estado. Assim detectamos
+# "JVM de pé mas sem aceitar conexões" e medimos o RTT até a pilha QUIC.
+
+# Versão reservada para forçar negociação (padrão 0x?a?a?a?a)
+VERSAO_RESERVADA = 0x1A2A3A4A
+# Servidores só respondem a datagramas iniciais com pelo menos 1200 bytes
+TAMANHO_MINIMO = 1200
+TAMANHO_CID = 8
+
+
+def montar_pacote(dcid, scid):
+    # Long header (1), fixed bit (1), tipo Initial (00), 4 bits aleatórios
+    primeiro = 0xC0 | (os.urandom(1)[0] & 0x0F)
+    cabecalho = (
+        struct.pack("!BI", primeiro, VERSAO_RESERVADA)
+        + bytes([len(dcid)]) + dcid
+        + bytes([len(scid)]) + scid
+    )
+    return cabecalho + os.urandom(TAMANHO_MINIMO - len(cabecalho))
+
+
+def interpretar_negociacao(dados, dcid, scid):
+    """Retorna as versões anunciadas se `dados` for a Version Negotiation esperada"""
+    if len(dados) < 7 or not dados[0] & 0x80:
+        return None
+
+    versao = struct.unpack("!I", dados[1:5])[0]
+    if versao != 0:
+        return None
+
+    # Datagramas truncados (ou de outro protocolo) são ignorados, não levantam
+    pos = 5
+    cids = []
+    for _ in range(2):
+        if pos >= len(dados):
+            return None
+        tamanho = dados[pos]
+        if pos + 1 + tamanho > len(dados):
+            return None
+        cids.append(dados[pos + 1:pos + 1 + tamanho])
+        pos += 1 + tamanho
+    dcid_resposta, scid_resposta = cids
+
+    # O servidor inverte os connection IDs que enviamos
+    if dcid_resposta != scid or scid_resposta != dcid:
+        return None
+
+    return [struct.unpack("!I", dados[i:i + 4])[0] for i in range(pos, len(dados) - 3, 4)]
+
+
+class _ProtocoloQuic(asyncio.DatagramProtocol):
+    def __init__(self, dcid, scid, futuro):
+        self.dcid = dcid
+        self.scid = scid
+        self.futuro = futuro
+
+    def datagram_received(self, dados, addr):
+        versoes = interpretar_negociacao(dados, self.dcid, self.scid)
+        if versoes is not None and not self.futuro.done():
+            self.futuro.set_result(versoes)
+
+    def error_received(self, exc):
+        # ICMP port unreachable: ninguém escutando na porta
+        if not self.futuro.done():
+            self.futuro.set_exception(exc)
+
+
+async def sondar_quic(host, porta, timeout=3):
+    """Retorna (rtt, versões suportadas), ou (None, []) se não houver resposta"""
+    loop = asyncio.get_running_loop()
+    dcid = os.urandom(TAMANHO_CID)
+    scid = os.urandom(TAMANHO_CID)
+    futuro = loop.create_future()
+
+    transporte = None
+    try:
+        # Falha de DNS ou de rota também conta como perda
+        transporte, _ = await loop.create_datagram_endpoint(
+            lambda: _ProtocoloQuic(dcid, scid, futuro),
+            remote_addr=(host, porta)
+        )
+        inicio = time.monotonic()
+        transporte.sendto(montar_pacote(dcid, scid))
+        versoes = await asyncio.wait_for(futuro, timeout)
+        return time.monotonic() - inicio, versoes
+    except (asyncio.TimeoutError, OSError):
+        return None, []
+    finally:
+        if transporte is not None:
+            transporte.close()
+
+
+class ProberQuic:
+    """Probes QUIC com percentis de RTT por alvo"""
+
+    def __init__(self, janela=JANELA_PADRAO):
+        self.janela = janela
+        self.estatisticas = {}
+        self.versoes = {}
+
+    async def sondar(self, host, porta, timeout=3):
+        alvo = f"quic:{host}:{porta}"
+        rtt, versoes = await sondar_quic(host, porta, timeout)
+
+        if alvo not in self.estatisticas:
+            self.estatisticas[alvo] = EstatisticasProbe(self.janela)
+        self.estatisticas[alvo].registrar(rtt)
+        if versoes:
+            self.versoes[alvo] = versoes
+        return rtt is not None
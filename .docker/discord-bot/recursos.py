@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import re
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from dns_cache import HistogramaLatencia
+from log_classifier import GC_PAUSA, REINICIO
+
+# =======================
+# RECURSOS
+# =======================
+#
+# Amostras de CPU, memória e rede do container (stream /stats do Docker,
+# que lê os contadores do cgroup dele) e pausas de GC da JVM, lidas das
+# linhas "-Xlog:gc" que o entrypoint manda para o stdout (com GC_LOG=true,
+# desligado por padrão) e chegam pelo mesmo SeguidorLogs. Tudo fica em buffers circulares: a ocupação do heap
+# depois de cada GC é o que o servidor realmente usa, e é a base para
+# dimensionar o -Xmx.
+
+log = logging.getLogger(__name__)
+
+JANELA_AMOSTRAS = 600
+JANELA_GC = 500
+ESPERA_RECONEXAO = 5
+# Pausas de GC vão de sub-milissegundo a segundos (Full GC)
+BUCKETS_PAUSA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+UNIDADES = {"B": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+REGEX_GC = re.compile(
+    r"GC\((?P<id>\d+)\) (?P<tipo>Pause [A-Za-z]+(?: \([A-Za-z ]+\))?).*?"
+    r"(?P<antes>\d+)(?P<u1>[BKMG])->(?P<depois>\d+)(?P<u2>[BKMG])"
+    r"\((?P<heap>\d+)(?P<u3>[BKMG])\) (?P<pausa>[\d.]+)ms"
+)
+
+
+@dataclass
+class AmostraContainer:
+    momento: float
+    cpu: float
+    memoria: int
+    limite_memoria: int
+    rx_bytes: int
+    tx_bytes: int
+
+
+@dataclass
+class PausaGC:
+    timestamp: str
+    tipo: str
+    pausa: float
+    heap_antes: int
+    heap_depois: int
+    heap_total: int
+
+
+def parsear_gc(linha):
+    """Extrai uma PausaGC de uma linha de -Xlog:gc (None se não for pausa com heap)"""
+    m = REGEX_GC.search(linha)
+    if not m:
+        return None
+    return PausaGC(
+        timestamp=None,
+        tipo=m.group("tipo"),
+        pausa=float(m.group("pausa")) / 1000,
+        heap_antes=int(m.group("antes")) * UNIDADES[m.group("u1")],
+        heap_depois=int(m.group("depois")) * UNIDADES[m.group("u2")],
+        heap_total=int(m.group("heap")) * UNIDADES[m.group("u3")]
+    )
+
+
+def calcular_amostra(stats):
+    """Converte uma leitura de /stats em AmostraContainer (None sem leitura anterior)"""
+    cpu = stats.get("cpu_stats", {})
+    precpu = stats.get("precpu_stats", {})
+    delta_sistema = cpu.get("system_cpu_usage", 0) - precpu.get("system_cpu_usage", 0)
+    if not precpu.get("system_cpu_usage") or delta_sistema <= 0:
+        return None
+
+    delta_cpu = cpu.get("cpu_usage", {}).get("total_usage", 0) - precpu.get("cpu_usage", {}).get("total_usage", 0)
+    cpus = cpu.get("online_cpus") or len(cpu.get("cpu_usage", {}).get("percpu_usage") or []) or 1
+
+    memoria = stats.get("memory_stats", {})
+    detalhes = memoria.get("stats", {})
+    # Mesmo cálculo do `docker stats`: page cache inativo não conta como uso
+    cache = detalhes.get("inactive_file", detalhes.get("total_inactive_file", 0))
+
+    redes = (stats.get("networks") or {}).values()
+    return AmostraContainer(
+        momento=time.time(),
+        cpu=max(delta_cpu, 0) / delta_sistema * cpus * 100,
+        memoria=max(memoria.get("usage", 0) - cache, 0),
+        limite_memoria=memoria.get("limit", 0),
+        rx_bytes=sum(rede.get("rx_bytes", 0) for rede in redes),
+        tx_bytes=sum(rede.get("tx_bytes", 0) for rede in redes)
+    )
+
+
+class AmostradorRecursos:
+    """Séries de recursos do container e do GC da JVM em buffers circulares"""
+
+    def __init__(self, docker, container, janela=JANELA_AMOSTRAS, janela_gc=JANELA_GC):
+        self.docker = docker
+        self.container = container
+        self.amostras = deque(maxlen=janela)
+        self.pausas = deque(maxlen=janela_gc)
+        self.histograma_pausas = HistogramaLatencia(BUCKETS_PAUSA)
+        self._task = None
+
+    def aplicar(self, tipo, timestamp, linha):
+        """Callback do classificador de logs"""
+        if tipo == REINICIO:
+            # Heap de outra JVM não serve para a atual
+            self.pausas.clear()
+            return
+        if tipo != GC_PAUSA:
+            return
+
+        pausa = parsear_gc(linha)
+        if pausa is None:
+            return
+        pausa.timestamp = timestamp
+        self.pausas.append(pausa)
+        self.histograma_pausas.observar(pausa.pausa)
+
+    @property
+    def ultima(self):
+        return self.amostras[-1] if self.amostras else None
+
+    def taxa_rede(self):
+        """(rx, tx) em bytes/s entre a primeira e a última amostra da janela"""
+        if len(self.amostras) < 2:
+            return None, None
+        primeira, ultima = self.amostras[0], self.amostras[-1]
+        intervalo = ultima.momento - primeira.momento
+        if intervalo <= 0:
+            return None, None
+        return (
+            max(ultima.rx_bytes - primeira.rx_bytes, 0) / intervalo,
+            max(ultima.tx_bytes - primeira.tx_bytes, 0) / intervalo
+        )
+
+    def resumo(self):
+        ultima = self.ultima
+        rx, tx = self.taxa_rede()
+        pausas = [p.pausa for p in self.pausas]
+        pos_gc = [p.heap_depois for p in self.pausas]
+        return {
+            "cpu": ultima.cpu if ultima else None,
+            "cpu_media": statistics.fmean(a.cpu for a in self.amostras) if self.amostras else None,
+            "memoria": ultima.memoria if ultima else None,
+            "memoria_pico": max(a.memoria for a in self.amostras) if self.amostras else None,
+            "limite_memoria": ultima.limite_memoria if ultima else None,
+            "rx": rx,
+            "tx": tx,
+            "gc_pausas": len(pausas),
+            "gc_max": max(pausas) if pausas else None,
+            "gc_p99": statistics.quantiles(pausas, n=100, method="inclusive")[98] if len(pausas) >= 2 else (pausas[0] if pausas else None),
+            # Maior ocupação após GC ~ conjunto vivo; comparar com o heap total
+            "heap_pos_gc": max(pos_gc) if pos_gc else None,
+            "heap_total": self.pausas[-1].heap_total if self.pausas else None
+        }
+
+    async def _loop(self):
+        while True:
+            try:
+                async for stats in self.docker.stats(self.container):
+                    amostra = calcular_amostra(stats)
+                    if amostra is not None:
+                        self.amostras.append(amostra)
+                log.info("Stream de stats de %s encerrado", self.container)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("Erro no stream de stats de %s: %s", self.container, e)
+
+            await asyncio.sleep(ESPERA_RECONEXAO)
+
+    def iniciar(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+        return self._task
+
+    def parar(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -0,0 +1,149 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+
+import discord
+
+from dns_cache import HistogramaLatencia
+
+# =======================
+# RENDER
+# =======================
+#
+# Publica o embed de status editando sempre a mesma mensagem. O payload
+# final é comparado por hash (ignorando o timestamp), então nada é enviado
+# se nada visível mudou. A mensagem é editada via PartialMessage (uma única
+# chamada REST, sem fetch_message), e rajadas de mudanças são agrupadas em
+# no máximo uma edição a cada `intervalo_minimo` segundos.
+
+log = logging.getLogger(__name__)
+
+INTERVALO_MINIMO = 5.0
+# Discord permite ~5 edições a cada 5 s por canal; ficamos abaixo disso
+ORCAMENTO_EDICOES = 4
+JANELA_ORCAMENTO = 5.0
+
+
+def hash_embed(embed):
+    dados = embed.to_dict()
+    # O timestamp muda a cada render e não indica mudança de conteúdo
+    dados.pop("timestamp", None)
+    return hashlib.sha256(json.dumps(dados, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class PublicadorEmbed:
+    """Mantém uma mensagem de status por canal e edita só quando necessário"""
+
+    def __init__(self, arquivo_id, intervalo_minimo=INTERVALO_MINIMO):
+        self.arquivo_id = arquivo_id
+        self.intervalo_minimo = intervalo_minimo
+        self.message_id = self._carregar_id()
+        self.ultimo_hash = None
+        self.ultima_edicao = 0.0
+        self.edicoes = 0
+        self.ignoradas = 0
+        self.rate_limits = 0
+        # Duração das chamadas REST e tempo segurando edições pelo orçamento do canal
+        self.latencia_api = HistogramaLatencia()
+        self.espera_orcamento = 0.0
+        self._envios = []
+        self._pendente = None
+        self._flush_task = None
+        self._lock = asyncio.Lock()
+
+    def _carregar_id(self):
+        if not os.path.exists(self.arquivo_id):
+            return None
+        try:
+            with open(self.arquivo_id) as f:
+                message_id = int(f.read().strip())
+            log.info("status_message_id carregado: %s", message_id)
+            return message_id
+        except Exception as e:
+            log.warning("Falha ao carregar status_message_id: %s", e)
+            return None
+
+    def _salvar_id(self):
+        with open(self.arquivo_id, "w") as f:
+            f.write(str(self.message_id))
+
+    def _aguardar_orcamento(self):
+        """Segundos até haver orçamento para mais uma chamada no canal"""
+        agora = time.monotonic()
+        self._envios = [t for t in self._envios if agora - t < JANELA_ORCAMENTO]
+        if len(self._envios) < ORCAMENTO_EDICOES:
+            return 0.0
+        return JANELA_ORCAMENTO - (agora - self._envios[0])
+
+    async def publicar(self, canal, embed):
+        """Agenda o embed; edições em rajada são agrupadas na mais recente"""
+        novo_hash = hash_embed(embed)
+        if novo_hash == self.ultimo_hash and self._pendente is None:
+            self.ignoradas += 1
+            return
+
+        self._pendente = (canal, embed, novo_hash)
+
+        espera_orcamento = self._aguardar_orcamento()
+        espera = max(
+            self.intervalo_minimo - (time.monotonic() - self.ultima_edicao),
+            espera_orcamento
+        )
+        if espera <= 0:
+            await self._enviar_pendente()
+        elif self._flush_task is None or self._flush_task.done():
+            self.espera_orcamento += max(espera_orcamento, 0.0)
+            self._flush_task = asyncio.create_task(self._enviar_depois(espera))
+
+    async def _enviar_depois(self, espera):
+        await asyncio.sleep(espera)
+        try:
+            await self._enviar_pendente()
+        except Exception as e:
+            log.warning("Erro ao publicar embed agrupado: %s", e)
+
+    async def _enviar_pendente(self):
+        async with self._lock:
+            if self._pendente is None:
+                return
+            canal, embed, novo_hash = self._pendente
+            self._pendente = None
+
+            if novo_hash == self.ultimo_hash:
+                self.ignoradas += 1
+                return
+
+            inicio = time.monotonic()
+            self._envios.append(inicio)
+            self.ultima_edicao = inicio
+
+            try:
+                if self.message_id is None:
+                    msg = await canal.send(embed=embed)
+                    self.message_id = msg.id
+                    self._salvar_id()
+                    log.info("Mensagem inicial criada")
+                else:
+                    try:
+                        await canal.get_partial_message(self.message_id).edit(embed=embed)
+                        log.debug("Embed atualizado")
+                    except discord.NotFound:
+                        msg = await canal.send(embed=embed)
+                        self.message_id = msg.id
+                        self._salvar_id()
+                        log.info("Mensagem recriada")
+                    except discord.HTTPException as e:
+                        if e.status == 429:
+                            self.rate_limits += 1
+                        # Mantém o hash antigo para tentar de novo no próximo render
+                        log.warning("Falha ao editar embed: %s", e)
+                        return
+            finally:
+                # Inclui as esperas internas do discord.py por rate limit
+                self.latencia_api.observar(time.monotonic() - inicio)
+
+            self.edicoes += 1
+            self.ultimo_hash = novo_hash
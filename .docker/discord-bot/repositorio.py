@@ -0,0 +1,568 @@
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import stat
+import sys
+import time
+import zlib
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
+# =======================
+# REPOSITORIO
+# =======================
+#
+# Repositório de backups deduplicado por conteúdo. Os arquivos são cortados
+# em chunks de tamanho fixo, identificados pelo BLAKE2b do conteúdo e
+# guardados comprimidos dentro de packs imutáveis. Cada snapshot é só uma
+# lista de arquivos -> hashes: um backup novo grava (e o rclone envia)
+# apenas os packs com chunks que ainda não existiam. Arquivos com mesmo
+# tamanho e mtime do snapshot anterior nem são lidos de novo.
+#
+# Layout:
+#   config.json
+#   packs/ab/<id>.pack   blobs concatenados (1 byte de tipo + dados)
+#   packs/ab/<id>.idx    {hash: [offset, tamanho]} do pack
+#   snapshots/<id>.json  metadados e lista de chunks de cada arquivo
+#
+# Um .pack sem .idx (backup interrompido) é ignorado e removido pelo gc;
+# o snapshot só é gravado depois que todos os seus packs estão no disco.
+
+VERSAO = 1
+CHUNK_PADRAO = 512 * 1024
+PACK_ALVO = 16 * 1024 * 1024
+NIVEL_PADRAO = 6
+# Packs com menos que essa fração de bytes vivos são reescritos pelo gc
+REPACK_LIMITE = 0.5
+
+BLOB_CRU = 0
+BLOB_ZLIB = 1
+
+
+class RepositorioErro(Exception):
+    """Repositório ausente, corrompido ou em uso"""
+
+
+def hash_chunk(dados):
+    return hashlib.blake2b(dados, digest_size=32).hexdigest()
+
+
+def _preparar(dados, nivel, conhecidos):
+    """Roda nas threads: hash e, se o chunk for novo, compressão"""
+    chave = hash_chunk(dados)
+    if chave in conhecidos:
+        return chave, None
+    comprimido = zlib.compress(dados, nivel)
+    if len(comprimido) < len(dados):
+        return chave, bytes([BLOB_ZLIB]) + comprimido
+    return chave, bytes([BLOB_CRU]) + dados
+
+
+def _abrir_blob(blob):
+    if blob[0] == BLOB_ZLIB:
+        return zlib.decompress(blob[1:])
+    if blob[0] == BLOB_CRU:
+        return bytes(blob[1:])
+    raise RepositorioErro(f"Tipo de blob desconhecido: {blob[0]}")
+
+
+def _gravar_atomico(caminho, dados):
+    parcial = caminho + ".parcial"
+    with open(parcial, "wb") as f:
+        f.write(dados)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(parcial, caminho)
+
+
+class EstatisticasSnapshot:
+    def __init__(self):
+        self.inicio = time.monotonic()
+        self.arquivos = 0
+        self.reaproveitados = 0
+        self.lidos = 0
+        self.chunks_novos = 0
+        self.gravados = 0
+
+    @property
+    def duracao(self):
+        return time.monotonic() - self.inicio
+
+
+class _EscritorPacks:
+    """Acumula blobs novos e fecha um pack a cada PACK_ALVO bytes"""
+
+    def __init__(self, repo):
+        self.repo = repo
+        self._dados = bytearray()
+        self._idx = {}
+        self.packs = []
+
+    def adicionar(self, chave, blob):
+        self._idx[chave] = [len(self._dados), len(blob)]
+        self._dados += blob
+        if len(self._dados) >= PACK_ALVO:
+            self.fechar()
+
+    def fechar(self):
+        if not self._idx:
+            return
+        pack_id = hashlib.blake2b(self._dados, digest_size=16).hexdigest()
+        base = self.repo._caminho_pack(pack_id)
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        # O .idx vai por último: é ele que torna o pack visível
+        _gravar_atomico(base + ".pack", self._dados)
+        _gravar_atomico(base + ".idx", json.dumps(self._idx).encode())
+        for chave, (offset, tamanho) in self._idx.items():
+            self.repo.indice[chave] = (pack_id, offset, tamanho)
+        self.packs.append(pack_id)
+        self._dados = bytearray()
+        self._idx = {}
+
+
+class Repositorio:
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.indice = {}
+        self._config = None
+
+    # ---------- layout ----------
+
+    def _caminho_pack(self, pack_id):
+        return os.path.join(self.caminho, "packs", pack_id[:2], pack_id)
+
+    def _caminho_snapshot(self, snapshot_id):
+        return os.path.join(self.caminho, "snapshots", snapshot_id + ".json")
+
+    @property
+    def config(self):
+        if self._config is None:
+            try:
+                with open(os.path.join(self.caminho, "config.json")) as f:
+                    self._config = json.load(f)
+            except FileNotFoundError:
+                raise RepositorioErro(f"Repositório não inicializado: {self.caminho}") from None
+            if self._config.get("versao") != VERSAO:
+                raise RepositorioErro(f"Versão de repositório não suportada: {self._config.get('versao')}")
+        return self._config
+
+    def iniciar(self, chunk=CHUNK_PADRAO):
+        """Cria o repositório (idempotente)"""
+        os.makedirs(os.path.join(self.caminho, "packs"), exist_ok=True)
+        os.makedirs(os.path.join(self.caminho, "snapshots"), exist_ok=True)
+        config = os.path.join(self.caminho, "config.json")
+        if not os.path.exists(config):
+            _gravar_atomico(config, json.dumps({"versao": VERSAO, "chunk": chunk}).encode())
+
+    @contextmanager
+    def travado(self):
+        """Trava exclusiva do repositório (backup e gc não podem rodar juntos)"""
+        self.config
+        with open(os.path.join(self.caminho, "lock"), "w") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise RepositorioErro("Repositório em uso por outro processo") from None
+            try:
+                yield self
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _packs_indexados(self):
+        """pack_id -> caminho do .idx"""
+        packs = {}
+        raiz = os.path.join(self.caminho, "packs")
+        for prefixo in os.listdir(raiz):
+            for nome in os.listdir(os.path.join(raiz, prefixo)):
+                if nome.endswith(".idx"):
+                    packs[nome[:-4]] = os.path.join(raiz, prefixo, nome)
+        return packs
+
+    def carregar_indice(self):
+        self.indice = {}
+        for pack_id, caminho in self._packs_indexados().items():
+            with open(caminho) as f:
+                for chave, (offset, tamanho) in json.load(f).items():
+                    self.indice[chave] = (pack_id, offset, tamanho)
+        return self.indice
+
+    # ---------- snapshots ----------
+
+    def snapshots(self):
+        """Snapshots do mais antigo para o mais recente"""
+        raiz = os.path.join(self.caminho, "snapshots")
+        lista = []
+        for nome in sorted(os.listdir(raiz)):
+            if nome.endswith(".json"):
+                lista.append(self.snapshot(nome[:-5]))
+        return lista
+
+    def snapshot(self, snapshot_id):
+        try:
+            with open(self._caminho_snapshot(snapshot_id)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise RepositorioErro(f"Snapshot não encontrado: {snapshot_id}") from None
+
+    def _listar(self, raiz, itens):
+        """Percorre os itens (relativos a raiz) em ordem estável"""
+        for item in itens:
+            caminho = os.path.join(raiz, item)
+            if not os.path.lexists(caminho):
+                continue
+            if not os.path.isdir(caminho) or os.path.islink(caminho):
+                yield item
+                continue
+            for atual, dirs, arquivos in os.walk(caminho):
+                dirs.sort()
+                yield os.path.relpath(atual, raiz)
+                for nome in sorted(arquivos):
+                    yield os.path.relpath(os.path.join(atual, nome), raiz)
+
+    def criar_snapshot(self, raiz, itens, tag="", threads=None, nivel=NIVEL_PADRAO):
+        """Faz backup dos itens; grava só chunks novos. Retorna (snapshot, estatisticas)"""
+        tamanho_chunk = self.config["chunk"]
+        self.carregar_indice()
+        estatisticas = EstatisticasSnapshot()
+
+        anteriores = self.snapshots()
+        pai = anteriores[-1] if anteriores else None
+        conhecidos_pai = {e["caminho"]: e for e in pai["entradas"] if e["tipo"] == "arquivo"} if pai else {}
+
+        escritor = _EscritorPacks(self)
+        threads = threads or os.cpu_count() or 1
+        entradas = []
+        pendentes = deque()
+
+        def consumir():
+            entrada, futuro = pendentes.popleft()
+            chave, blob = futuro.result()
+            if blob is not None and chave not in self.indice and chave not in escritor._idx:
+                escritor.adicionar(chave, blob)
+                estatisticas.chunks_novos += 1
+                estatisticas.gravados += len(blob)
+            entrada["chunks"].append(chave)
+
+        # hashlib e zlib liberam o GIL, então as threads usam todos os núcleos
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            for relativo in self._listar(raiz, itens):
+                caminho = os.path.join(raiz, relativo)
+                info = os.lstat(caminho)
+                entrada = {"caminho": relativo, "modo": stat.S_IMODE(info.st_mode), "mtime_ns": info.st_mtime_ns}
+                entradas.append(entrada)
+
+                if stat.S_ISDIR(info.st_mode):
+                    entrada["tipo"] = "dir"
+                    continue
+                if stat.S_ISLNK(info.st_mode):
+                    entrada["tipo"] = "link"
+                    entrada["alvo"] = os.readlink(caminho)
+                    continue
+                if not stat.S_ISREG(info.st_mode):
+                    entradas.pop()
+                    continue
+
+                entrada["tipo"] = "arquivo"
+                entrada["tamanho"] = info.st_size
+                estatisticas.arquivos += 1
+
+                anterior = conhecidos_pai.get(relativo)
+                if (anterior and anterior["tamanho"] == info.st_size and anterior["mtime_ns"] == info.st_mtime_ns
+                        and all(c in self.indice for c in anterior["chunks"])):
+                    entrada["chunks"] = anterior["chunks"]
+                    estatisticas.reaproveitados += 1
+                    continue
+
+                entrada["chunks"] = []
+                with open(caminho, "rb") as f:
+                    while True:
+                        dados = f.read(tamanho_chunk)
+                        if not dados:
+                            break
+                        estatisticas.lidos += len(dados)
+                        if len(pendentes) >= threads * 2:
+                            consumir()
+                        pendentes.append((entrada, executor.submit(_preparar, dados, nivel, self.indice)))
+
+            while pendentes:
+                consumir()
+
+        escritor.fechar()
+
+        agora = datetime.now()
+        snapshot = {
+            # Ordem lexicográfica dos ids = ordem cronológica
+            "id": agora.strftime("%Y%m%d-%H%M%S-%f"),
+            "criado": agora.isoformat(timespec="seconds"),
+            "tag": tag,
+            "itens": list(itens),
+            "pai": pai["id"] if pai else None,
+            "entradas": entradas
+        }
+        _gravar_atomico(self._caminho_snapshot(snapshot["id"]), json.dumps(snapshot).encode())
+        return snapshot, estatisticas
+
+    # ---------- leitura ----------
+
+    def ler_chunk(self, chave, _abertos=None):
+        try:
+            pack_id, offset, tamanho = self.indice[chave]
+        except KeyError:
+            raise RepositorioErro(f"Chunk ausente: {chave}") from None
+
+        if _abertos is not None and pack_id in _abertos:
+            f = _abertos[pack_id]
+        else:
+            f = open(self._caminho_pack(pack_id) + ".pack", "rb")
+            if _abertos is not None:
+                _abertos[pack_id] = f
+        try:
+            f.seek(offset)
+            dados = _abrir_blob(f.read(tamanho))
+        finally:
+            if _abertos is None:
+                f.close()
+
+        if hash_chunk(dados) != chave:
+            raise RepositorioErro(f"Chunk corrompido: {chave} (pack {pack_id})")
+        return dados
+
+    def restaurar(self, snapshot_id, destino, prefixo=""):
+        """Restaura o snapshot (ou só os caminhos sob `prefixo`) em `destino`"""
+        snapshot = self.snapshot(snapshot_id)
+        self.carregar_indice()
+        abertos = {}
+        diretorios = []
+        try:
+            for entrada in snapshot["entradas"]:
+                if prefixo and not (entrada["caminho"] + "/").startswith(prefixo.rstrip("/") + "/"):
+                    continue
+                caminho = os.path.join(destino, entrada["caminho"])
+                os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+
+                if entrada["tipo"] == "dir":
+                    os.makedirs(caminho, exist_ok=True)
+                    diretorios.append((caminho, entrada))
+                    continue
+                if entrada["tipo"] == "link":
+                    if os.path.lexists(caminho):
+                        os.remove(caminho)
+                    os.symlink(entrada["alvo"], caminho)
+                    continue
+
+                with open(caminho, "wb") as f:
+                    for chave in entrada["chunks"]:
+                        f.write(self.ler_chunk(chave, abertos))
+                os.chmod(caminho, entrada["modo"])
+                os.utime(caminho, ns=(entrada["mtime_ns"], entrada["mtime_ns"]))
+        finally:
+            for f in abertos.values():
+                f.close()
+
+        # Diretórios por último, senão criar os arquivos muda o mtime deles
+        for caminho, entrada in reversed(diretorios):
+            os.chmod(caminho, entrada["modo"])
+            os.utime(caminho, ns=(entrada["mtime_ns"], entrada["mtime_ns"]))
+        return snapshot
+
+    # ---------- retenção ----------
+
+    def esquecer(self, manter_ultimos=7, manter_diarios=7):
+        """Remove snapshots fora da retenção; retorna os ids removidos
+
+        Mantém os `manter_ultimos` mais recentes e o mais recente de cada um
+        dos últimos `manter_diarios` dias que têm snapshot; o mais recente de
+        todos nunca sai. Os chunks só são liberados depois, pelo gc.
+        """
+        if manter_ultimos < 0 or manter_diarios < 0:
+            raise RepositorioErro("Quantidades de retenção não podem ser negativas")
+        if not manter_ultimos and not manter_diarios:
+            # Sem nada a manter o gc seguinte liberaria todos os packs
+            raise RepositorioErro("Retenção sem nada a manter: informe --manter-ultimos ou --manter-diarios")
+
+        snapshots = self.snapshots()
+        manter = {s["id"] for s in snapshots[-max(manter_ultimos, 1):]}
+        dias = {}
+        for s in reversed(snapshots):
+            dia = s["criado"][:10]
+            if dia not in dias and len(dias) < manter_diarios:
+                dias[dia] = s["id"]
+        manter.update(dias.values())
+
+        removidos = []
+        for s in snapshots:
+            if s["id"] not in manter:
+                os.remove(self._caminho_snapshot(s["id"]))
+                removidos.append(s["id"])
+        return removidos
+
+    def referencias(self):
+        """Contagem de referências de cada chunk em todos os snapshots"""
+        contagem = Counter()
+        for s in self.snapshots():
+            for entrada in s["entradas"]:
+                contagem.update(entrada.get("chunks", ()))
+        return contagem
+
+    def gc(self, repack_limite=REPACK_LIMITE):
+        """Apaga packs sem referências e reescreve os que têm pouco conteúdo vivo"""
+        referencias = self.referencias()
+        self.carregar_indice()
+        resultado = {"removidos": 0, "reescritos": 0, "liberados": 0}
+
+        raiz = os.path.join(self.caminho, "packs")
+        indexados = self._packs_indexados()
+        # Packs de backups interrompidos (sem .idx) e .parcial soltos
+        for prefixo in os.listdir(raiz):
+            for nome in os.listdir(os.path.join(raiz, prefixo)):
+                caminho = os.path.join(raiz, prefixo, nome)
+                if nome.endswith(".parcial") or (nome.endswith(".pack") and nome[:-5] not in indexados):
+                    resultado["liberados"] += os.path.getsize(caminho)
+                    os.remove(caminho)
+
+        escritor = _EscritorPacks(self)
+        a_remover = []
+        for pack_id, caminho_idx in indexados.items():
+            with open(caminho_idx) as f:
+                idx = json.load(f)
+            total = sum(tamanho for _, tamanho in idx.values())
+            vivos = {chave: tamanho for chave, (_, tamanho) in idx.items() if referencias[chave]}
+            if sum(vivos.values()) >= total * repack_limite and vivos:
+                continue
+
+            with open(self._caminho_pack(pack_id) + ".pack", "rb") as f:
+                for chave in vivos:
+                    offset, tamanho = idx[chave]
+                    f.seek(offset)
+                    escritor.adicionar(chave, f.read(tamanho))
+            resultado["reescritos" if vivos else "removidos"] += 1
+            resultado["liberados"] += total - sum(vivos.values())
+            a_remover.append(pack_id)
+
+        # Os chunks vivos já estão em packs novos antes de apagar os antigos
+        escritor.fechar()
+        for pack_id in a_remover:
+            base = self._caminho_pack(pack_id)
+            os.remove(base + ".idx")
+            os.remove(base + ".pack")
+        self.carregar_indice()
+        return resultado
+
+    def verificar(self, threads=None):
+        """Relê e confere o hash de todos os chunks; retorna a lista de erros"""
+        self.carregar_indice()
+        por_pack = {}
+        for chave, (pack_id, _, _) in self.indice.items():
+            por_pack.setdefault(pack_id, []).append(chave)
+
+        def verificar_pack(chaves):
+            erros = []
+            abertos = {}
+            try:
+                for chave in chaves:
+                    try:
+                        self.ler_chunk(chave, abertos)
+                    except (RepositorioErro, OSError, zlib.error) as e:
+                        erros.append(str(e))
+            finally:
+                for f in abertos.values():
+                    f.close()
+            return erros
+
+        with ThreadPoolExecutor(max_workers=threads or os.cpu_count() or 1) as executor:
+            return [erro for erros in executor.map(verificar_pack, por_pack.values()) for erro in erros]
+
+
+def _formatar_mb(valor):
+    return f"{valor / 1024 ** 2:,.1f} MB"
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Repositório de backups deduplicado")
+    parser.add_argument("--repo", required=True)
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    sub.add_parser("init")
+
+    p = sub.add_parser("backup")
+    p.add_argument("itens", nargs="+", help="caminhos relativos à raiz")
+    p.add_argument("--raiz", default=".")
+    p.add_argument("--tag", default="")
+    p.add_argument("--threads", type=int)
+
+    sub.add_parser("snapshots")
+
+    p = sub.add_parser("restaurar")
+    p.add_argument("snapshot", help="id do snapshot ou 'latest'")
+    p.add_argument("destino")
+    p.add_argument("--prefixo", default="")
+
+    p = sub.add_parser("esquecer")
+    p.add_argument("--manter-ultimos", type=int, default=7)
+    p.add_argument("--manter-diarios", type=int, default=7)
+
+    sub.add_parser("gc")
+    sub.add_parser("verificar")
+
+    args = parser.parse_args(argv)
+    repo = Repositorio(args.repo)
+
+    try:
+        if args.comando == "init":
+            repo.iniciar()
+            print(f"Repositório pronto em {args.repo}")
+            return 0
+
+        if args.comando == "snapshots":
+            for s in repo.snapshots():
+                arquivos = sum(1 for e in s["entradas"] if e["tipo"] == "arquivo")
+                print(f"{s['id']}  {s['criado']}  {arquivos} arquivos  {' '.join(s['itens'])}  {s['tag']}")
+            return 0
+
+        if args.comando == "restaurar":
+            snapshot_id = args.snapshot
+            if snapshot_id == "latest":
+                snapshots = repo.snapshots()
+                if not snapshots:
+                    raise RepositorioErro("Nenhum snapshot no repositório")
+                snapshot_id = snapshots[-1]["id"]
+            repo.restaurar(snapshot_id, args.destino, args.prefixo)
+            print(f"Snapshot {snapshot_id} restaurado em {args.destino}")
+            return 0
+
+        if args.comando == "verificar":
+            erros = repo.verificar()
+            for erro in erros:
+                print(erro, file=sys.stderr)
+            print(f"{len(repo.indice)} chunks verificados, {len(erros)} erro(s)")
+            return 1 if erros else 0
+
+        with repo.travado():
+            if args.comando == "backup":
+                snapshot, e = repo.criar_snapshot(args.raiz, args.itens, tag=args.tag, threads=args.threads)
+                print(
+                    f"Snapshot {snapshot['id']}: {e.arquivos} arquivos ({e.reaproveitados} sem mudança)"
+                    f" · {_formatar_mb(e.lidos)} lidos · {e.chunks_novos} chunks novos"
+                    f" · {_formatar_mb(e.gravados)} gravados em {e.duracao:.1f}s"
+                )
+            elif args.comando == "esquecer":
+                removidos = repo.esquecer(args.manter_ultimos, args.manter_diarios)
+                print(f"{len(removidos)} snapshot(s) removido(s)")
+            elif args.comando == "gc":
+                r = repo.gc()
+                print(
+                    f"{r['removidos']} pack(s) removido(s), {r['reescritos']} reescrito(s),"
+                    f" {_formatar_mb(r['liberados'])} liberados"
+                )
+    except (RepositorioErro, OSError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
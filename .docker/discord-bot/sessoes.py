@@ -0,0 +1,204 @@
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+# =======================
+# SESSÕES
+# =======================
+#
+# Histórico de sessões dos players em SQLite (WAL). As escritas vão para uma
+# fila limitada e são gravadas em lote por uma thread dedicada, fora do
+# event loop do Discord. As consultas usam uma conexão só de leitura.
+
+log = logging.getLogger(__name__)
+
+TAMANHO_FILA = 10000
+TAMANHO_LOTE = 500
+ESPERA_LOTE = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessoes (
+    id INTEGER PRIMARY KEY,
+    uuid TEXT NOT NULL,
+    nome TEXT NOT NULL,
+    inicio REAL NOT NULL,
+    fim REAL
+);
+CREATE INDEX IF NOT EXISTS idx_sessoes_uuid_inicio ON sessoes (uuid, inicio);
+CREATE INDEX IF NOT EXISTS idx_sessoes_inicio ON sessoes (inicio);
+CREATE INDEX IF NOT EXISTS idx_sessoes_fim ON sessoes (fim);
+CREATE INDEX IF NOT EXISTS idx_sessoes_abertas ON sessoes (uuid) WHERE fim IS NULL;
+"""
+
+
+def timestamp_para_epoch(timestamp):
+    """Converte o timestamp RFC3339 do Docker (ou None) para epoch em segundos"""
+    if timestamp is None:
+        return time.time()
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    base, _, fracao = timestamp.rstrip("Z").partition(".")
+    epoch = datetime.fromisoformat(base + "+00:00").timestamp()
+    return epoch + (float("0." + fracao) if fracao else 0.0)
+
+
+class HistoricoSessoes:
+    """Armazena entradas/saídas de players e responde consultas de concorrência"""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.fila = queue.Queue(maxsize=TAMANHO_FILA)
+        self.descartados = 0
+
+        conexao = sqlite3.connect(caminho)
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.executescript(SCHEMA)
+        conexao.close()
+
+        self._leitura = sqlite3.connect(caminho, check_same_thread=False)
+        self._lock_leitura = threading.Lock()
+
+        self._thread = threading.Thread(target=self._escritor, name="sessoes-writer", daemon=True)
+        self._thread.start()
+
+    # ---------- escrita ----------
+
+    def registrar(self, evento, uuid, nome, timestamp):
+        """Enfileira um evento ('entrada', 'saida' ou 'reinicio') sem bloquear"""
+        try:
+            self.fila.put_nowait((evento, uuid or nome, nome, timestamp_para_epoch(timestamp)))
+        except queue.Full:
+            self.descartados += 1
+            log.warning("Fila de sessões cheia - evento descartado (%d)", self.descartados)
+
+    def _aplicar(self, cursor, evento, uuid, nome, momento):
+        if evento == "entrada":
+            aberta = cursor.execute(
+                "SELECT 1 FROM sessoes WHERE uuid = ? AND fim IS NULL", (uuid,)
+            ).fetchone()
+            if aberta is None:
+                cursor.execute(
+                    "INSERT INTO sessoes (uuid, nome, inicio) VALUES (?, ?, ?)",
+                    (uuid, nome, momento)
+                )
+        elif evento == "saida":
+            cursor.execute(
+                "UPDATE sessoes SET fim = ? WHERE uuid = ? AND fim IS NULL", (momento, uuid)
+            )
+        elif evento == "reinicio":
+            # Quem ainda estava aberto caiu junto com o servidor
+            cursor.execute("UPDATE sessoes SET fim = ? WHERE fim IS NULL", (momento,))
+
+    def _escritor(self):
+        conexao = sqlite3.connect(self.caminho)
+        conexao.execute("PRAGMA synchronous=NORMAL")
+
+        while True:
+            item = self.fila.get()
+            if item is None:
+                break
+
+            lote = [item]
+            limite = time.monotonic() + ESPERA_LOTE
+            parar = False
+            while len(lote) < TAMANHO_LOTE:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    proximo = self.fila.get(timeout=restante)
+                except queue.Empty:
+                    break
+                if proximo is None:
+                    parar = True
+                    break
+                lote.append(proximo)
+
+            try:
+                with conexao:
+                    cursor = conexao.cursor()
+                    for evento in lote:
+                        self._aplicar(cursor, *evento)
+            except sqlite3.Error:
+                log.exception("Erro ao gravar sessões")
+
+            if parar:
+                break
+
+        conexao.close()
+
+    def fechar(self, timeout=5):
+        """Grava o que estiver na fila e encerra a thread de escrita"""
+        if self._thread.is_alive():
+            self.fila.put(None)
+            self._thread.join(timeout)
+        self._leitura.close()
+
+    # ---------- consultas ----------
+
+    def _consultar(self, sql, parametros=()):
+        with self._lock_leitura:
+            return self._leitura.execute(sql, parametros).fetchall()
+
+    def sessoes_no_intervalo(self, inicio, fim):
+        """Sessões que se sobrepõem a [inicio, fim] como (uuid, nome, inicio, fim)"""
+        return self._consultar(
+            "SELECT uuid, nome, inicio, fim FROM sessoes "
+            "WHERE inicio <= ? AND (fim IS NULL OR fim >= ?) ORDER BY inicio",
+            (fim, inicio)
+        )
+
+    def pico_concorrente(self, inicio, fim):
+        """Retorna (pico, momento) de players simultâneos em [inicio, fim]"""
+        pontos = []
+        for _, _, s_inicio, s_fim in self.sessoes_no_intervalo(inicio, fim):
+            pontos.append((max(s_inicio, inicio), 1))
+            pontos.append((min(s_fim if s_fim is not None else fim, fim), -1))
+
+        # Saídas antes de entradas no mesmo instante
+        pontos.sort(key=lambda p: (p[0], p[1]))
+        atual = pico = 0
+        momento = None
+        for instante, delta in pontos:
+            atual += delta
+            if atual > pico:
+                pico, momento = atual, instante
+        return pico, momento
+
+    def concorrencia(self, inicio, fim, passo):
+        """Série [(instante, players online)] amostrada a cada `passo` segundos"""
+        sessoes = self.sessoes_no_intervalo(inicio, fim)
+        serie = []
+        instante = inicio
+        while instante <= fim:
+            online = sum(
+                1 for _, _, s_inicio, s_fim in sessoes
+                if s_inicio <= instante and (s_fim is None or s_fim > instante)
+            )
+            serie.append((instante, online))
+            instante += passo
+        return serie
+
+    def duracao_media(self, inicio, fim):
+        """Duração média (segundos) das sessões encerradas que começaram em [inicio, fim]"""
+        linha = self._consultar(
+            "SELECT AVG(fim - inicio) FROM sessoes WHERE fim IS NOT NULL AND inicio BETWEEN ? AND ?",
+            (inicio, fim)
+        )
+        return linha[0][0]
+
+    def sessoes_do_player(self, uuid, limite=50):
+        return self._consultar(
+            "SELECT nome, inicio, fim FROM sessoes WHERE uuid = ? ORDER BY inicio DESC LIMIT ?",
+            (uuid, limite)
+        )
+
+    def players_unicos(self, inicio, fim):
+        linha = self._consultar(
+            "SELECT COUNT(DISTINCT uuid) FROM sessoes WHERE inicio <= ? AND (fim IS NULL OR fim >= ?)",
+            (fim, inicio)
+        )
+        return linha[0][0]
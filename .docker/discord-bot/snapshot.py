@@ -0,0 +1,369 @@
+import argparse
+import errno
+import fcntl
+import os
+import shutil
+import socket
+import stat
+import sys
+import time
+from urllib.parse import quote
+
+# =======================
+# SNAPSHOT
+# =======================
+#
+# Cópia consistente do mundo sem parar o servidor. Os comandos de save são
+# enviados pelo console do container (stdin/tty do `docker attach`, falando
+# direto com o docker.sock, sem expect). O script espera os diretórios do
+# mundo (--observar) pararem de mudar e então sincroniza só os itens do
+# backup para um diretório de staging: arquivos iguais (mesmo tamanho e
+# mtime) ficam como estão, os alterados viram clones reflink (copy-on-write,
+# instantâneo em btrfs/xfs) ou, se o sistema de arquivos não suportar, uma
+# cópia normal. Compressão e upload rodam depois em cima do staging, com o
+# servidor já liberado.
+#
+# Sem um comando que pause a gravação (--pausar), o servidor pode voltar a
+# gravar durante a cópia. Por isso os mtimes são conferidos de novo no fim:
+# se o mundo não estabilizou ou mudou durante a cópia, o script sai com
+# INCONSISTENTE e os scripts de backup param o servidor para copiar.
+#
+# Hardlinks não são usados: o servidor regrava os arquivos do mundo no
+# lugar, então um hardlink mudaria junto com o original.
+#
+# Uso (scripts/backup.sh):
+#   python3 snapshot.py --raiz . --staging backups/.staging --observar data/universe --salvar /save \
+#       data/universe data/config.json
+
+DOCKER_SOCKET = "/var/run/docker.sock"
+CONTAINER_PADRAO = "hytale-server"
+TIMEOUT_CONSOLE = 5
+# Os dados são considerados gravados quando nenhum mtime muda por ESTAVEL s
+ESTAVEL = 3.0
+TIMEOUT_ESTAVEL = 60.0
+INTERVALO_ESTAVEL = 1.0
+
+# Código de saída: o mundo não estabilizou ou mudou durante a cópia
+INCONSISTENTE = 2
+
+# ioctl FICLONE do Linux (_IOW(0x94, 9, int))
+FICLONE = 0x40049409
+
+
+class SnapshotErro(Exception):
+    """Falha ao falar com o console ou ao montar o staging"""
+
+
+class ConsoleContainer:
+    """Console do container via attach no docker.sock (precisa de stdin_open)"""
+
+    def __init__(self, container=CONTAINER_PADRAO, socket_docker=DOCKER_SOCKET, timeout=TIMEOUT_CONSOLE):
+        self.container = container
+        self.socket_docker = socket_docker
+        self.timeout = timeout
+        self._sock = None
+
+    def conectar(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_docker)
+            # Sem stdout: só queremos escrever no stdin, não receber o console
+            sock.sendall((
+                f"POST /containers/{quote(self.container)}/attach?stream=1&stdin=1 HTTP/1.1\r\n"
+                "Host: docker\r\n"
+                "Upgrade: tcp\r\n"
+                "Connection: Upgrade\r\n"
+                "Content-Length: 0\r\n"
+                "\r\n"
+            ).encode())
+
+            resposta = b""
+            while b"\r\n\r\n" not in resposta:
+                dados = sock.recv(4096)
+                if not dados:
+                    break
+                resposta += dados
+        except OSError as e:
+            sock.close()
+            raise SnapshotErro(f"Não foi possível conectar ao Docker: {e}") from None
+
+        status = resposta.split(b"\r\n", 1)[0].decode(errors="replace")
+        if " 101 " not in status and " 200 " not in status:
+            sock.close()
+            corpo = resposta.partition(b"\r\n\r\n")[2].decode(errors="replace").strip()
+            raise SnapshotErro(f"Attach em {self.container} recusado: {status} {corpo}")
+        self._sock = sock
+        return self
+
+    def enviar(self, comando):
+        if self._sock is None:
+            self.conectar()
+        # Com tty o Enter é \r
+        self._sock.sendall(comando.encode() + b"\r")
+
+    def fechar(self):
+        # Fechar o attach não fecha o stdin do servidor (stdin_once é false)
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def __enter__(self):
+        return self.conectar()
+
+    def __exit__(self, *_):
+        self.fechar()
+
+
+def _ultima_mudanca(caminhos):
+    """Maior mtime (ns) de tudo sob `caminhos` (diretórios ou arquivos)"""
+    maior = 0
+    for caminho in caminhos:
+        try:
+            maior = max(maior, os.lstat(caminho).st_mtime_ns)
+        except FileNotFoundError:
+            continue
+        for atual, _, arquivos in os.walk(caminho):
+            for nome in arquivos:
+                try:
+                    maior = max(maior, os.lstat(os.path.join(atual, nome)).st_mtime_ns)
+                except FileNotFoundError:
+                    pass
+    return maior
+
+
+def esperar_estabilizar(caminhos, estavel=ESTAVEL, timeout=TIMEOUT_ESTAVEL, intervalo=INTERVALO_ESTAVEL):
+    """Espera até nada mudar por `estavel` s; retorna o último mtime, ou None no timeout"""
+    limite = time.monotonic() + timeout
+    anterior = _ultima_mudanca(caminhos)
+    parado_desde = time.monotonic()
+    while time.monotonic() < limite:
+        time.sleep(intervalo)
+        atual = _ultima_mudanca(caminhos)
+        if atual != anterior:
+            anterior = atual
+            parado_desde = time.monotonic()
+        elif time.monotonic() - parado_desde >= estavel:
+            return atual
+    return None
+
+
+class EstatisticasStaging:
+    def __init__(self):
+        self.inicio = time.monotonic()
+        self.iguais = 0
+        self.clonados = 0
+        self.copiados = 0
+        self.removidos = 0
+        self.bytes_copiados = 0
+
+    @property
+    def duracao(self):
+        return time.monotonic() - self.inicio
+
+
+def _clonar(origem, destino):
+    """Clone reflink; False se o sistema de arquivos não suportar"""
+    with open(origem, "rb") as fo, open(destino, "wb") as fd:
+        try:
+            fcntl.ioctl(fd.fileno(), FICLONE, fo.fileno())
+            return True
+        except OSError as e:
+            if e.errno in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS):
+                return False
+            raise
+
+
+def sincronizar(origem, staging, reflink=True, estatisticas=None):
+    """Deixa o diretório `staging` igual a `origem` copiando só o que mudou"""
+    estatisticas = estatisticas or EstatisticasStaging()
+    os.makedirs(staging, exist_ok=True)
+    vistos = set()
+
+    for atual, dirs, arquivos in os.walk(origem):
+        relativo = os.path.relpath(atual, origem)
+        destino_dir = os.path.normpath(os.path.join(staging, relativo))
+        os.makedirs(destino_dir, exist_ok=True)
+        vistos.add(destino_dir)
+
+        for nome in dirs + arquivos:
+            fonte = os.path.join(atual, nome)
+            destino = os.path.join(destino_dir, nome)
+            try:
+                info = os.lstat(fonte)
+            except FileNotFoundError:
+                continue
+
+            if stat.S_ISDIR(info.st_mode):
+                if os.path.islink(destino) or (os.path.lexists(destino) and not os.path.isdir(destino)):
+                    os.remove(destino)
+                continue
+            vistos.add(destino)
+
+            if stat.S_ISLNK(info.st_mode):
+                alvo = os.readlink(fonte)
+                if not (os.path.islink(destino) and os.readlink(destino) == alvo):
+                    if os.path.lexists(destino):
+                        _remover(destino)
+                    os.symlink(alvo, destino)
+                continue
+            if stat.S_ISREG(info.st_mode):
+                reflink = _sincronizar_arquivo(fonte, destino, info, estatisticas, reflink)
+
+    # Remove o que não existe mais na origem (do mais fundo para cima)
+    for atual, dirs, arquivos in os.walk(staging, topdown=False):
+        for nome in arquivos + dirs:
+            caminho = os.path.join(atual, nome)
+            if caminho not in vistos:
+                _remover(caminho)
+                estatisticas.removidos += 1
+
+    # mtime dos diretórios por último, depois de mexer no conteúdo
+    for atual, dirs, _ in os.walk(origem):
+        destino_dir = os.path.normpath(os.path.join(staging, os.path.relpath(atual, origem)))
+        try:
+            shutil.copystat(atual, destino_dir)
+        except FileNotFoundError:
+            pass
+    return estatisticas
+
+
+def _sincronizar_arquivo(fonte, destino, info, estatisticas, reflink):
+    """Copia um arquivo regular se mudou; retorna se o reflink segue disponível"""
+    try:
+        atual_destino = os.lstat(destino)
+        if (stat.S_ISREG(atual_destino.st_mode) and atual_destino.st_size == info.st_size
+                and atual_destino.st_mtime_ns == info.st_mtime_ns):
+            estatisticas.iguais += 1
+            return reflink
+        _remover(destino)
+    except FileNotFoundError:
+        pass
+
+    if reflink and _clonar(fonte, destino):
+        estatisticas.clonados += 1
+    else:
+        reflink = False
+        shutil.copyfile(fonte, destino)
+        estatisticas.copiados += 1
+        estatisticas.bytes_copiados += info.st_size
+    shutil.copystat(fonte, destino)
+    return reflink
+
+
+def sincronizar_itens(raiz, staging, itens):
+    """Sincroniza cada item (relativo a `raiz`) para o mesmo caminho sob `staging`"""
+    estatisticas = EstatisticasStaging()
+    for item in itens:
+        fonte = os.path.join(raiz, item)
+        destino = os.path.join(staging, item)
+        try:
+            info = os.lstat(fonte)
+        except FileNotFoundError:
+            # Item removido da origem: some do staging também
+            if os.path.lexists(destino):
+                _remover(destino)
+                estatisticas.removidos += 1
+            continue
+
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        if stat.S_ISDIR(info.st_mode):
+            if os.path.lexists(destino) and (os.path.islink(destino) or not os.path.isdir(destino)):
+                _remover(destino)
+            sincronizar(fonte, destino, estatisticas=estatisticas)
+        elif stat.S_ISREG(info.st_mode):
+            if os.path.isdir(destino) and not os.path.islink(destino):
+                _remover(destino)
+            _sincronizar_arquivo(fonte, destino, info, estatisticas, reflink=True)
+    return estatisticas
+
+
+def _remover(caminho):
+    if os.path.isdir(caminho) and not os.path.islink(caminho):
+        shutil.rmtree(caminho)
+    else:
+        os.remove(caminho)
+
+
+def criar_snapshot(raiz, staging, itens, observar=None, container=CONTAINER_PADRAO, salvar=(), pausar=(),
+                   retomar=(), estavel=ESTAVEL, timeout=TIMEOUT_ESTAVEL):
+    """Salva pelo console, espera gravar, sincroniza o staging e retoma
+
+    `observar` (padrão: os próprios itens) são os caminhos que o servidor
+    grava, relativos a `raiz`. Retorna (estatisticas, consistente):
+    estatisticas é None se o mundo não estabilizou (nada é copiado) e
+    consistente é False também se algo mudou durante a cópia. Os comandos
+    de `retomar` são enviados mesmo se a cópia falhar.
+    """
+    observados = [os.path.join(raiz, caminho) for caminho in (observar or itens)]
+    console = ConsoleContainer(container) if (salvar or pausar or retomar) else None
+    try:
+        if console is not None:
+            console.conectar()
+            for comando in list(pausar) + list(salvar):
+                console.enviar(comando)
+        marca = esperar_estabilizar(observados, estavel, timeout)
+        if marca is None:
+            return None, False
+        estatisticas = sincronizar_itens(raiz, staging, itens)
+        consistente = _ultima_mudanca(observados) == marca
+    finally:
+        if console is not None:
+            try:
+                for comando in retomar:
+                    console.enviar(comando)
+            finally:
+                console.fechar()
+    return estatisticas, consistente
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Snapshot do mundo com o servidor rodando")
+    parser.add_argument("itens", nargs="+", help="caminhos relativos à raiz copiados para o staging")
+    parser.add_argument("--raiz", default=".")
+    parser.add_argument("--staging", required=True)
+    parser.add_argument("--observar", action="append", default=[],
+                        help="caminho gravado pelo servidor, relativo à raiz (repetível; padrão: os itens)")
+    parser.add_argument("--container", default=CONTAINER_PADRAO)
+    parser.add_argument("--salvar", action="append", default=[], help="comando de save (repetível)")
+    parser.add_argument("--pausar", action="append", default=[], help="enviado antes do save")
+    parser.add_argument("--retomar", action="append", default=[], help="enviado depois da cópia")
+    parser.add_argument("--estavel", type=float, default=ESTAVEL)
+    parser.add_argument("--timeout", type=float, default=TIMEOUT_ESTAVEL)
+    args = parser.parse_args(argv)
+
+    # Um staging por vez (dois backups simultâneos se atropelariam)
+    os.makedirs(os.path.dirname(os.path.abspath(args.staging)), exist_ok=True)
+    with open(os.path.abspath(args.staging) + ".lock", "w") as trava:
+        try:
+            fcntl.flock(trava, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            print(f"Erro: staging em uso: {args.staging}", file=sys.stderr)
+            return 1
+
+        try:
+            estatisticas, consistente = criar_snapshot(
+                args.raiz, args.staging, args.itens, args.observar or None, args.container,
+                salvar=args.salvar, pausar=args.pausar, retomar=args.retomar,
+                estavel=args.estavel, timeout=args.timeout
+            )
+        except (SnapshotErro, OSError) as e:
+            print(f"Erro no snapshot: {e}", file=sys.stderr)
+            return 1
+
+    if estatisticas is None:
+        print(f"Erro: arquivos ainda mudando após {args.timeout:.0f}s, snapshot não criado", file=sys.stderr)
+        return INCONSISTENTE
+    if not consistente:
+        print("Erro: o mundo mudou durante a cópia, staging inconsistente", file=sys.stderr)
+        return INCONSISTENTE
+    print(
+        f"Staging pronto em {estatisticas.duracao:.1f}s: {estatisticas.iguais} iguais,"
+        f" {estatisticas.clonados} clonados, {estatisticas.copiados} copiados"
+        f" ({estatisticas.bytes_copiados / 1024 ** 2:,.1f} MB), {estatisticas.removidos} removidos"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,156 @@
+import argparse
+import asyncio
+import logging
+import sys
+
+from aiohttp import web
+
+from kuma import KUMA_DOWN, KUMA_UP, ClienteKuma
+
+# =======================
+# TESTE KUMA
+# =======================
+#
+# Verificação do cliente do Uptime Kuma contra um servidor HTTP local que
+# imita a API da status page e dos monitores Push. Cobre a leitura em lote
+# (duas requisições para todos os monitores), o cache entre os ticks, a
+# atualização compartilhada por chamadas concorrentes e o push com respostas
+# boas, recusadas e malformadas. Roda offline, sem o Kuma:
+#
+#   python teste_kuma.py
+
+SLUG = "hytale"
+API_KEY = "chave-teste"
+
+PAGINA = {
+    "publicGroupList": [
+        {"name": "Serviços", "monitorList": [{"id": 1, "name": "Hytale"}, {"id": 2, "name": "Cloudflare"}]},
+        {"name": "Rede", "monitorList": [{"id": 3, "name": "LAN"}]},
+    ]
+}
+BATIMENTOS = {
+    "heartbeatList": {
+        "1": [{"status": KUMA_DOWN, "ping": 80, "msg": "timeout"}, {"status": KUMA_UP, "ping": 12, "msg": "OK"}],
+        "2": [{"status": KUMA_DOWN, "ping": None, "msg": "falha"}],
+    },
+    "uptimeList": {"1_24": 0.995, "2_24": 0.5},
+}
+
+
+class StubKuma:
+    """Servidor local com as rotas usadas pelo ClienteKuma, contando as requisições"""
+
+    def __init__(self):
+        self.requisicoes = {"pagina": 0, "batimentos": 0, "push": 0}
+        self.pushes = []
+        self.autorizacoes = set()
+        self._runner = None
+        self.url = None
+
+    async def _pagina(self, request):
+        self.requisicoes["pagina"] += 1
+        self.autorizacoes.add(request.headers.get("Authorization"))
+        # Atraso para chamadas concorrentes se sobreporem
+        await asyncio.sleep(0.05)
+        return web.json_response(PAGINA)
+
+    async def _batimentos(self, request):
+        self.requisicoes["batimentos"] += 1
+        await asyncio.sleep(0.05)
+        return web.json_response(BATIMENTOS)
+
+    async def _push(self, request):
+        self.requisicoes["push"] += 1
+        token = request.match_info["token"]
+        self.pushes.append((token, dict(request.query)))
+        if token == "valido":
+            return web.json_response({"ok": True})
+        if token == "lista":
+            return web.json_response(["ok"])
+        if token == "html":
+            return web.Response(status=502, text="<html>Bad Gateway</html>", content_type="text/html")
+        return web.json_response({"ok": False, "msg": "Monitor not found or not active."}, status=404)
+
+    async def iniciar(self):
+        app = web.Application()
+        app.router.add_get(f"/api/status-page/{SLUG}", self._pagina)
+        app.router.add_get(f"/api/status-page/heartbeat/{SLUG}", self._batimentos)
+        app.router.add_get("/api/push/{token}", self._push)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        porta = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{porta}"
+
+    async def parar(self):
+        await self._runner.cleanup()
+
+
+class Verificacao:
+    def __init__(self):
+        self.falhas = 0
+
+    def conferir(self, descricao, ok):
+        print(f"  {'OK   ' if ok else 'FALHA'} {descricao}")
+        if not ok:
+            self.falhas += 1
+
+
+async def executar(v):
+    stub = StubKuma()
+    await stub.iniciar()
+    kuma = ClienteKuma(stub.url, SLUG, API_KEY, cache=0.5)
+    try:
+        print("Status page")
+        monitores = await kuma.monitores()
+        v.conferir("todos os grupos lidos de uma vez", sorted(monitores) == [1, 2, 3])
+        v.conferir("uma requisição por endpoint", stub.requisicoes["pagina"] == 1 and stub.requisicoes["batimentos"] == 1)
+        hytale = monitores[1]
+        v.conferir("último heartbeat vence", hytale.ativo and hytale.ping == 12 and hytale.mensagem == "OK")
+        v.conferir("uptime 24h", hytale.uptime_24h == 0.995 and monitores[2].uptime_24h == 0.5)
+        v.conferir("monitor sem histórico", monitores[3].status is None and monitores[3].uptime_24h is None)
+        v.conferir("API key como basic auth", any(a and a.startswith("Basic ") for a in stub.autorizacoes))
+
+        print("Cache")
+        await kuma.monitor(2)
+        v.conferir("dentro da janela não vai à rede", stub.requisicoes["pagina"] == 1)
+        await kuma.monitores(forcar=True)
+        v.conferir("forcar=True atualiza", stub.requisicoes["pagina"] == 2)
+        await asyncio.sleep(0.6)
+        resultados = await asyncio.gather(*(kuma.monitores() for _ in range(5)))
+        v.conferir("chamadas concorrentes compartilham a atualização", stub.requisicoes["pagina"] == 3)
+        v.conferir("mesmo resultado para todas", all(r is resultados[0] for r in resultados))
+
+        print("Push")
+        ok = await kuma.push("valido", True, ping=0.0123)
+        _, params = stub.pushes[-1]
+        v.conferir("heartbeat aceito", ok and kuma.pushes == 1)
+        v.conferir("status, msg e ping em ms", params == {"status": "up", "msg": "OK", "ping": "12.3"})
+        await kuma.push("valido", False, mensagem="timeout")
+        v.conferir("falha enviada como down", stub.pushes[-1][1] == {"status": "down", "msg": "timeout"})
+        v.conferir("token inválido retorna False", await kuma.push("inexistente", True) is False)
+        v.conferir("resposta não-objeto retorna False", await kuma.push("lista", True) is False)
+        v.conferir("resposta HTML retorna False", await kuma.push("html", True) is False)
+        v.conferir("falhas contadas", kuma.falhas_push == 3 and kuma.pushes == 2)
+    finally:
+        await kuma.fechar()
+        await stub.parar()
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Verifica o cliente do Uptime Kuma contra um servidor local")
+    parser.add_argument("--com-logs", action="store_true", help="mantém o logging do cliente ligado")
+    args = parser.parse_args(argv)
+
+    if not args.com_logs:
+        logging.disable(logging.CRITICAL)
+
+    v = Verificacao()
+    asyncio.run(executar(v))
+    print(f"{v.falhas} falha(s)" if v.falhas else "Tudo OK")
+    return 1 if v.falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,77 @@
+import argparse
+import sys
+
+from log_classifier import (
+    AGUARDANDO_PERFIL, ATENCAO, AUTH_AUTENTICADO, AUTH_SUCESSO, DESCONHECIDO, LIMITE_HANDSHAKES, NECESSARIA, OK,
+    MaquinaAuth, classificar
+)
+
+# =======================
+# TESTE LOG CLASSIFIER
+# =======================
+#
+# Verificação do classificador de logs e da máquina de autenticação com
+# sequências curtas de linhas reais do servidor: login seguido de flood de
+# handshakes, handshakes sem login, falha depois de sucesso, reinício e
+# linhas de falha que contêm "authenticated". Roda offline:
+#
+#   python teste_log_classifier.py
+
+PREFIXO = "[2026/01/27 11:19:27   INFO]"
+LOGIN = f"{PREFIXO} [ServerAuth] Authentication successful"
+PERFIS = f"{PREFIXO} [ServerAuth] Multiple profiles available, use /auth select"
+PERFIL = f"{PREFIXO} [ServerAuth] Selected profile: NOR"
+ERRO = f"{PREFIXO} [ServerAuth] No server tokens configured"
+HANDSHAKE = f"{PREFIXO} [HandshakeHandler] Incoming connection from 10.0.0.7"
+REINICIO = f"{PREFIXO} [HytaleServer] Starting Hytale server"
+
+
+class Verificacao:
+    def __init__(self):
+        self.falhas = 0
+
+    def conferir(self, descricao, ok):
+        print(f"  {'OK   ' if ok else 'FALHA'} {descricao}")
+        if not ok:
+            self.falhas += 1
+
+
+def estado_apos(*linhas):
+    maquina = MaquinaAuth()
+    for linha in linhas:
+        maquina.processar_linha(None, linha)
+    return maquina.estado
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Verifica o classificador de logs e a máquina de auth")
+    parser.parse_args(argv)
+    v = Verificacao()
+    flood = [HANDSHAKE] * (LIMITE_HANDSHAKES * 3)
+
+    print("Handshakes")
+    v.conferir("login seguido de flood continua OK", estado_apos(LOGIN, *flood) == OK)
+    v.conferir("login, perfil selecionado e flood continua OK", estado_apos(LOGIN, PERFIL, *flood) == OK)
+    v.conferir("aguardando perfil não vira atenção", estado_apos(LOGIN, PERFIS, *flood) == AGUARDANDO_PERFIL)
+    v.conferir("flood sem login vira atenção", estado_apos(*flood) == ATENCAO)
+    v.conferir("poucos handshakes sem login", estado_apos(*flood[:LIMITE_HANDSHAKES - 1]) == DESCONHECIDO)
+    v.conferir("flood depois de reinício volta a preocupar", estado_apos(LOGIN, REINICIO, *flood) == ATENCAO)
+
+    print("Ordem dos eventos")
+    v.conferir("falha depois de sucesso", estado_apos(LOGIN, ERRO) == NECESSARIA)
+    v.conferir("sucesso depois de falha", estado_apos(ERRO, LOGIN) == OK)
+    v.conferir("falha não vira atenção com flood", estado_apos(ERRO, *flood) == NECESSARIA)
+
+    print("Linhas com \"authenticated\"")
+    for linha in ("User unauthenticated", "Player not authenticated", "Server isn't authenticated",
+                  "Request rejected: not yet authenticated"):
+        v.conferir(f"{linha!r} não é login", classificar(linha) not in (AUTH_AUTENTICADO, AUTH_SUCESSO))
+    v.conferir("'Authenticated as NOR' é login", classificar("Authenticated as NOR") == AUTH_SUCESSO)
+    v.conferir("'Successfully authenticated' é login", classificar("Successfully authenticated") == AUTH_AUTENTICADO)
+
+    print(f"{v.falhas} falha(s)" if v.falhas else "Tudo OK")
+    return 1 if v.falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,529 @@
+import argparse
+import base64
+import datetime
+import hashlib
+import hmac
+import http.client
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlsplit
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+# =======================
+# UPLOAD
+# =======================
+#
+# Envio do backup em partes, em paralelo, enquanto ele ainda está sendo
+# comprimido: o EnvioParalelo é um file-like que recebe o stream do
+# backup.py, corta em partes e manda cada uma numa thread. No máximo
+# 2 partes por thread ficam em memória. Cada parte concluída vai para um
+# manifesto local (<arquivo>.upload.json); se o envio cair, rodar de novo
+# sobre o arquivo pronto só manda as partes que faltam.
+#
+# Destinos:
+#   local:/mnt/backups            partes num diretório, juntadas no final
+#   rclone:gdrive:Backups/Hytale  partes em <nome>.partes/ + manifest.json
+#   s3://bucket/prefixo           multipart upload (S3_ENDPOINT, S3_ACCESS_KEY,
+#                                 S3_SECRET_KEY, S3_REGION)
+#
+# Uso:
+#   python3 upload.py enviar backups/x.tar.gz rclone:gdrive:Backups/Hytale
+#   python3 upload.py baixar rclone:gdrive:Backups/Hytale x.tar.gz restaurado.tar.gz
+
+log = logging.getLogger(__name__)
+
+PARTE_PADRAO = 16 * 1024 * 1024
+THREADS_PADRAO = 4
+TENTATIVAS = 3
+TIMEOUT_PADRAO = 60
+SUFIXO_MANIFESTO = ".upload.json"
+
+
+class UploadErro(Exception):
+    """Falha no envio de uma parte ou na finalização"""
+
+
+def _hash(dados):
+    return hashlib.blake2b(dados, digest_size=16).hexdigest()
+
+
+def _timestamp_iso(texto):
+    """Data ISO 8601 do rclone/S3 (até nanossegundos, Z ou offset) em Unix timestamp"""
+    texto = re.sub(r"(\.\d{1,6})\d*", r"\1", texto.replace("Z", "+00:00"))
+    return datetime.datetime.fromisoformat(texto).timestamp()
+
+
+def _gravar_atomico(caminho, dados):
+    parcial = caminho + ".parcial"
+    with open(parcial, "wb") as f:
+        f.write(dados)
+    os.replace(parcial, caminho)
+
+
+# ---------- destinos ----------
+
+class DestinoLocal:
+    """Diretório local ou montado (NFS, disco externo)"""
+
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+        self.spec = f"local:{diretorio}"
+
+    def _partes(self, nome):
+        return os.path.join(self.diretorio, nome + ".partes")
+
+    def iniciar(self, nome, estado):
+        os.makedirs(self._partes(nome), exist_ok=True)
+
+    def enviar_parte(self, nome, indice, dados, estado):
+        _gravar_atomico(os.path.join(self._partes(nome), f"{indice:05d}"), dados)
+        return {}
+
+    def concluir(self, nome, partes, estado):
+        destino = os.path.join(self.diretorio, nome)
+        with open(destino + ".parcial", "wb") as saida:
+            for indice in range(len(partes)):
+                with open(os.path.join(self._partes(nome), f"{indice:05d}"), "rb") as parte:
+                    saida.write(parte.read())
+        os.replace(destino + ".parcial", destino)
+        for indice in range(len(partes)):
+            os.remove(os.path.join(self._partes(nome), f"{indice:05d}"))
+        os.rmdir(self._partes(nome))
+
+    def abortar(self, nome, estado):
+        pass
+
+    def remover(self, nomes):
+        for nome in nomes:
+            if os.path.exists(os.path.join(self.diretorio, nome)):
+                os.remove(os.path.join(self.diretorio, nome))
+            shutil.rmtree(self._partes(nome), ignore_errors=True)
+
+    def listar(self):
+        """Backups completos no destino: nome -> (tamanho, modificado)"""
+        backups = {}
+        for nome in os.listdir(self.diretorio):
+            caminho = os.path.join(self.diretorio, nome)
+            if os.path.isfile(caminho) and not nome.endswith(".parcial"):
+                st = os.stat(caminho)
+                backups[nome] = (st.st_size, st.st_mtime)
+        return backups
+
+    def baixar(self, nome, saida):
+        with open(os.path.join(self.diretorio, nome), "rb") as f:
+            while dados := f.read(PARTE_PADRAO):
+                saida.write(dados)
+
+
+class DestinoRclone:
+    """Qualquer remoto do rclone; sem concatenação no servidor, as partes ficam separadas"""
+
+    def __init__(self, remoto, rclone="rclone"):
+        self.remoto = remoto.rstrip("/")
+        self.rclone = rclone
+        self.spec = f"rclone:{remoto}"
+
+    def _rodar(self, *args, entrada=None):
+        resultado = subprocess.run(
+            [self.rclone, *args], input=entrada, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        if resultado.returncode != 0:
+            raise UploadErro(f"rclone {args[0]}: {resultado.stderr.decode(errors='replace').strip()}")
+        return resultado.stdout
+
+    def _partes(self, nome):
+        return f"{self.remoto}/{nome}.partes"
+
+    def iniciar(self, nome, estado):
+        pass
+
+    def enviar_parte(self, nome, indice, dados, estado):
+        self._rodar("rcat", f"{self._partes(nome)}/{indice:05d}", entrada=dados)
+        return {}
+
+    def concluir(self, nome, partes, estado):
+        # O manifest.json é gravado por último e marca o backup como completo
+        manifesto = {"nome": nome, "partes": [p["hash"] for p in partes], "tamanho": sum(p["tamanho"] for p in partes)}
+        self._rodar("rcat", f"{self._partes(nome)}/manifest.json", entrada=json.dumps(manifesto).encode())
+
+    def abortar(self, nome, estado):
+        pass
+
+    def remover(self, nomes):
+        """Apaga vários backups (arquivo único ou pasta de partes) num só comando"""
+        with tempfile.NamedTemporaryFile("w", suffix=".txt") as filtro:
+            for nome in nomes:
+                nome = re.sub(r"([\\*?\[\]{}])", r"\\\1", nome)
+                filtro.write(f"/{nome}\n/{nome}.partes/**\n")
+            filtro.flush()
+            self._rodar("delete", self.remoto, "--include-from", filtro.name)
+        self._rodar("rmdirs", self.remoto, "--leave-root")
+
+    def listar(self):
+        """Backups completos no remoto: nome -> (tamanho, modificado)
+
+        Arquivos únicos (rclone copy) e pastas de partes com manifest.json;
+        envios em andamento, ainda sem manifesto, ficam de fora.
+        """
+        backups = {}
+        partes = {}
+        for item in json.loads(self._rodar("lsjson", self.remoto, "--recursive", "--files-only")):
+            topo, _, resto = item["Path"].partition("/")
+            modificado = _timestamp_iso(item["ModTime"])
+            if not resto:
+                backups[topo] = (item["Size"], modificado)
+            elif topo.endswith(".partes") and "/" not in resto:
+                tamanho, ultimo, completo = partes.get(topo[:-len(".partes")], (0, 0.0, False))
+                partes[topo[:-len(".partes")]] = (
+                    tamanho + (0 if resto == "manifest.json" else item["Size"]),
+                    max(ultimo, modificado),
+                    completo or resto == "manifest.json",
+                )
+        backups.update({nome: (tamanho, ultimo) for nome, (tamanho, ultimo, completo) in partes.items() if completo})
+        return backups
+
+    def baixar(self, nome, saida):
+        manifesto = json.loads(self._rodar("cat", f"{self._partes(nome)}/manifest.json"))
+        for indice, esperado in enumerate(manifesto["partes"]):
+            dados = self._rodar("cat", f"{self._partes(nome)}/{indice:05d}")
+            if _hash(dados) != esperado:
+                raise UploadErro(f"Parte {indice} de {nome} corrompida")
+            saida.write(dados)
+
+
+class DestinoS3:
+    """Multipart upload em qualquer S3 compatível (AWS, MinIO, R2, B2), assinatura SigV4"""
+
+    def __init__(self, endpoint, bucket, prefixo="", chave=None, segredo=None, regiao="us-east-1",
+                 timeout=TIMEOUT_PADRAO):
+        url = urlsplit(endpoint)
+        self.https = url.scheme == "https"
+        self.host = url.netloc
+        self.bucket = bucket
+        self.prefixo = prefixo.strip("/")
+        self.chave = chave
+        self.segredo = segredo
+        self.regiao = regiao
+        self.timeout = timeout
+        self.spec = f"s3://{bucket}/{self.prefixo}"
+
+    def _caminho(self, nome):
+        if not nome:
+            return "/" + quote(self.bucket, safe="-_.~")
+        objeto = f"{self.prefixo}/{nome}" if self.prefixo else nome
+        return "/" + quote(f"{self.bucket}/{objeto}", safe="/-_.~")
+
+    def _assinar(self, metodo, caminho, query, corpo):
+        agora = datetime.datetime.now(datetime.timezone.utc)
+        data_hora = agora.strftime("%Y%m%dT%H%M%SZ")
+        data = data_hora[:8]
+        hash_corpo = hashlib.sha256(corpo).hexdigest()
+        headers = {"host": self.host, "x-amz-content-sha256": hash_corpo, "x-amz-date": data_hora}
+
+        query_canonica = "&".join(
+            f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}" for k, v in sorted(query.items())
+        )
+        assinados = ";".join(sorted(headers))
+        canonico = "\n".join([
+            metodo, caminho, query_canonica,
+            "".join(f"{k}:{headers[k]}\n" for k in sorted(headers)),
+            assinados, hash_corpo
+        ])
+        escopo = f"{data}/{self.regiao}/s3/aws4_request"
+        texto = "\n".join(["AWS4-HMAC-SHA256", data_hora, escopo, hashlib.sha256(canonico.encode()).hexdigest()])
+
+        chave = ("AWS4" + self.segredo).encode()
+        for parte in (data, self.regiao, "s3", "aws4_request"):
+            chave = hmac.new(chave, parte.encode(), hashlib.sha256).digest()
+        assinatura = hmac.new(chave, texto.encode(), hashlib.sha256).hexdigest()
+
+        headers["Authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.chave}/{escopo}, SignedHeaders={assinados}, Signature={assinatura}"
+        )
+        return headers, query_canonica
+
+    def _requisitar(self, metodo, nome, query=None, corpo=b"", saida=None, extras=None):
+        caminho = self._caminho(nome)
+        headers, query_canonica = self._assinar(metodo, caminho, query or {}, corpo)
+        headers.update(extras or {})
+        classe = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        conexao = classe(self.host, timeout=self.timeout)
+        try:
+            conexao.request(metodo, caminho + ("?" + query_canonica if query_canonica else ""), body=corpo, headers=headers)
+            resposta = conexao.getresponse()
+            if saida is not None and resposta.status == 200:
+                while dados := resposta.read(PARTE_PADRAO):
+                    saida.write(dados)
+                return resposta, b""
+            dados = resposta.read()
+            # O S3 pode responder 200 com <Error> no CompleteMultipartUpload
+            if resposta.status >= 300 or dados.lstrip().startswith(b"<Error"):
+                raise UploadErro(f"S3 {metodo} {nome}: {resposta.status} {dados[:300].decode(errors='replace')}")
+            return resposta, dados
+        finally:
+            conexao.close()
+
+    def iniciar(self, nome, estado):
+        if estado.get("upload_id"):
+            return
+        _, dados = self._requisitar("POST", nome, {"uploads": ""})
+        raiz = ElementTree.fromstring(dados)
+        upload_id = next(e.text for e in raiz.iter() if e.tag.endswith("UploadId"))
+        estado["upload_id"] = upload_id
+
+    def enviar_parte(self, nome, indice, dados, estado):
+        resposta, _ = self._requisitar(
+            "PUT", nome, {"partNumber": str(indice + 1), "uploadId": estado["upload_id"]}, dados
+        )
+        return {"etag": resposta.getheader("ETag")}
+
+    def concluir(self, nome, partes, estado):
+        corpo = "<CompleteMultipartUpload>" + "".join(
+            f"<Part><PartNumber>{indice + 1}</PartNumber><ETag>{parte['etag']}</ETag></Part>"
+            for indice, parte in enumerate(partes)
+        ) + "</CompleteMultipartUpload>"
+        self._requisitar("POST", nome, {"uploadId": estado["upload_id"]}, corpo.encode())
+
+    def abortar(self, nome, estado):
+        if estado.get("upload_id"):
+            self._requisitar("DELETE", nome, {"uploadId": estado["upload_id"]})
+
+    def remover(self, nomes):
+        """DeleteObjects em lotes de 1000 chaves"""
+        for inicio in range(0, len(nomes), 1000):
+            objetos = "".join(
+                f"<Object><Key>{escape(f'{self.prefixo}/{nome}' if self.prefixo else nome)}</Key></Object>"
+                for nome in nomes[inicio:inicio + 1000]
+            )
+            corpo = f"<Delete><Quiet>true</Quiet>{objetos}</Delete>".encode()
+            _, dados = self._requisitar("POST", "", {"delete": ""}, corpo, extras={
+                "Content-MD5": base64.b64encode(hashlib.md5(corpo).digest()).decode()
+            })
+            if b"<Error>" in dados:
+                raise UploadErro(f"S3 DeleteObjects: {dados[:300].decode(errors='replace')}")
+
+    def listar(self):
+        """Objetos sob o prefixo (ListObjectsV2, 1000 por página): nome -> (tamanho, modificado)"""
+        prefixo = f"{self.prefixo}/" if self.prefixo else ""
+        backups = {}
+        query = {"list-type": "2", "prefix": prefixo}
+        while True:
+            _, dados = self._requisitar("GET", "", query)
+            raiz = ElementTree.fromstring(dados)
+            for objeto in (e for e in raiz if e.tag.endswith("Contents")):
+                campos = {e.tag.rpartition("}")[2]: e.text for e in objeto}
+                nome = campos["Key"][len(prefixo):]
+                if nome and "/" not in nome:
+                    backups[nome] = (int(campos["Size"]), _timestamp_iso(campos["LastModified"]))
+            token = next((e.text for e in raiz if e.tag.endswith("NextContinuationToken")), None)
+            if not token:
+                return backups
+            query["continuation-token"] = token
+
+    def baixar(self, nome, saida):
+        self._requisitar("GET", nome, saida=saida)
+
+
+def abrir_destino(spec):
+    """Cria o destino a partir de 'local:DIR', 'rclone:REMOTO:CAMINHO' ou 's3://BUCKET/PREFIXO'"""
+    if spec.startswith("local:"):
+        return DestinoLocal(spec[len("local:"):])
+    if spec.startswith("rclone:"):
+        return DestinoRclone(spec[len("rclone:"):])
+    if spec.startswith("s3://"):
+        bucket, _, prefixo = spec[len("s3://"):].partition("/")
+        return DestinoS3(
+            os.getenv("S3_ENDPOINT", "https://s3.amazonaws.com"), bucket, prefixo,
+            chave=os.getenv("S3_ACCESS_KEY"), segredo=os.getenv("S3_SECRET_KEY"),
+            regiao=os.getenv("S3_REGION", "us-east-1")
+        )
+    raise ValueError(f"Destino desconhecido: {spec}")
+
+
+# ---------- envio ----------
+
+class EnvioParalelo:
+    """File-like de escrita que envia partes em paralelo e retoma pelo manifesto
+
+    Erros de envio não interrompem quem escreve (o backup local continua);
+    eles aparecem no close(), e o manifesto fica para a próxima tentativa.
+    """
+
+    def __init__(self, destino, nome, manifesto, tamanho_parte=PARTE_PADRAO, threads=THREADS_PADRAO,
+                 tentativas=TENTATIVAS):
+        self.destino = destino
+        self.nome = nome
+        self.caminho_manifesto = manifesto
+        self.tentativas = tentativas
+        self.threads = threads
+        self.enviados = 0
+        self.reaproveitados = 0
+        self.erro = None
+        self.inicio = time.monotonic()
+
+        self.manifesto = self._carregar(tamanho_parte)
+        self.tamanho_parte = self.manifesto["tamanho_parte"]
+        self._buffer = bytearray()
+        self._indice = 0
+        self._futuros = []
+        self._lock = threading.Lock()
+        # Limita a memória: no máximo 2 partes por thread em voo
+        self._vagas = threading.BoundedSemaphore(threads * 2)
+        self._executor = ThreadPoolExecutor(max_workers=threads)
+
+        try:
+            destino.iniciar(nome, self.manifesto["estado"])
+            self._salvar()
+        except (UploadErro, OSError, ElementTree.ParseError) as e:
+            self.erro = e
+
+    def _carregar(self, tamanho_parte):
+        try:
+            with open(self.caminho_manifesto) as f:
+                manifesto = json.load(f)
+            if manifesto.get("nome") == self.nome and manifesto.get("destino") == self.destino.spec:
+                return manifesto
+        except (OSError, ValueError):
+            pass
+        return {"nome": self.nome, "destino": self.destino.spec, "tamanho_parte": tamanho_parte, "estado": {}, "partes": {}}
+
+    def _salvar(self):
+        with self._lock:
+            _gravar_atomico(self.caminho_manifesto, json.dumps(self.manifesto).encode())
+
+    def write(self, dados):
+        if self.erro is not None:
+            return len(dados)
+        self._buffer += dados
+        while len(self._buffer) >= self.tamanho_parte:
+            self._submeter(bytes(self._buffer[:self.tamanho_parte]))
+            del self._buffer[:self.tamanho_parte]
+        return len(dados)
+
+    def _submeter(self, dados):
+        indice = self._indice
+        self._indice += 1
+        feito = self.manifesto["partes"].get(str(indice))
+        if feito and feito["hash"] == _hash(dados):
+            self.reaproveitados += 1
+            return
+        self._vagas.acquire()
+        self._futuros.append(self._executor.submit(self._enviar, indice, dados))
+
+    def _enviar(self, indice, dados):
+        try:
+            for tentativa in range(1, self.tentativas + 1):
+                try:
+                    info = self.destino.enviar_parte(self.nome, indice, dados, self.manifesto["estado"])
+                    break
+                except (UploadErro, OSError, http.client.HTTPException) as e:
+                    if tentativa == self.tentativas:
+                        self.erro = e
+                        return
+                    log.warning("Parte %d de %s falhou (%s), tentativa %d/%d", indice, self.nome, e, tentativa, self.tentativas)
+                    time.sleep(2 ** tentativa)
+
+            info.update(hash=_hash(dados), tamanho=len(dados))
+            with self._lock:
+                self.manifesto["partes"][str(indice)] = info
+                self.enviados += len(dados)
+                _gravar_atomico(self.caminho_manifesto, json.dumps(self.manifesto).encode())
+        finally:
+            self._vagas.release()
+
+    def close(self):
+        """Envia o resto, espera as threads e finaliza o objeto no destino"""
+        if self._buffer and self.erro is None:
+            self._submeter(bytes(self._buffer))
+            self._buffer.clear()
+        for futuro in self._futuros:
+            futuro.result()
+        self._executor.shutdown()
+
+        if self.erro is not None:
+            raise UploadErro(f"Envio de {self.nome} incompleto ({self.erro}); rode de novo para retomar")
+
+        partes = [self.manifesto["partes"][str(i)] for i in range(self._indice)]
+        # Partes sobrando de uma tentativa anterior com arquivo maior
+        self.manifesto["partes"] = {str(i): p for i, p in enumerate(partes)}
+        try:
+            self.destino.concluir(self.nome, partes, self.manifesto["estado"])
+        except (UploadErro, OSError, http.client.HTTPException) as e:
+            self._salvar()
+            raise UploadErro(f"Falha ao finalizar {self.nome}: {e}") from None
+        os.remove(self.caminho_manifesto)
+
+    def abortar(self):
+        """Para o envio mantendo o manifesto para retomar depois"""
+        self.erro = self.erro or UploadErro("abortado")
+        self._executor.shutdown(cancel_futures=True)
+
+    @property
+    def vazao(self):
+        duracao = time.monotonic() - self.inicio
+        return self.enviados / duracao if duracao > 0 else 0.0
+
+
+def enviar_arquivo(caminho, destino, tamanho_parte=PARTE_PADRAO, threads=THREADS_PADRAO):
+    """Envia (ou retoma o envio de) um arquivo já pronto"""
+    envio = EnvioParalelo(
+        destino, os.path.basename(caminho), caminho + SUFIXO_MANIFESTO, tamanho_parte, threads
+    )
+    with open(caminho, "rb") as f:
+        while dados := f.read(envio.tamanho_parte):
+            envio.write(dados)
+            if envio.erro is not None:
+                break
+    envio.close()
+    return envio
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Envio de backups em partes paralelas")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("enviar", help="envia ou retoma o envio de um arquivo")
+    p.add_argument("arquivo")
+    p.add_argument("destino", help="local:DIR, rclone:REMOTO:CAMINHO ou s3://BUCKET/PREFIXO")
+    p.add_argument("--threads", type=int, default=THREADS_PADRAO)
+    p.add_argument("--parte-mb", type=int, default=PARTE_PADRAO // 1024 ** 2)
+
+    p = sub.add_parser("baixar", help="baixa e junta as partes de um backup")
+    p.add_argument("destino")
+    p.add_argument("nome")
+    p.add_argument("saida")
+
+    args = parser.parse_args(argv)
+    try:
+        destino = abrir_destino(args.destino)
+        if args.comando == "baixar":
+            with open(args.saida + ".parcial", "wb") as saida:
+                destino.baixar(args.nome, saida)
+            os.replace(args.saida + ".parcial", args.saida)
+            print(f"{args.nome} baixado em {args.saida}")
+            return 0
+
+        envio = enviar_arquivo(args.arquivo, destino, args.parte_mb * 1024 ** 2, args.threads)
+    except (UploadErro, OSError, ValueError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+
+    print(
+        f"{os.path.basename(args.arquivo)} enviado para {args.destino}: {envio.enviados / 1024 ** 2:,.1f} MB"
+        f" ({envio.reaproveitados} parte(s) já enviadas) · {envio.vazao / 1024 ** 2:,.1f} MB/s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -7,6 +7,13 @@ JAVA_CMD="java"
 # Add JVM options
 JAVA_CMD="$JAVA_CMD $JAVA_OPTS"
 
+# GC pauses to stdout so the Discord bot can track heap usage from the logs.
+# Off by default: every GC line also counts against the bot's and auth.sh's
+# `--tail` windows, pushing older auth/player events out of them.
+if [ "$GC_LOG" = "true" ]; then
+    JAVA_CMD="$JAVA_CMD -Xlog:gc:stdout:uptime,level,tags"
+fi
+
 # Add AOT cache if enabled
 if [ "$USE_AOT_CACHE" = "true" ] && [ -f "/server/HytaleServer.aot" ]; then
     JAVA_CMD="$JAVA_CMD -XX:AOTCache=HytaleServer.aot"
@@ -19,6 +19,12 @@ DATA_DIR="$PROJECT_DIR/data"
 BACKUP_DIR="$PROJECT_DIR/backups"
 LOG_FILE="$PROJECT_DIR/logs/backup-auto.log"
 
+# Backup catalog (name, size, checksum, remote copies); read by the Discord bot
+CATALOG_FILE="$BACKUP_DIR/catalogo.jsonl"
+CATALOG_TOOL="$PROJECT_DIR/.docker/discord-bot/catalogo.py"
+CATALOG_READY=false
+command -v python3 &> /dev/null && [ -f "$CATALOG_TOOL" ] && CATALOG_READY=true
+
 # Google Drive via rclone
 GDRIVE_BACKUP_PATH="gdrive:Backups/Hytale"
 
@@ -38,6 +44,101 @@ log_success() {
     echo "[$(date '+%Y-%m-%d %H:%M:%S')] [OK] $1" | tee -a "$LOG_FILE"
 }
 
+# Legacy Drive cleanup, used when there is no backup catalog
+cleanup_drive_legacy() {
+    # Clean old Drive backups (keep most recent backup per day for 7 days)
+    log "Cleaning old Google Drive backups (keeping most recent per day for 7 days)..."
+
+    backups=$(rclone lsf "$GDRIVE_BACKUP_PATH" --files-only 2>/dev/null | grep "^[0-9]\{2\}-[0-9]\{2\}-[0-9]\{4\}_.*\.tar\.gz$" | sort -r || true)
+
+    if [ -n "$backups" ]; then
+        # Group backups by date
+        declare -A daily_drive_backups
+        cutoff_date=$(date -d '7 days ago' +%Y%m%d 2>/dev/null || date -v-7d +%Y%m%d 2>/dev/null)
+
+        while IFS= read -r backup; do
+            # Extract date from filename: DD-MM-YYYY_HHhMM.tar.gz
+            if [[ $backup =~ ^([0-9]{2})-([0-9]{2})-([0-9]{4})_([0-9]{2})h([0-9]{2})\.tar\.gz$ ]]; then
+                day="${BASH_REMATCH[1]}"
+                month="${BASH_REMATCH[2]}"
+                year="${BASH_REMATCH[3]}"
+                # Convert to YYYYMMDD for comparison
+                backup_date="${year}${month}${day}"
+
+                # Check if backup is older than 7 days
+                if [ "$backup_date" -lt "$cutoff_date" ]; then
+                    log "Removing from Drive: $backup (older than 7 days)"
+                    rclone delete "$GDRIVE_BACKUP_PATH/$backup" 2>&1 | tee -a "$LOG_FILE"
+                elif [ -z "${daily_drive_backups[$backup_date]}" ]; then
+                    # Keep first (most recent) backup for this date
+                    daily_drive_backups[$backup_date]="$backup"
+                    log "Keeping in Drive: $backup (most recent for $backup_date)"
+                else
+                    # Remove older backup from same day
+                    log "Removing from Drive: $backup (superseded by newer backup on same day)"
+                    rclone delete "$GDRIVE_BACKUP_PATH/$backup" 2>&1 | tee -a "$LOG_FILE"
+                fi
+            fi
+        done <<< "$backups"
+
+        remaining_count=$(rclone lsf "$GDRIVE_BACKUP_PATH" --files-only 2>/dev/null | grep -c "^[0-9]\{2\}-[0-9]\{2\}-[0-9]\{4\}_.*\.tar\.gz$" || echo "0")
+        log_success "Drive cleanup completed (kept $remaining_count daily backups)"
+    else
+        log "No backups found in Google Drive"
+    fi
+}
+
+# Legacy local cleanup, used when there is no backup catalog
+cleanup_local_legacy() {
+    # Clean old local backups (keep most recent backup per day for 7 days)
+    log "Cleaning old local backups (keeping most recent per day for 7 days)..."
+    cd "$BACKUP_DIR"
+
+    # Get list of all backups sorted by name (which includes timestamp)
+    backups=$(ls -1 [0-9][0-9]-[0-9][0-9]-[0-9][0-9][0-9][0-9]_*.tar.gz 2>/dev/null | sort -r || true)
+
+    if [ -n "$backups" ]; then
+        # Group backups by date
+        declare -A daily_backups
+
+        while IFS= read -r backup; do
+            # Extract date from filename: DD-MM-YYYY_HHhMM.tar.gz
+            if [[ $backup =~ ^([0-9]{2})-([0-9]{2})-([0-9]{4})_([0-9]{2})h([0-9]{2})\.tar\.gz$ ]]; then
+                day="${BASH_REMATCH[1]}"
+                month="${BASH_REMATCH[2]}"
+                year="${BASH_REMATCH[3]}"
+                # Convert to YYYYMMDD for comparison
+                backup_date="${year}${month}${day}"
+
+                # Keep only the most recent backup for each date (first one since sorted in reverse)
+                if [ -z "${daily_backups[$backup_date]}" ]; then
+                    daily_backups[$backup_date]="$backup"
+                    log "Keeping: $backup (most recent for $backup_date)"
+                else
+                    log "Removing: $backup (superseded by newer backup on same day)"
+                    rm -f "$backup"
+                fi
+            fi
+        done <<< "$backups"
+
+        # Now remove backups older than 7 days
+        cutoff_date=$(date -d '7 days ago' +%Y%m%d 2>/dev/null || date -v-7d +%Y%m%d 2>/dev/null)
+
+        for backup_date in "${!daily_backups[@]}"; do
+            if [ "$backup_date" -lt "$cutoff_date" ]; then
+                backup_file="${daily_backups[$backup_date]}"
+                log "Removing: $backup_file (older than 7 days)"
+                rm -f "$backup_file"
+            fi
+        done
+
+        remaining_count=$(ls -1 [0-9][0-9]-[0-9][0-9]-[0-9][0-9][0-9][0-9]_*.tar.gz 2>/dev/null | wc -l)
+        log_success "Local cleanup completed (kept $remaining_count daily backups)"
+    else
+        log "No backups found"
+    fi
+}
+
 # Start
 log "=========================================="
 log "Starting automated backup"
@@ -56,6 +157,11 @@ fi
 # Create backup directory if it doesn't exist
 mkdir -p "$BACKUP_DIR"
 
+# First run with the catalog: register the archives that already exist
+if [ "$CATALOG_READY" = true ] && [ ! -f "$CATALOG_FILE" ]; then
+    python3 "$CATALOG_TOOL" --catalogo "$CATALOG_FILE" importar "$BACKUP_DIR" 2>&1 | tee -a "$LOG_FILE"
+fi
+
 # Create backup
 # Formato brasileiro: DD-MM-YYYY_HHhMM
 timestamp=$(date +%d-%m-%Y_%Hh%M)
@@ -64,7 +170,16 @@ BACKUP_FILE="$BACKUP_DIR/${timestamp}.tar.gz"
 log "Creating backup: $(basename "$BACKUP_FILE")"
 cd "$PROJECT_DIR"
 
-if tar -czf "$BACKUP_FILE" data 2>&1 | tee -a "$LOG_FILE"; then
+ENGINE="$PROJECT_DIR/.docker/discord-bot/backup.py"
+if command -v python3 &> /dev/null && [ -f "$ENGINE" ]; then
+    BACKUP_CMD=(python3 "$ENGINE" --silencioso --raiz "$PROJECT_DIR" --saida "$BACKUP_FILE")
+    [ "$CATALOG_READY" = true ] && BACKUP_CMD+=(--catalogo "$CATALOG_FILE")
+    BACKUP_CMD+=(data)
+else
+    BACKUP_CMD=(tar -czf "$BACKUP_FILE" data)
+fi
+
+if "${BACKUP_CMD[@]}" 2>&1 | tee -a "$LOG_FILE"; [ "${PIPESTATUS[0]}" -eq 0 ]; then
     backup_size=$(du -h "$BACKUP_FILE" | cut -f1)
     log_success "Backup created successfully! Size: $backup_size"
 else
@@ -85,45 +200,12 @@ if [ -n "$GDRIVE_BACKUP_PATH" ]; then
             if rclone copy "$BACKUP_FILE" "$GDRIVE_BACKUP_PATH" 2>&1 | tee -a "$LOG_FILE"; then
                 log_success "Backup uploaded to Google Drive"
 
-                # Clean old Drive backups (keep most recent backup per day for 7 days)
-                log "Cleaning old Google Drive backups (keeping most recent per day for 7 days)..."
-
-                backups=$(rclone lsf "$GDRIVE_BACKUP_PATH" --files-only 2>/dev/null | grep "^[0-9]\{2\}-[0-9]\{2\}-[0-9]\{4\}_.*\.tar\.gz$" | sort -r || true)
-
-                if [ -n "$backups" ]; then
-                    # Group backups by date
-                    declare -A daily_drive_backups
-                    cutoff_date=$(date -d '7 days ago' +%Y%m%d 2>/dev/null || date -v-7d +%Y%m%d 2>/dev/null)
-
-                    while IFS= read -r backup; do
-                        # Extract date from filename: DD-MM-YYYY_HHhMM.tar.gz
-                        if [[ $backup =~ ^([0-9]{2})-([0-9]{2})-([0-9]{4})_([0-9]{2})h([0-9]{2})\.tar\.gz$ ]]; then
-                            day="${BASH_REMATCH[1]}"
-                            month="${BASH_REMATCH[2]}"
-                            year="${BASH_REMATCH[3]}"
-                            # Convert to YYYYMMDD for comparison
-                            backup_date="${year}${month}${day}"
-
-                            # Check if backup is older than 7 days
-                            if [ "$backup_date" -lt "$cutoff_date" ]; then
-                                log "Removing from Drive: $backup (older than 7 days)"
-                                rclone delete "$GDRIVE_BACKUP_PATH/$backup" 2>&1 | tee -a "$LOG_FILE"
-                            elif [ -z "${daily_drive_backups[$backup_date]}" ]; then
-                                # Keep first (most recent) backup for this date
-                                daily_drive_backups[$backup_date]="$backup"
-                                log "Keeping in Drive: $backup (most recent for $backup_date)"
-                            else
-                                # Remove older backup from same day
-                                log "Removing from Drive: $backup (superseded by newer backup on same day)"
-                                rclone delete "$GDRIVE_BACKUP_PATH/$backup" 2>&1 | tee -a "$LOG_FILE"
-                            fi
-                        fi
-                    done <<< "$backups"
-
-                    remaining_count=$(rclone lsf "$GDRIVE_BACKUP_PATH" --files-only 2>/dev/null | grep -c "^[0-9]\{2\}-[0-9]\{2\}-[0-9]\{4\}_.*\.tar\.gz$" || echo "0")
-                    log_success "Drive cleanup completed (kept $remaining_count daily backups)"
+                if [ "$CATALOG_READY" = true ]; then
+                    python3 "$CATALOG_TOOL" --catalogo "$CATALOG_FILE" remoto "$(basename "$BACKUP_FILE")" "rclone:$GDRIVE_BACKUP_PATH"
+                    # Drive backups from before the catalog join the retention below
+                    python3 "$CATALOG_TOOL" --catalogo "$CATALOG_FILE" importar-remoto "rclone:$GDRIVE_BACKUP_PATH" --padrao "[0-9][0-9]-*" 2>&1 | tee -a "$LOG_FILE"
                 else
-                    log "No backups found in Google Drive"
+                    cleanup_drive_legacy
                 fi
             else
                 log_error "Failed to upload backup to Google Drive"
@@ -136,52 +218,14 @@ if [ -n "$GDRIVE_BACKUP_PATH" ]; then
     fi
 fi
 
-# Clean old local backups (keep most recent backup per day for 7 days)
-log "Cleaning old local backups (keeping most recent per day for 7 days)..."
-cd "$BACKUP_DIR"
-
-# Get list of all backups sorted by name (which includes timestamp)
-backups=$(ls -1 [0-9][0-9]-[0-9][0-9]-[0-9][0-9][0-9][0-9]_*.tar.gz 2>/dev/null | sort -r || true)
-
-if [ -n "$backups" ]; then
-    # Group backups by date
-    declare -A daily_backups
-
-    while IFS= read -r backup; do
-        # Extract date from filename: DD-MM-YYYY_HHhMM.tar.gz
-        if [[ $backup =~ ^([0-9]{2})-([0-9]{2})-([0-9]{4})_([0-9]{2})h([0-9]{2})\.tar\.gz$ ]]; then
-            day="${BASH_REMATCH[1]}"
-            month="${BASH_REMATCH[2]}"
-            year="${BASH_REMATCH[3]}"
-            # Convert to YYYYMMDD for comparison
-            backup_date="${year}${month}${day}"
-
-            # Keep only the most recent backup for each date (first one since sorted in reverse)
-            if [ -z "${daily_backups[$backup_date]}" ]; then
-                daily_backups[$backup_date]="$backup"
-                log "Keeping: $backup (most recent for $backup_date)"
-            else
-                log "Removing: $backup (superseded by newer backup on same day)"
-                rm -f "$backup"
-            fi
-        fi
-    done <<< "$backups"
-
-    # Now remove backups older than 7 days
-    cutoff_date=$(date -d '7 days ago' +%Y%m%d 2>/dev/null || date -v-7d +%Y%m%d 2>/dev/null)
-
-    for backup_date in "${!daily_backups[@]}"; do
-        if [ "$backup_date" -lt "$cutoff_date" ]; then
-            backup_file="${daily_backups[$backup_date]}"
-            log "Removing: $backup_file (older than 7 days)"
-            rm -f "$backup_file"
-        fi
-    done
-
-    remaining_count=$(ls -1 [0-9][0-9]-[0-9][0-9]-[0-9][0-9][0-9][0-9]_*.tar.gz 2>/dev/null | wc -l)
-    log_success "Local cleanup completed (kept $remaining_count daily backups)"
+# Retention: one batched GFS pass over the catalog (local files + Drive), then
+# checksum verification in the background; filename-based cleanup without it
+if [ "$CATALOG_READY" = true ]; then
+    log "Applying retention from catalog (most recent per day for 7 days)..."
+    python3 "$CATALOG_TOOL" --catalogo "$CATALOG_FILE" reter --padrao "[0-9][0-9]-*" --diarios 7 2>&1 | tee -a "$LOG_FILE"
+    nohup python3 "$CATALOG_TOOL" --catalogo "$CATALOG_FILE" verificar >> "$LOG_FILE" 2>&1 &
 else
-    log "No backups found"
+    cleanup_local_legacy
 fi
 
 log "=========================================="
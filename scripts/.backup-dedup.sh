@@ -0,0 +1,126 @@
+#!/bin/bash
+
+# Deduplicated Backup Script
+# Incremental snapshots into a content-addressed repository (safe to run hourly)
+# Only new chunks are written locally and only new packs are uploaded
+
+# Directories
+PROJECT_DIR="/home/rainz/hytale-server"
+DATA_DIR="$PROJECT_DIR/data"
+REPO_DIR="$PROJECT_DIR/backups/repo"
+LOG_FILE="$PROJECT_DIR/logs/backup-dedup.log"
+REPO_TOOL="$PROJECT_DIR/.docker/discord-bot/repositorio.py"
+SNAPSHOT_TOOL="$PROJECT_DIR/.docker/discord-bot/snapshot.py"
+STAGING_DIR="$PROJECT_DIR/backups/.staging-dedup"
+
+# World state only (same as "Mundo + Mods + Configs" in backup.sh): logs/ and the
+# live uptime-kuma database change every hour and would only add churning chunks
+BACKUP_ITEMS=(data/universe data/mods data/config.json data/permissions.json data/whitelist.json data/bans.json)
+
+# World is saved through the server console and copied to STAGING_DIR first
+# (leave empty to read the live data directly). If the world does not settle
+# or changes during the copy, the server is stopped for the backup instead.
+SNAPSHOT_SAVE_CMD="/save"
+SNAPSHOT_WATCH="data/universe"
+
+# Google Drive via rclone (leave empty to disable)
+GDRIVE_REPO_PATH="gdrive:Backups/Hytale/repo"
+
+# Retention: last N snapshots + most recent snapshot of each of the last N days
+KEEP_LAST=24
+KEEP_DAILY=7
+
+mkdir -p "$PROJECT_DIR/logs"
+
+log() {
+    echo "[$(date '+%Y-%m-%d %H:%M:%S')] $1" | tee -a "$LOG_FILE"
+}
+
+log_error() {
+    echo "[$(date '+%Y-%m-%d %H:%M:%S')] [ERROR] $1" | tee -a "$LOG_FILE"
+}
+
+log_success() {
+    echo "[$(date '+%Y-%m-%d %H:%M:%S')] [OK] $1" | tee -a "$LOG_FILE"
+}
+
+repo() {
+    python3 "$REPO_TOOL" --repo "$REPO_DIR" "$@" 2>&1 | tee -a "$LOG_FILE"
+    return "${PIPESTATUS[0]}"
+}
+
+log "=========================================="
+log "Starting deduplicated backup"
+log "=========================================="
+
+if ! command -v python3 &> /dev/null || [ ! -f "$REPO_TOOL" ]; then
+    log_error "python3 or $REPO_TOOL not found"
+    exit 1
+fi
+
+if [ ! -d "$DATA_DIR" ]; then
+    log_error "Data directory not found: $DATA_DIR"
+    exit 1
+fi
+
+repo init > /dev/null || exit 1
+
+compose() {
+    (cd "$PROJECT_DIR" && { docker compose "$@" 2>/dev/null || docker-compose "$@" 2>/dev/null; })
+}
+
+BACKUP_ROOT="$PROJECT_DIR"
+SERVER_STOPPED=false
+if [ -n "$SNAPSHOT_SAVE_CMD" ] && [ -f "$SNAPSHOT_TOOL" ]; then
+    if python3 "$SNAPSHOT_TOOL" --raiz "$PROJECT_DIR" --staging "$STAGING_DIR" --observar "$SNAPSHOT_WATCH" --salvar "$SNAPSHOT_SAVE_CMD" "${BACKUP_ITEMS[@]}" 2>&1 | tee -a "$LOG_FILE"; [ "${PIPESTATUS[0]}" -eq 0 ]; then
+        BACKUP_ROOT="$STAGING_DIR"
+    else
+        # Never store an inconsistent copy: stop the server and read the live data
+        log_error "Snapshot failed or inconsistent, stopping the server for the backup"
+        if compose stop hytale-server; then
+            SERVER_STOPPED=true
+        else
+            log_error "Could not stop the server, backup skipped"
+            exit 1
+        fi
+    fi
+fi
+
+repo backup --raiz "$BACKUP_ROOT" "${BACKUP_ITEMS[@]}"
+BACKUP_STATUS=$?
+
+if [ "$SERVER_STOPPED" = true ]; then
+    if compose start hytale-server; then
+        log "Server restarted"
+    else
+        log_error "Could not restart the server: docker compose up -d hytale-server"
+    fi
+fi
+
+if [ "$BACKUP_STATUS" -ne 0 ]; then
+    log_error "Failed to create snapshot"
+    exit 1
+fi
+log_success "Snapshot created"
+
+# Retention is just dropping snapshot files; gc then frees unreferenced packs
+repo esquecer --manter-ultimos "$KEEP_LAST" --manter-diarios "$KEEP_DAILY"
+repo gc
+
+# Packs are immutable, so sync only transfers new packs and deletes collected ones
+if [ -n "$GDRIVE_REPO_PATH" ]; then
+    if command -v rclone &> /dev/null; then
+        log "Syncing repository to Google Drive..."
+        if rclone sync "$REPO_DIR" "$GDRIVE_REPO_PATH" --exclude "lock" --exclude "*.parcial" 2>&1 | tee -a "$LOG_FILE"; [ "${PIPESTATUS[0]}" -eq 0 ]; then
+            log_success "Repository synced to Google Drive"
+        else
+            log_error "Failed to sync repository to Google Drive"
+        fi
+    else
+        log_error "rclone is not installed"
+    fi
+fi
+
+log "=========================================="
+log "Deduplicated backup completed"
+log "=========================================="
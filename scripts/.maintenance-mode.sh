@@ -47,9 +47,7 @@ enable_maintenance() {
     sudo chmod 666 "$MAINTENANCE_FILE"
     show_progress "Ativando modo de manutenção"
 
-    # Restart bot to apply changes in background
-    cd "$PROJECT_DIR" 2>/dev/null
-    (sudo docker compose restart discord-bot 2>/dev/null || sudo docker-compose restart discord-bot 2>/dev/null) > /dev/null 2>&1 &
+    # O bot observa o arquivo de flag e atualiza o embed sozinho
 
     echo ""
 }
@@ -61,9 +59,7 @@ disable_maintenance() {
     sudo rm -f "$MAINTENANCE_FILE"
     show_progress "Desativando modo de manutenção"
 
-    # Restart bot to apply changes in background
-    cd "$PROJECT_DIR" 2>/dev/null
-    (sudo docker compose restart discord-bot 2>/dev/null || sudo docker-compose restart discord-bot 2>/dev/null) > /dev/null 2>&1 &
+    # O bot observa o arquivo de flag e atualiza o embed sozinho
 
     echo ""
 }
@@ -20,6 +20,7 @@ PROJECT_DIR="/home/rainz/hytale-server"
 CONTAINER_NAME="hytale-server"
 CHECK_INTERVAL=30  # segundos
 NOTIFICATION_FILE="/tmp/hytale_auth_alert.flag"
+CLASSIFIER="$PROJECT_DIR/.docker/discord-bot/log_classifier.py"
 
 print_header() {
     clear
@@ -30,6 +31,15 @@ print_header() {
 }
 
 check_auth_status() {
+    # Usa o mesmo classificador do bot quando disponível (o evento mais recente decide)
+    if command -v python3 &> /dev/null && [ -f "$CLASSIFIER" ]; then
+        docker logs --tail 2000 --timestamps "$CONTAINER_NAME" 2>&1 | python3 "$CLASSIFIER" --auth > /dev/null
+        case $? in
+            1) return 1 ;;  # Autenticação necessária
+            *) return 0 ;;  # OK, atenção ou aguardando perfil (✅ OK no bot)
+        esac
+    fi
+
     # Pega os últimos 2000 logs (aumentado para capturar mensagens antigas de boot)
     local logs=$(docker logs --tail 2000 "$CONTAINER_NAME" 2>&1)
     local logs_lower=$(echo "$logs" | tr '[:upper:]' '[:lower:]')
@@ -56,12 +66,8 @@ check_auth_status() {
 
     # Se encontrou sucesso, verifica se foi DEPOIS dos erros
     if [ "$tem_sucesso" = true ]; then
-        # Se tem múltiplos perfis mas não foi selecionado, ainda precisa autenticar
-        if echo "$logs_lower" | grep -q "multiple profiles available" && ! echo "$logs_lower" | grep -q "selected profile:"; then
-            return 1  # Precisa selecionar perfil
-        else
-            return 0  # Autenticação OK
-        fi
+        # Múltiplos perfis sem seleção: autenticado, só aguardando o perfil (✅ OK no bot)
+        return 0
     fi
 
     # Verifica se há erros de autenticação
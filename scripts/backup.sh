@@ -22,6 +22,25 @@ BACKUP_DIR="$PROJECT_DIR/backups"
 # Format: "remote:path" (ex: "gdrive:Backups/Hytale")
 GDRIVE_BACKUP_PATH="gdrive:Backups/Hytale"
 
+# Snapshot mode: world is saved through the server console and copied to a
+# staging dir; compression then runs on the copy while the server keeps running
+STAGING_DIR="$BACKUP_DIR/.staging"
+
+# Backup catalog (name, size, checksum, remote copies); read by the Discord bot
+CATALOG_FILE="$BACKUP_DIR/catalogo.jsonl"
+CATALOG_TOOL="$PROJECT_DIR/.docker/discord-bot/catalogo.py"
+SNAPSHOT_TOOL="$PROJECT_DIR/.docker/discord-bot/snapshot.py"
+# Directories the server writes to; the snapshot waits for them to settle
+SNAPSHOT_WATCH="data/universe"
+# Console commands (leave empty to skip)
+SNAPSHOT_SAVE_CMD="/save"
+# No save-off/save-on command is known for the Hytale server, so the world may
+# still be written while it is copied. snapshot.py re-checks the mtimes after
+# the copy and fails if anything changed; the backup then falls back to
+# stopping the server. Set these if the server gains such commands.
+SNAPSHOT_PAUSE_CMD=""
+SNAPSHOT_RESUME_CMD=""
+
 # Functions
 print_header() {
     echo -e "${CYAN}╔════════════════════════════════════════════════════════╗${RESET}"
@@ -122,20 +141,26 @@ show_save_info() {
 
 # Ask if server should be stopped
 ask_stop_server() {
-    print_warning "Recomendação: Pare o servidor antes do backup para evitar corrupção de dados"
+    SNAPSHOT_MODE=false
+    SERVER_WAS_STOPPED=false
+
+    echo -e "${WHITE}Como o servidor deve ficar durante o backup?${RESET}"
     echo ""
-    read -p "Parar o servidor antes do backup? (S/n): " stop_server
+    echo -e "  ${BLUE}1${RESET}) Parar o servidor (mais seguro, servidor fora do ar durante todo o backup)"
+    if command -v python3 &> /dev/null && [ -f "$SNAPSHOT_TOOL" ]; then
+        echo -e "  ${BLUE}2${RESET}) Snapshot (salva pelo console e copia o mundo, parada de segundos)"
+    fi
+    echo -e "  ${BLUE}3${RESET}) Continuar rodando (risco de corrupção)"
+    echo ""
+    read -p "Escolha (1-3): " stop_server
     echo ""
 
-    if [[ ! "$stop_server" =~ ^[Nn]$ ]]; then
-        print_step "Parando servidor Hytale..."
-        cd "$PROJECT_DIR"
-
-        # Try docker compose (new) or docker-compose (old)
-        if docker compose stop hytale-server 2>/dev/null || docker-compose stop hytale-server 2>/dev/null; then
-            print_success "Servidor parado"
-            SERVER_WAS_STOPPED=true
-        else
+    if [ "$stop_server" = "2" ] && command -v python3 &> /dev/null && [ -f "$SNAPSHOT_TOOL" ]; then
+        print_info "Modo snapshot: o servidor continua rodando"
+        SNAPSHOT_MODE=true
+        echo ""
+    elif [ "$stop_server" != "3" ]; then
+        if ! stop_server; then
             print_warning "Não foi possível parar o servidor"
             echo -e "  ${GRAY}Verifique se o Docker está rodando e se você está no diretório correto${RESET}"
             echo ""
@@ -149,7 +174,6 @@ ask_stop_server() {
         echo ""
     else
         print_warning "Backup será feito com servidor rodando (risco de corrupção)"
-        SERVER_WAS_STOPPED=false
         echo ""
         sleep 2
     fi
@@ -160,6 +184,20 @@ ask_stop_server() {
     print_header
 }
 
+# Stop the server for a consistent copy
+stop_server() {
+    print_step "Parando servidor Hytale..."
+    cd "$PROJECT_DIR"
+
+    # Try docker compose (new) or docker-compose (old)
+    if docker compose stop hytale-server 2>/dev/null || docker-compose stop hytale-server 2>/dev/null; then
+        print_success "Servidor parado"
+        SERVER_WAS_STOPPED=true
+        return 0
+    fi
+    return 1
+}
+
 # Choose backup destination
 choose_backup_location() {
     echo -e "${WHITE}Escolha o destino do backup:${RESET}"
@@ -262,6 +300,31 @@ choose_backup_content() {
     print_header
 }
 
+# Save the world through the console and copy it to the staging dir
+create_snapshot() {
+    print_step "Criando snapshot do mundo (servidor continua rodando)..."
+    echo ""
+
+    local snapshot_args=(--raiz "$PROJECT_DIR" --staging "$STAGING_DIR" --observar "$SNAPSHOT_WATCH")
+    [ -n "$SNAPSHOT_SAVE_CMD" ] && snapshot_args+=(--salvar "$SNAPSHOT_SAVE_CMD")
+    [ -n "$SNAPSHOT_PAUSE_CMD" ] && snapshot_args+=(--pausar "$SNAPSHOT_PAUSE_CMD")
+    [ -n "$SNAPSHOT_RESUME_CMD" ] && snapshot_args+=(--retomar "$SNAPSHOT_RESUME_CMD")
+
+    if python3 "$SNAPSHOT_TOOL" "${snapshot_args[@]}" $BACKUP_CONTENT; then
+        print_success "Snapshot pronto, compressão roda sobre a cópia"
+        BACKUP_ROOT="$STAGING_DIR"
+        # The server is consistent again; only the copy is being archived now
+        "$PROJECT_DIR/scripts/.maintenance-mode.sh" disable 2>/dev/null || true
+        echo ""
+        return 0
+    fi
+
+    # Non-zero also when the world did not settle or changed during the copy
+    print_error "Falha ao criar snapshot"
+    echo ""
+    return 1
+}
+
 # Create backup
 create_backup() {
     local timestamp=$(date +%Y%m%d-%H%M%S)
@@ -271,10 +334,40 @@ create_backup() {
     echo -e "  Arquivo: $(basename "$BACKUP_FILE_PATH")"
     echo ""
 
-    cd "$PROJECT_DIR"
+    local backup_root="${BACKUP_ROOT:-$PROJECT_DIR}"
+    cd "$backup_root"
+
+    # Parallel compression engine (all cores); plain tar if python3 is missing
+    local engine="$PROJECT_DIR/.docker/discord-bot/backup.py"
+    local backup_cmd
+    UPLOAD_DONE=false
+    GDRIVE_SENT=""
+    if command -v python3 &> /dev/null && [ -f "$engine" ]; then
+        backup_cmd=(python3 "$engine" --raiz "$backup_root" --saida "$BACKUP_FILE_PATH")
+        if catalog_available; then
+            # First run with the catalog: register the archives that already exist
+            [ -f "$CATALOG_FILE" ] || python3 "$CATALOG_TOOL" --catalogo "$CATALOG_FILE" importar "$BACKUP_DIR" > /dev/null
+            backup_cmd+=(--catalogo "$CATALOG_FILE")
+        fi
+        # Upload runs in parallel parts while the archive is still being compressed
+        if gdrive_available; then
+            print_info "Envio para o Google Drive acontece durante a compressão"
+            backup_cmd+=(--enviar "rclone:$GDRIVE_BACKUP_PATH")
+        fi
+        backup_cmd+=($BACKUP_CONTENT)
+    else
+        print_info "python3 não encontrado, usando tar (single-thread)"
+        backup_cmd=(tar -czf "$BACKUP_FILE_PATH" $BACKUP_CONTENT)
+    fi
+
+    # Create backup with progress (exit 3: archive ok, upload must be resumed)
+    "${backup_cmd[@]}"
+    local status=$?
+    if [ $status -eq 0 ] && [[ " ${backup_cmd[*]} " == *" --enviar "* ]]; then
+        UPLOAD_DONE=true
+    fi
 
-    # Create backup with progress bar
-    if tar -czf "$BACKUP_FILE_PATH" $BACKUP_CONTENT 2>/dev/null; then
+    if [ $status -eq 0 ] || [ $status -eq 3 ]; then
         echo ""
         print_success "Backup criado com sucesso!"
 
@@ -298,6 +391,19 @@ create_backup() {
     fi
 }
 
+# Backup catalog tool usable (no output)
+catalog_available() {
+    command -v python3 &> /dev/null && [ -f "$CATALOG_TOOL" ] && mkdir -p "$BACKUP_DIR"
+}
+
+# Google Drive configured and reachable through rclone (no output)
+gdrive_available() {
+    [ -n "$GDRIVE_BACKUP_PATH" ] || return 1
+    command -v rclone &> /dev/null || return 1
+    local remote=$(echo "$GDRIVE_BACKUP_PATH" | cut -d: -f1)
+    rclone listremotes 2>/dev/null | grep -q "^${remote}:$"
+}
+
 # Upload to Google Drive
 upload_to_gdrive() {
     local backup_file="$1"
@@ -307,6 +413,15 @@ upload_to_gdrive() {
         return 0
     fi
 
+    # Already sent in parts during compression
+    if [ "$UPLOAD_DONE" = true ]; then
+        GDRIVE_SENT=partes
+        print_success "Backup enviado para Google Drive durante a compressão!"
+        echo -e "  Localização: ${CYAN}$GDRIVE_BACKUP_PATH/$(basename "$backup_file").partes/${RESET}"
+        echo ""
+        return 0
+    fi
+
     print_step "Enviando para Google Drive..."
     echo ""
 
@@ -331,8 +446,24 @@ upload_to_gdrive() {
         return 1
     fi
 
-    # Upload file
-    if rclone copy "$backup_file" "$GDRIVE_BACKUP_PATH" --progress; then
+    # Resume an interrupted parallel upload, or send the whole file
+    local upload_tool="$PROJECT_DIR/.docker/discord-bot/upload.py"
+    local upload_cmd=(rclone copy "$backup_file" "$GDRIVE_BACKUP_PATH" --progress)
+    if [ -f "$backup_file.upload.json" ] && command -v python3 &> /dev/null && [ -f "$upload_tool" ]; then
+        print_info "Retomando envio interrompido (só as partes que faltam)"
+        upload_cmd=(python3 "$upload_tool" enviar "$backup_file" "rclone:$GDRIVE_BACKUP_PATH")
+    fi
+
+    if "${upload_cmd[@]}"; then
+        # upload.py stores the backup as <name>.partes/; rclone copy, as a single file
+        if [ "${upload_cmd[0]}" = python3 ]; then
+            GDRIVE_SENT=partes
+        else
+            GDRIVE_SENT=arquivo
+        fi
+        if catalog_available && [ -f "$CATALOG_FILE" ]; then
+            python3 "$CATALOG_TOOL" --catalogo "$CATALOG_FILE" remoto "$(basename "$backup_file")" "rclone:$GDRIVE_BACKUP_PATH"
+        fi
         echo ""
         print_success "Backup enviado para Google Drive!"
         echo -e "  Localização: ${CYAN}$GDRIVE_BACKUP_PATH/$(basename "$backup_file")${RESET}"
@@ -356,8 +487,25 @@ cleanup_old_gdrive_backups() {
 
     print_step "Limpando backups antigos do Google Drive (mantendo os $keep_count mais recentes)..."
 
-    # List backups sorted by date (newest first)
-    local backups=$(rclone lsf "$GDRIVE_BACKUP_PATH" --files-only 2>/dev/null | grep "hytale-backup-.*\.tar\.gz$" | sort -r)
+    # Catalog: one batched rclone delete for everything outside the retention.
+    # The Drive listing is imported first so backups uploaded before the
+    # catalog (or by hand) are pruned too.
+    if catalog_available && [ -f "$CATALOG_FILE" ]; then
+        if ! python3 "$CATALOG_TOOL" --catalogo "$CATALOG_FILE" importar-remoto "rclone:$GDRIVE_BACKUP_PATH" --padrao "hytale-backup-*"; then
+            print_warning "Não foi possível listar o Google Drive; só os backups do catálogo serão limpos"
+        fi
+        if python3 "$CATALOG_TOOL" --catalogo "$CATALOG_FILE" reter --padrao "hytale-backup-*" --ultimos "$keep_count" --so-remoto; then
+            echo ""
+            print_success "Limpeza concluída!"
+        else
+            print_warning "Falha ao remover alguns backups do Google Drive"
+        fi
+        echo ""
+        return 0
+    fi
+
+    # List backups sorted by date (newest first); parallel uploads are <name>.partes/ dirs
+    local backups=$(rclone lsf "$GDRIVE_BACKUP_PATH" 2>/dev/null | grep -E "^hytale-backup-.*\.tar\.gz(\.partes/)?$" | sort -r)
     local total_backups=$(echo "$backups" | grep -c "hytale-backup-")
 
     if [ $total_backups -le $keep_count ]; then
@@ -378,7 +526,9 @@ cleanup_old_gdrive_backups() {
         count=$((count + 1))
         if [ $count -gt $keep_count ]; then
             print_step "Removendo: $backup"
-            if rclone delete "$GDRIVE_BACKUP_PATH/$backup" 2>/dev/null; then
+            local delete_cmd=(rclone delete "$GDRIVE_BACKUP_PATH/$backup")
+            [[ "$backup" == */ ]] && delete_cmd=(rclone purge "$GDRIVE_BACKUP_PATH/${backup%/}")
+            if "${delete_cmd[@]}" 2>/dev/null; then
                 print_success "Removido: $backup"
             else
                 print_warning "Falha ao remover: $backup"
@@ -418,6 +568,13 @@ list_existing_backups() {
     print_step "Backups existentes:"
     echo ""
 
+    # Catalog: sizes, dates and integrity without stat/du on every archive
+    if catalog_available && [ -f "$CATALOG_FILE" ]; then
+        python3 "$CATALOG_TOOL" --catalogo "$CATALOG_FILE" listar --padrao "hytale-backup-*"
+        echo ""
+        return 0
+    fi
+
     if [ -d "$BACKUP_DIR" ] && [ "$(ls -A $BACKUP_DIR 2>/dev/null)" ]; then
         cd "$BACKUP_DIR"
         local count=0
@@ -460,6 +617,13 @@ show_summary() {
     echo -e "     ${CYAN}mv data data.old${RESET}"
     echo ""
     echo -e "  ${BLUE}3.${RESET} Extraia o backup:"
+    if [ "$GDRIVE_SENT" = partes ]; then
+        echo -e "     ${GRAY}Sem a cópia local, baixe antes do Google Drive (o backup está em partes):${RESET}"
+        echo -e "     ${CYAN}python3 .docker/discord-bot/upload.py baixar rclone:$GDRIVE_BACKUP_PATH $(basename "$backup_file") $(basename "$backup_file")${RESET}"
+    elif [ "$GDRIVE_SENT" = arquivo ]; then
+        echo -e "     ${GRAY}Sem a cópia local, baixe antes do Google Drive:${RESET}"
+        echo -e "     ${CYAN}rclone copy $GDRIVE_BACKUP_PATH/$(basename "$backup_file") .${RESET}"
+    fi
     echo -e "     ${CYAN}tar -xzf $(basename "$backup_file")${RESET}"
     echo ""
     echo -e "  ${BLUE}4.${RESET} Reinicie o servidor:"
@@ -481,6 +645,17 @@ main() {
     choose_backup_location
     choose_backup_content
 
+    if [ "$SNAPSHOT_MODE" = true ] && ! create_snapshot; then
+        # Never archive an inconsistent copy: stop the server and copy the live data
+        print_warning "Snapshot indisponível, parando o servidor para copiar"
+        if ! stop_server; then
+            print_error "Backup falhou! Não foi possível parar o servidor"
+            "$PROJECT_DIR/scripts/.maintenance-mode.sh" disable 2>/dev/null || true
+            exit 1
+        fi
+        echo ""
+    fi
+
     if create_backup; then
         if upload_to_gdrive "$BACKUP_FILE_PATH"; then
             cleanup_old_gdrive_backups